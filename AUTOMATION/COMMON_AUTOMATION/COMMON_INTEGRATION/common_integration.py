@@ -1,9 +1,11 @@
-from AUTOMATION.COMMON_AUTOMATION.COMMON_OPEN.open import *
-from AUTOMATION.COMMON_AUTOMATION.COMMON_CLOSE.close import *
+from FUNCTION.INTENT_ROUTER.intent_router import TIER_COMMON
+from FUNCTION.SKILL_REGISTRY.skill_registry import register, index_for
+
+COMMON_CLOSE = "AUTOMATION.COMMON_AUTOMATION.COMMON_CLOSE.close"
+
+
+register("close", ("close", "band kar do"), COMMON_CLOSE + ":close", tier=TIER_COMMON)
 
 
 def common_cmd(text):
-    if "close" in text or "band kar do" in text:
-        close()
-    else:
-        pass
\ No newline at end of file
+    index_for(TIER_COMMON).dispatch(text)
@@ -6,12 +6,13 @@ import time
 
 def open(text):
     x = random.choice(open_dlg)
-    speak(x+" "+text)
-    time.sleep(3)
+    # Search the Start menu while the line plays, then wait for it to end
+    spoken = say(x+" "+text)
     ui.hotkey("win")
     time.sleep(0.2)
     ui.write(text)
     time.sleep(0.5)
     ui.press("enter")
+    spoken.wait()
 
-# open("edge")
\ No newline at end of file
+# open("edge")
@@ -2,7 +2,7 @@ import random
 import time
 import psutil
 from DATA.JARVIS_DLG_DATASET.DLG import low_b, last_low, full_battery
-from FUNCTION.JARVIS_SPEAK.speak import speak
+from FUNCTION.JARVIS_SPEAK.speak import speak, ALERT
 
 
 def battery_alert():
@@ -13,15 +13,15 @@ def battery_alert():
 
         if percent < 30:
             random_low = random.choice(low_b)
-            speak(random_low)
+            speak(random_low, priority=ALERT, key="battery_level")
 
         elif percent < 10:
             random_low = random.choice(last_low)
-            speak(random_low)
+            speak(random_low, priority=ALERT, key="battery_level")
 
         elif percent == 100:
             random_low = random.choice(full_battery)
-            speak(random_low)
+            speak(random_low, priority=ALERT, key="battery_level")
         else:
             pass
 
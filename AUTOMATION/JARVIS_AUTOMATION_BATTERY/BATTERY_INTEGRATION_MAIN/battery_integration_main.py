@@ -1,18 +1,20 @@
-from AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_ALERT.battery_alert import *
-from AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_PLUG_CHECK.battery_plug_check import check_plugin_status1
-from AUTOMATION.JARVIS_AUTOMATION_BATTERY.CHECK_BATTERY_PERSENTAGE.check_battery_persentage import battery_persentage
+from FUNCTION.INTENT_ROUTER.intent_router import TIER_BATTERY
+from FUNCTION.SKILL_REGISTRY.skill_registry import register, index_for
+
+# Heavy modules (psutil + speech), imported only when one of their skills fires
+BATTERY_ALERT = "AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_ALERT.battery_alert"
+BATTERY_PLUG_CHECK = "AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_PLUG_CHECK.battery_plug_check"
+BATTERY_PERCENTAGE = "AUTOMATION.JARVIS_AUTOMATION_BATTERY.CHECK_BATTERY_PERSENTAGE.check_battery_persentage"
+
+
+register("battery_percentage", ("check battery percentage", "battery percentage check karo", "battery kitni hai"), BATTERY_PERCENTAGE + ":battery_persentage", tier=TIER_BATTERY)
+register("battery_plug", ("check plug", "check battery plug"), BATTERY_PLUG_CHECK + ":check_plugin_status1", tier=TIER_BATTERY)
+register("battery_alert", ("give me the battery alert", "battery alert"), BATTERY_ALERT + ":battery_alert1", tier=TIER_BATTERY)
 
 
 def battery_cmd(text):
-    if "check battery percentage" in text or "battery percentage check karo" in text or "battery kitni hai" in text:
-        battery_persentage()
-    elif "check plug" in text or "check battery plug" in text:
-        check_plugin_status1()
-    elif "give me the battery alert" in text or "battery alert" in text:
-        battery_alert1()
-    else:
-        pass
+    index_for(TIER_BATTERY).dispatch(text)
 
 #text = "check plug"
 #battery_cmd(text)
-#time.sleep(10)
\ No newline at end of file
+#time.sleep(10)
@@ -1,24 +1,25 @@
 import random
 import psutil
 from DATA.JARVIS_DLG_DATASET.DLG import plug_in, plug_out
-from FUNCTION.JARVIS_SPEAK.speak import speak
+from FUNCTION.JARVIS_SPEAK.speak import say, speak, ALERT
 
 
 def check_plugin_status():
     battery = psutil.sensors_battery()
     previous_state = battery.power_plugged
 
-    # Only announce when the state actually changes
+    # Only announce when the state actually changes; if it flips again
+    # before the line is spoken, only the latest state is announced
     while True:
         battery = psutil.sensors_battery()
 
         if battery.power_plugged != previous_state:
             if battery.power_plugged:
                 random_low = random.choice(plug_in)
-                speak(random_low)
+                say(random_low, priority=ALERT, key="battery_plug")
             else:
                 random_low = random.choice(plug_out)
-                speak(random_low)
+                say(random_low, priority=ALERT, key="battery_plug")
             previous_state = battery.power_plugged
 
         # Check agian after a minute
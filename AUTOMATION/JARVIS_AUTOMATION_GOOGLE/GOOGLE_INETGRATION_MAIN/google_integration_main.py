@@ -1,101 +1,52 @@
-from AUTOMATION.JARVIS_AUTOMATION_GOOGLE.OPEN_WEBSITE.open_website import *
-from AUTOMATION.JARVIS_AUTOMATION_GOOGLE.SCROLL_AUTOMATION.scroll_automation import *
-from AUTOMATION.JARVIS_AUTOMATION_GOOGLE.SEARCH_IN_GOOGLE.search_in_google import *
-from AUTOMATION.JARVIS_AUTOMATION_GOOGLE.TAB_AUTOMATION.tab_automation import *
-from AUTOMATION.COMMON_AUTOMATION.COMMON_OPEN.open import *
-
-def google_cmd(text):
-    # Handle specific browser 'open ...' commands first
-    if "open new tab" in text:
-        open_new_tab()
-    elif "open private window" in text:
-        open_private_window()
-    elif "open browser menu" in text:
-        open_browser_menu()
-    elif "open history" in text:
-        open_history()
-    elif "open bookmarks" in text:
-        open_bookmarks()
-    elif "open dev tools" in text:
-        open_dev_tools()
-    elif ("close tab" in text) or ("close this tab" in text) or ("close current tab" in text) or ("close active tab" in text):
-        close_tab()
-    # Generic 'open' last, to avoid Windows search being triggered for specific commands
-    elif "open" in text:
-        if "website" in text or "site" in text:
-            text = text.replace("open", "")
-            text = text.replace("website", "")
-            text = text.replace("site", "")
-            text = text.strip()
-            openweb(text)
-        else:
-            text = text.replace("open","")
-            text = text.strip()
-            if text == "":
-                pass
-            else:
-                open(text)
-    elif "scroll up" in text:
-        scroll_up()
-
-    elif "scroll down" in text:
-        scroll_down()
-
-    elif "scroll to top" in text:
-        scroll_to_top()
-
-    elif "scroll to bottom" in text:
-        scroll_to_bottom()
-
-    elif text.endswith("search in google") or text.endswith("search in google"):
-        text = text.replace("search in google", "")
-        text = text.replace("search on google", "")
-        search_google(text)
-
-    elif "close tab" in text:
-        close_tab()
-
-    elif "open browser menu" in text:
-        open_browser_menu()
-
-    elif "zoom in" in text:
-        zoom_in()
-
-    elif "zoom out" in text:
-        zoom_out()
-
-    elif "refresh page" in text:
-        refresh_page()
-
-    elif "switch to next tab" in text:
-        switch_to_next_tab()
-
-    elif "switch to previous tab" in text:
-        switch_to_previous_tab()
-
-    elif "open history" in text:
-        open_history()
-
-    elif "open bookmarks" in text:
-        open_bookmarks()
-
-    elif "go back" in text:
-        go_back()
-
-    elif "go forward" in text:
-        go_forward()
-
-    elif "open dev tools" in text:
-        open_dev_tools()
+from FUNCTION.INTENT_ROUTER.intent_router import SUFFIX, TIER_GOOGLE
+from FUNCTION.SKILL_REGISTRY.skill_registry import skill, register, resolve, index_for
+
+# Heavy modules, imported only when one of their skills fires
+OPEN_WEBSITE = "AUTOMATION.JARVIS_AUTOMATION_GOOGLE.OPEN_WEBSITE.open_website"
+SCROLL = "AUTOMATION.JARVIS_AUTOMATION_GOOGLE.SCROLL_AUTOMATION.scroll_automation"
+SEARCH_IN_GOOGLE = "AUTOMATION.JARVIS_AUTOMATION_GOOGLE.SEARCH_IN_GOOGLE.search_in_google"
+TABS = "AUTOMATION.JARVIS_AUTOMATION_GOOGLE.TAB_AUTOMATION.tab_automation"
+COMMON_OPEN = "AUTOMATION.COMMON_AUTOMATION.COMMON_OPEN.open"
+
+
+# Specific browser 'open ...' commands win over the generic 'open' by length
+register("open_new_tab", ("open new tab",), TABS + ":open_new_tab", tier=TIER_GOOGLE)
+register("open_private_window", ("open private window",), TABS + ":open_private_window", tier=TIER_GOOGLE)
+register("open_browser_menu", ("open browser menu",), TABS + ":open_browser_menu", tier=TIER_GOOGLE)
+register("open_history", ("open history",), TABS + ":open_history", tier=TIER_GOOGLE)
+register("open_bookmarks", ("open bookmarks",), TABS + ":open_bookmarks", tier=TIER_GOOGLE)
+register("open_dev_tools", ("open dev tools",), TABS + ":open_dev_tools", tier=TIER_GOOGLE)
+register("close_tab", ("close tab", "close this tab", "close current tab", "close active tab"), TABS + ":close_tab", tier=TIER_GOOGLE)
+
+
+# Generic 'open' opens a website or falls back to Windows search
+@skill("open", ("open",), COMMON_OPEN, slot=True, tier=TIER_GOOGLE)
+def open_target(mod, text):
+    if "website" in text or "site" in text:
+        text = text.replace("website", "")
+        text = text.replace("site", "")
+        text = text.strip()
+        resolve(OPEN_WEBSITE + ":openweb")(text)
+    elif text == "":
+        pass
+    else:
+        mod.open(text)
 
-    elif "toggle full screen" in text:
-        toggle_full_screen()
 
-    elif "open private window" in text:
-        open_private_window()
+register("scroll_up", ("scroll up",), SCROLL + ":scroll_up", tier=TIER_GOOGLE)
+register("scroll_down", ("scroll down",), SCROLL + ":scroll_down", tier=TIER_GOOGLE)
+register("scroll_to_top", ("scroll to top",), SCROLL + ":scroll_to_top", tier=TIER_GOOGLE)
+register("scroll_to_bottom", ("scroll to bottom",), SCROLL + ":scroll_to_bottom", tier=TIER_GOOGLE)
+register("search_google", ("search in google", "search on google"), SEARCH_IN_GOOGLE + ":search_google", match=SUFFIX, slot=True, tier=TIER_GOOGLE)
+register("browser_zoom_in", ("zoom in",), TABS + ":zoom_in", tier=TIER_GOOGLE)
+register("browser_zoom_out", ("zoom out",), TABS + ":zoom_out", tier=TIER_GOOGLE)
+register("refresh_page", ("refresh page",), TABS + ":refresh_page", tier=TIER_GOOGLE)
+register("switch_to_next_tab", ("switch to next tab",), TABS + ":switch_to_next_tab", tier=TIER_GOOGLE)
+register("switch_to_previous_tab", ("switch to previous tab",), TABS + ":switch_to_previous_tab", tier=TIER_GOOGLE)
+register("go_back", ("go back",), TABS + ":go_back", tier=TIER_GOOGLE)
+register("go_forward", ("go forward",), TABS + ":go_forward", tier=TIER_GOOGLE)
+register("browser_full_screen", ("toggle full screen",), TABS + ":toggle_full_screen", tier=TIER_GOOGLE)
 
-    elif "open new tab" in text:
-        open_new_tab()
 
-    else:
-        pass
\ No newline at end of file
+def google_cmd(text):
+    index_for(TIER_GOOGLE).dispatch(text)
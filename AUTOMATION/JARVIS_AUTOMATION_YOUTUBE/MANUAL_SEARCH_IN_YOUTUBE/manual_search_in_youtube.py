@@ -1,4 +1,3 @@
-import time
 import pyautogui as ui
 import random
 from DATA.JARVIS_DLG_DATASET.DLG import s1, s2
@@ -11,7 +10,6 @@ def search_manual(text):
     ui.write(text)
     s12 = random.choice(s1)
     speak(s12)
-    time.sleep(0.5)
     ui.press("enter")
     s12 = random.choice(s2)
     speak(s12)
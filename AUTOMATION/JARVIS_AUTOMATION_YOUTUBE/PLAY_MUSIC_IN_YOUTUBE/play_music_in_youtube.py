@@ -1,15 +1,15 @@
-import time
 import pywhatkit as kt
 import random
 from DATA.JARVIS_DLG_DATASET.DLG import playsong, playing_dlg
-from FUNCTION.JARVIS_SPEAK.speak import speak
+from FUNCTION.JARVIS_SPEAK.speak import say, speak
+from FUNCTION.WINDOW_WAIT.window_wait import wait_for_window
 
 
 def play_music_on_youtube(text):
     playdlg = random.choice(playsong)
-    speak(playdlg)
+    # pywhatkit looks the video up while the line plays
+    say(playdlg)
     kt.playonyt(text)
-    time.sleep(3)
+    wait_for_window("YouTube", timeout=3)
     playdlg = random.choice(playing_dlg)
     speak(playdlg+ text)
-
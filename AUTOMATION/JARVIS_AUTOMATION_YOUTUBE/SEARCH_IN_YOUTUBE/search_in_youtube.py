@@ -1,24 +1,19 @@
-import time
 import random
-import pyautogui as ui
 import webbrowser
+from urllib.parse import quote_plus
 from DATA.JARVIS_DLG_DATASET.DLG import yt_search, s1, s2
-from FUNCTION.JARVIS_SPEAK.speak import speak
+from FUNCTION.JARVIS_SPEAK.speak import say, speak
+from FUNCTION.WINDOW_WAIT.window_wait import wait_for_window
 
 
 def youtube_search(text):
     dlg = random.choice(yt_search)
-    speak(dlg)
-    webbrowser.open("https://www.youtube.com/")
-    time.sleep(5)
-    ui.press("/")
-    ui.write(text)
+    # The results page opens while the line plays; nothing is typed into it,
+    # so there is no page load to wait out before the "/" shortcut works
+    say(dlg)
+    webbrowser.open(f"https://www.youtube.com/results?search_query={quote_plus(text)}")
     s12 = random.choice(s1)
     speak(s12)
-    time.sleep(0.5)
-    ui.press("enter")
+    wait_for_window("YouTube", timeout=5)
     s12 = random.choice(s2)
     speak(s12)
-
-
-
@@ -1,11 +1,18 @@
 import speech_recognition as sr
+
+# Share JARVIS's microphone bus when running inside it; standalone runs
+# still open the device directly
+try:
+    from FUNCTION.MIC_BUS.mic_bus import MicSource as Microphone
+except Exception:
+    Microphone = sr.Microphone
 from core.speech import speak
 
 _recognizer = sr.Recognizer()
 
 
 def listen_command() -> str:
-    with sr.Microphone() as source:
+    with Microphone() as source:
         print("Listening...")
         _recognizer.adjust_for_ambient_noise(source)
         audio = _recognizer.listen(source)
@@ -34,6 +34,13 @@ import pyttsx3
 # STT
 import speech_recognition as sr
 
+# Share JARVIS's microphone bus when running inside it; standalone runs
+# still open the device directly
+try:
+    from FUNCTION.MIC_BUS.mic_bus import MicSource as Microphone
+except Exception:
+    Microphone = sr.Microphone
+
 
 # =============================
 # Global flags
@@ -62,7 +69,7 @@ _recognizer = sr.Recognizer()
 
 def listen_command() -> str:
     try:
-        with sr.Microphone() as source:
+        with Microphone() as source:
             print("Listening...")
             _recognizer.adjust_for_ambient_noise(source)
             audio = _recognizer.listen(source)
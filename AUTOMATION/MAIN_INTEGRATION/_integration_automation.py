@@ -2,10 +2,10 @@ from AUTOMATION.COMMON_AUTOMATION.COMMON_INTEGRATION.common_integration import *
 from AUTOMATION.JARVIS_AUTOMATION_GOOGLE.GOOGLE_INETGRATION_MAIN.google_integration_main import *
 from AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_INTEGRATION_MAIN.battery_integration_main import *
 from AUTOMATION.JARVIS_AUTOMATION_YOUTUBE.INTEGRATION_MAIN.integration_main import *
+from FUNCTION.INTENT_ROUTER.intent_router import TIER_YOUTUBE, TIER_GOOGLE, TIER_BATTERY, TIER_COMMON
+from FUNCTION.SKILL_REGISTRY.skill_registry import index_for
 
-def Automation(text):
-    youtube_cmd(text)
-    google_cmd(text)
-    battery_cmd(text)
-    common_cmd(text)
 
+def Automation(text):
+    # One pass over the text picks one automation instead of running all four dispatchers
+    return index_for(TIER_YOUTUBE, TIER_GOOGLE, TIER_BATTERY, TIER_COMMON).dispatch(text)
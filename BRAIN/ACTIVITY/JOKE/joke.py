@@ -2,7 +2,7 @@ import random
 import time
 import requests
 from FUNCTION.JARVIS_LISTEN.listen import listen
-from FUNCTION.JARVIS_SPEAK.speak import speak
+from FUNCTION.JARVIS_SPEAK.speak import speak, CHAT
 
 
 def get_random_joke():
@@ -17,10 +17,12 @@ def jokes():
         x = [600, 550, 580, 400, 3000, 800, 700, 8200, 8000, 50, 568]
         x = random.choice(x)
         time.sleep(x)
-        speak("I have some joke for you, sir")
+        # Waits behind answers and alerts; skipped if the user is busy
+        if not speak("I have some joke for you, sir", priority=CHAT).spoken:
+            continue
         text = listen().lower()
         if "yes tell me " in text or "yes" in text:
             advice = get_random_joke()
-            speak(advice)
+            speak(advice, priority=CHAT)
         else:
-            speak("no problem, i think you need some advice so i give")
\ No newline at end of file
+            speak("no problem, i think you need some advice so i give", priority=CHAT)
\ No newline at end of file
@@ -1,6 +1,9 @@
+import os
 from FUNCTION.JARVIS_SPEAK.speak import *
 from BRAIN.MAIN_BRAIN.GOOGLE_BIG_DATA.google_big_data import *
 from BRAIN.MAIN_BRAIN.GOOGLE_SMALL_DATA.google_small_data import *
+from FUNCTION.TURN_TRACE.turn_trace import span, annotate, BRAIN as BRAIN_STAGE
+from FUNCTION.ANSWER_CACHE.answer_cache import cached_answer
 def load_qa_data(file_path):
     qa_dict = {}
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -15,21 +18,30 @@ def load_qa_data(file_path):
                 qa_dict[q] = a
     return qa_dict
 
-qa_file_path = r"C:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\BRAIN_DATA\QNA_DATA\qna.txt" #give the correct path to your qa_data.txt file
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+qa_file_path = os.path.join(PROJECT_ROOT, "DATA", "BRAIN_DATA", "QNA_DATA", "qna.txt")
 qa_dict = load_qa_data(qa_file_path)
 
 def brain_cmd(text):
-    if "jarvis" in text:
-        text = text.replace("jarvis", "")
-        text = text.strip()
-        if text in qa_dict:
-            ans = qa_dict[text]
-            return ans
-        elif "define" in text:
-            ans = deep_search(text)
-            return ans
+    with span(BRAIN_STAGE):
+        if "jarvis" in text:
+            text = text.replace("jarvis", "")
+            text = text.strip()
+            # The answer source is traced so time to first word can be compared per source
+            if text in qa_dict:
+                annotate(answer_source="qna")
+                ans = qa_dict[text]
+                return ans
+            elif "define" in text:
+                annotate(answer_source="deep_search")
+                # Repeat questions are answered from the cache, not the web
+                ans, tier = cached_answer("deep_search", text, deep_search)
+                annotate(answer_cache=tier)
+                return ans
+            else:
+                annotate(answer_source="search_brain")
+                ans, tier = cached_answer("search_brain", text, search_brain)
+                annotate(answer_cache=tier)
+                return ans
         else:
-            ans = search_brain(text)
-            return ans
-    else:
-        return "I didn't hear Jarvis in your command."
+            return "I didn't hear Jarvis in your command."
@@ -105,95 +105,70 @@
 #     x = summary(y)
 #     return x
 
-from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 import re
-from selenium.webdriver.support.wait import WebDriverWait
+from itertools import islice
+from BRAIN.MAIN_BRAIN.GOOGLE_SMALL_DATA.google_small_data import browser_results
+from FUNCTION.ANSWER_CACHE.answer_cache import NoAnswer
+from FUNCTION.BROWSER_POOL.browser_pool import browser
+from FUNCTION.HTTP_SEARCH.http_search import RESULT_SELECTORS, SEARCH_BACKEND, fetch_results, texts_for
 
 
-def search_and_extract(text):
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-
-        # Add options to avoid detection and CAPTCHA
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-
-        # Set the path to your ChromeDriver executable
-        chrome_driver_path = r'c:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\JARVIS_DRIVER\chromedriver.exe'
-
-        chrome_service = Service(chrome_driver_path)
-        driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
-
-        # Execute script to hide automation indicators
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-        # Open Google in the browser
-        driver.get("https://www.google.com")
-        # Find the search box using its name attribute value
-        search_box = driver.find_element("name", "q")
-
-        # Type the search query
-        search_query = text
-        search_box.send_keys(search_query)
-
-        # Submit the form
-        search_box.send_keys(Keys.RETURN)
-
-        # Wait for search results to load properly
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "#search")))
-
-        # Find multiple search results for longer response
-        all_results = []
-        selectors = ['.VwiC3b', '.s3v9rd', '.IsZvec', 'div.g', '[data-ved]']
-        
-        for selector in selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements[:3]:  # Get first 3 results
-                    text = element.text.strip()
-                    if text and len(text) > 20:
-                        all_results.append(text)
-                if all_results:
-                    break
-            except:
-                continue
-
-        if not all_results:
-            return "Could not extract data from search results."
-
-        # Combine results and clean
-        combined_text = ' '.join(all_results)
-        combined_text = combined_text.replace("Featured snippet from the web", "")
-        combined_text = combined_text.replace("About this result", "")
-        combined_text = combined_text.replace("People also ask", "")
-
-        # Split into sentences and take more for 9 lines
-        sentences = re.split(r'(?<=[.!?])\s+', combined_text)
-        meaningful_sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
-        result_text = '. '.join(meaningful_sentences[:15])  # More sentences for longer response
-        if not result_text.endswith('.'):
-            result_text += '.'
-
-        driver.quit()
-        return result_text
+def search_and_extract(text, backend=None):
+    """The first three Google snippets for text, up to 15 sentences.
 
+    backend is "browser" (a pooled Chrome) or "http" (no browser);
+    JARVIS_SEARCH picks the default.
+    """
+    try:
+        if (backend or SEARCH_BACKEND) == "http":
+            all_results = top_snippets(texts_for(fetch_results(text, enough=3)))
+        else:
+            # A warm pooled Chrome, already on google.com
+            with browser() as driver:
+                all_results = top_snippets(browser_results(driver, text))
     except Exception as e:
         print("An error occurred:", e)
-        if 'driver' in locals():
-            driver.quit()
         return None
+    return combine_results(all_results)
+
+
+def top_snippets(texts_for_selector):
+    # Find multiple search results for longer response
+    all_results = []
+    selectors = RESULT_SELECTORS
+
+    for selector in selectors:
+        try:
+            for text in islice(texts_for_selector(selector), 3):  # Get first 3 results
+                text = text.strip()
+                if text and len(text) > 20:
+                    all_results.append(text)
+            if all_results:
+                break
+        except:
+            continue
+    return all_results
+
+
+def combine_results(all_results):
+    if not all_results:
+        return NoAnswer("Could not extract data from search results.")
+
+    # Combine results and clean
+    combined_text = ' '.join(all_results)
+    combined_text = combined_text.replace("Featured snippet from the web", "")
+    combined_text = combined_text.replace("About this result", "")
+    combined_text = combined_text.replace("People also ask", "")
+
+    # Split into sentences and take more for 9 lines
+    sentences = re.split(r'(?<=[.!?])\s+', combined_text)
+    meaningful_sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+    result_text = '. '.join(meaningful_sentences[:15])  # More sentences for longer response
+    if not result_text.endswith('.'):
+        result_text += '.'
+
+    return result_text
 
 
 from sumy.parsers.plaintext import PlaintextParser
@@ -214,11 +189,11 @@ def summary(text):
     return summary_result
 
 
-def deep_search(text):
+def deep_search(text, backend=None):
     x = text
-    y = search_and_extract(x)
-    if y is None:
-        return "Error: Could not extract data from search results."
+    y = search_and_extract(x, backend)
+    if y is None or isinstance(y, NoAnswer):
+        return NoAnswer("Error: Could not extract data from search results.")
     x = summary(y)
     return x
 
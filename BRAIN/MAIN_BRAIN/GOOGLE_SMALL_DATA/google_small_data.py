@@ -1,118 +1,123 @@
 
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from FUNCTION.ANSWER_CACHE.answer_cache import NoAnswer
+from FUNCTION.BROWSER_POOL.browser_pool import browser
+from FUNCTION.HTTP_SEARCH.http_search import RESULT_SELECTORS, SEARCH_BACKEND, fetch_results, texts_for
 
 
-def search_brain(text):
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-
-        # Add options to avoid detection and CAPTCHA
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+def search_brain(text, backend=None):
+    """The first useful Google snippet for text, trimmed to about five sentences.
 
-        # Set the path to your ChromeDriver executable
-        chrome_driver_path = r'c:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\JARVIS_DRIVER\chromedriver.exe'
+    backend is "browser" (a pooled Chrome) or "http" (no browser);
+    JARVIS_SEARCH picks the default.
+    """
+    try:
+        if (backend or SEARCH_BACKEND) == "http":
+            result_text = first_snippet(texts_for(fetch_results(text, enough=1)))
+        else:
+            # A warm pooled Chrome, already on google.com
+            with browser() as driver:
+                result_text = first_snippet(browser_results(driver, text))
+    except Exception as e:
+        print("An error occurred:", e)
+        return NoAnswer("I encountered an error while searching. Please try again.")
+    return clean_result(result_text)
 
-        chrome_service = Service(chrome_driver_path)
-        driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
 
-        # Execute script to hide automation indicators
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+def browser_results(driver, text):
+    """Search for text and return selector -> element texts, read lazily from the page."""
+    # Selenium is only needed for this backend
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
+    if not driver.current_url.startswith("https://www.google."):
         # Open Google in the browser
         driver.get("https://www.google.com")
 
-        # Find the search box using its name attribute value
-        search_box = driver.find_element("name", "q")
-
-        # Type the search query
-        search_query = text
-        search_box.send_keys(search_query)
-
-        # Submit the form
-        search_box.send_keys(Keys.RETURN)
-
-        # Wait for search results to load properly
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "#search")))
-
-        # Additional wait to ensure content is fully loaded
-        time.sleep(3)
-
-        # Find search results with updated selectors
-        result_text = ""
-        selectors = ['.VwiC3b', '.s3v9rd', '.IsZvec', 'div.g', '[data-ved]']
-        
-        for selector in selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    text = element.text.strip()
-                    if text and len(text) > 20:
-                        result_text = text
-                        break
-                if result_text:
-                    break
-            except:
-                continue
-
-        if not result_text:
-            driver.quit()
-            return "I couldn't find any search results for that query."
-
-        # Clean and process the text
-        result_text = result_text.strip()
-
-        # Remove common Google UI elements
-        result_text = result_text.replace("Featured snippet from the web", "")
-        result_text = result_text.replace("About this result", "")
-        result_text = result_text.replace("People also ask", "")
-
-        # Split into sentences and clean
-        sentences = re.split(r'(?<=[.!?])\s+', result_text)
-
-        # Filter out very short sentences and URLs
-        meaningful_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if (len(sentence) > 10 and
-                    not re.search(r'\b(?:https?://|www\.)\S+\b', sentence) and
-                    not sentence.lower().startswith(('›', '...', 'more', 'see', 'view'))):
-                meaningful_sentences.append(sentence)
-
-        # Take first 5-6 meaningful sentences for medium responses
-        if meaningful_sentences:
-            result_text = '. '.join(meaningful_sentences[:5])
-            if not result_text.endswith('.'):
-                result_text += '.'
-        else:
-            # Fallback: use raw text but clean it
-            result_text = re.sub(r'\s+', ' ', result_text)
-            result_text = result_text[:350] + '...' if len(result_text) > 350 else result_text
+    # Find the search box using its name attribute value
+    search_box = driver.find_element("name", "q")
 
-        # Final check for meaningful content
-        if not result_text.strip() or len(result_text.strip()) < 20:
-            result_text = "I found search results but couldn't extract meaningful content. Please try a different query."
+    # Type the search query
+    search_query = text
+    search_box.clear()
+    search_box.send_keys(search_query)
 
-        driver.quit()
-        return result_text
+    # Submit the form
+    search_box.send_keys(Keys.RETURN)
 
-    except Exception as e:
-        print("An error occurred:", e)
-        if 'driver' in locals():
-            driver.quit()
-        return "I encountered an error while searching. Please try again."
+    # Wait for search results to load properly
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "#search")))
+
+    # Then only as long as it takes for the first snippet to appear
+    try:
+        WebDriverWait(driver, 3).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(RESULT_SELECTORS[:4]))))
+    except TimeoutException:
+        pass
+
+    return lambda selector: (element.text for element in driver.find_elements(By.CSS_SELECTOR, selector))
+
+
+def first_snippet(texts_for_selector):
+    # Find search results with updated selectors
+    result_text = ""
+    selectors = RESULT_SELECTORS
+
+    for selector in selectors:
+        try:
+            for text in texts_for_selector(selector):
+                text = text.strip()
+                if text and len(text) > 20:
+                    result_text = text
+                    break
+            if result_text:
+                break
+        except:
+            continue
+    return result_text
+
+
+def clean_result(result_text):
+    """Search-result text cut down to a spoken answer (same cleanup for both backends)."""
+    if not result_text:
+        return NoAnswer("I couldn't find any search results for that query.")
+
+    # Clean and process the text
+    result_text = result_text.strip()
+
+    # Remove common Google UI elements
+    result_text = result_text.replace("Featured snippet from the web", "")
+    result_text = result_text.replace("About this result", "")
+    result_text = result_text.replace("People also ask", "")
+
+    # Split into sentences and clean
+    sentences = re.split(r'(?<=[.!?])\s+', result_text)
+
+    # Filter out very short sentences and URLs
+    meaningful_sentences = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if (len(sentence) > 10 and
+                not re.search(r'\b(?:https?://|www\.)\S+\b', sentence) and
+                not sentence.lower().startswith(('›', '...', 'more', 'see', 'view'))):
+            meaningful_sentences.append(sentence)
+
+    # Take first 5-6 meaningful sentences for medium responses
+    if meaningful_sentences:
+        result_text = '. '.join(meaningful_sentences[:5])
+        if not result_text.endswith('.'):
+            result_text += '.'
+    else:
+        # Fallback: use raw text but clean it
+        result_text = re.sub(r'\s+', ' ', result_text)
+        result_text = result_text[:350] + '...' if len(result_text) > 350 else result_text
+
+    # Final check for meaningful content
+    if not result_text.strip() or len(result_text.strip()) < 20:
+        result_text = NoAnswer("I found search results but couldn't extract meaningful content. Please try a different query.")
+
+    return result_text
 
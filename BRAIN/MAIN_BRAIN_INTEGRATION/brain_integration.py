@@ -0,0 +1,29 @@
+import random
+from DATA.JARVIS_DLG_DATASET.DLG import bye_key_word, wake_key_word, res_bye
+from FUNCTION.INTENT_ROUTER.intent_router import EXACT, TIER_GREETING, TIER_DIALOG, TIER_BRAIN
+from FUNCTION.SKILL_REGISTRY.skill_registry import skill, register, resolve
+
+# Heavy modules, imported only when one of their skills fires
+BRAIN = "BRAIN.MAIN_BRAIN.BRAIN.brain"
+WELCOME = "BRAIN.ACTIVITY.GREETINGS.WELCOME_GREETINGS.welcome_greetings"
+WISH = "BRAIN.ACTIVITY.GREETINGS.WISH_GREETINGS.wish_greetings"
+SPEAK = "FUNCTION.JARVIS_SPEAK.speak"
+
+
+register("greeting", ("good morning", "good afternoon", "good evening", "good night"), WISH + ":wish", tier=TIER_GREETING)
+
+
+@skill("goodbye", bye_key_word, SPEAK, match=EXACT, tier=TIER_DIALOG)
+def say_goodbye(mod):
+    x = random.choice(res_bye)
+    mod.speak(x)
+
+
+register("wake", wake_key_word, WELCOME + ":welcome", match=EXACT, tier=TIER_DIALOG)
+
+
+# brain_cmd() strips "jarvis" itself, so it gets the whole utterance
+@skill("brain", ("jarvis",), BRAIN, slot=lambda text, phrase: text, tier=TIER_BRAIN)
+def ask_brain(mod, text):
+    response = mod.brain_cmd(text)
+    resolve(SPEAK + ":speak")(response)
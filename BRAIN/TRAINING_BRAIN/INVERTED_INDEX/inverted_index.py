@@ -0,0 +1,324 @@
+# Inverted index with BM25 scoring for the QnA retriever.
+# Postings are kept per term, sorted by document, with each posting's BM25
+# contribution ("impact") computed at build time, so a question only reads
+# the postings of its own terms instead of scoring every stored question.
+#
+# search() goes term at a time, from the term that can add the most to a
+# score down to the least (MaxScore). Once the terms still to come cannot
+# lift an unseen document past the current k-th best score, the long
+# postings lists of the common terms are no longer read: the documents
+# already seen are looked up in them by binary search. Once the postings
+# read pass documents / DENSE_FRACTION, scores are added into a dense
+# buffer instead of merged into a sorted list, so a question made only of
+# common words costs one pass per postings list.
+#   python -m BRAIN.TRAINING_BRAIN.INVERTED_INDEX.inverted_index [MAX_DOCS]   benchmark
+import json
+import os
+import struct
+import sys
+import time
+import zipfile
+from array import array
+from collections import Counter
+
+import numpy as np
+
+K1 = 1.2
+B = 0.75
+DENSE_FRACTION = 64          # past documents / 64 postings, scores go into a dense buffer
+LOOKUP_COST = 8              # binary searches cost about this many sequential adds
+
+
+def bm25_idf(df, documents):
+    """Never negative, unlike the original BM25 idf for terms in over half the documents."""
+    return np.log1p((documents - df + 0.5) / (df + 0.5))
+
+
+def load_npz_mmap(path):
+    """The arrays of an uncompressed .npz, memory-mapped instead of read."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf:
+        members = zf.infolist()
+    if any(m.compress_type != zipfile.ZIP_STORED for m in members):
+        with np.load(path) as npz:
+            return {name: npz[name] for name in npz.files}
+    with open(path, 'rb') as f:
+        for member in members:
+            # Local file header: 30 bytes, then the name and extra field, then the .npy file
+            f.seek(member.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", f.read(4))
+            f.seek(member.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            name = member.filename[:-4] if member.filename.endswith(".npy") else member.filename
+            if not int(np.prod(shape)):
+                arrays[name] = np.empty(shape, dtype)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                     order='F' if fortran else 'C')
+    return arrays
+
+
+class InvertedIndex:
+    """BM25 postings: for term t, docs[indptr[t]:indptr[t + 1]] and their impacts."""
+
+    def __init__(self, indptr, docs, impacts, max_impact, documents, vocabulary=None, k1=K1, b=B):
+        self.indptr = indptr
+        self.docs = docs
+        self.impacts = impacts
+        self.max_impact = max_impact         # upper bound of each term's contribution
+        self.documents = documents
+        self.vocabulary = vocabulary         # term of each id, or None for id-only indexes
+        self.term_ids = {term: i for i, term in enumerate(vocabulary)} if vocabulary is not None else None
+        self.k1 = k1
+        self.b = b
+
+    # ---- building ----
+    @classmethod
+    def from_postings(cls, doc_of_token, term_of_token, documents, terms, vocabulary=None, k1=K1, b=B):
+        """Index from two parallel arrays: the document and the term id of every token."""
+        doc_of_token = np.asarray(doc_of_token, dtype=np.int64)
+        term_of_token = np.asarray(term_of_token, dtype=np.int64)
+        doc_len = np.bincount(doc_of_token, minlength=documents).astype(np.float32)
+        avg_len = float(doc_len.mean()) if documents else 1.0
+        # Sorted by term, then document: each term's postings come out in document order
+        keys, tf = np.unique(term_of_token * documents + doc_of_token, return_counts=True)
+        del doc_of_token, term_of_token
+        post_terms = (keys // documents).astype(np.int32)
+        post_docs = (keys % documents).astype(np.int32)
+        del keys
+        df = np.bincount(post_terms, minlength=terms)
+        indptr = np.zeros(terms + 1, dtype=np.int64)
+        np.cumsum(df, out=indptr[1:])
+        idf = bm25_idf(df.astype(np.float32), documents).astype(np.float32)
+        tf = tf.astype(np.float32)
+        norm = k1 * (1.0 - b + b * doc_len[post_docs] / max(avg_len, 1e-9))
+        impacts = idf[post_terms] * tf * (k1 + 1.0) / (tf + norm)
+        del post_terms, tf, norm
+        max_impact = np.zeros(terms, dtype=np.float32)
+        used = df > 0
+        if used.any():
+            max_impact[used] = np.maximum.reduceat(impacts, indptr[:-1][used])
+        return cls(indptr, post_docs, impacts.astype(np.float32), max_impact, documents, vocabulary, k1, b)
+
+    @classmethod
+    def build(cls, token_lists, k1=K1, b=B):
+        """Index an iterable of token lists, one per document."""
+        term_ids = {}
+        docs, terms = array('i'), array('i')
+        documents = 0
+        for doc, tokens in enumerate(token_lists):
+            for token in tokens:
+                docs.append(doc)
+                terms.append(term_ids.setdefault(token, len(term_ids)))
+            documents = doc + 1
+        return cls.from_postings(np.frombuffer(docs, dtype=np.int32), np.frombuffer(terms, dtype=np.int32),
+                                 documents, len(term_ids), list(term_ids), k1, b)
+
+    # ---- persistence ----
+    def save(self, matrix_path, meta_path, extra_arrays=None, extra_meta=None):
+        """Uncompressed npz (so load() can memory-map it) plus JSON; both replaced atomically."""
+        arrays = {"indptr": self.indptr, "docs": self.docs, "impacts": self.impacts,
+                  "max_impact": self.max_impact, **(extra_arrays or {})}
+        meta = {"documents": self.documents, "k1": self.k1, "b": self.b,
+                "vocabulary": self.vocabulary, **(extra_meta or {})}
+        np.savez(matrix_path + ".tmp.npz", **arrays)
+        with open(meta_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(matrix_path + ".tmp.npz", matrix_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    @classmethod
+    def load(cls, matrix_path, meta_path):
+        """(index, meta, arrays) with the postings memory-mapped."""
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = load_npz_mmap(matrix_path)
+        index = cls(arrays["indptr"], arrays["docs"], arrays["impacts"], arrays["max_impact"],
+                    meta["documents"], meta.get("vocabulary"), meta.get("k1", K1), meta.get("b", B))
+        return index, meta, arrays
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.indptr, self.docs, self.impacts, self.max_impact))
+
+    # ---- search ----
+    def lookup(self, tokens):
+        """Term ids of the tokens that are in the vocabulary."""
+        return [self.term_ids[t] for t in tokens if t in self.term_ids]
+
+    def search(self, terms, k=10):
+        """Top k [(score, doc)] for a list of term ids, best first; exact BM25 up to ties."""
+        counts = Counter(t for t in terms if 0 <= t < len(self.max_impact))
+        if not counts:
+            return []
+        qterms = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        bounds = self.max_impact[qterms] * weights
+        order = np.argsort(-bounds, kind='stable')
+        qterms, weights, bounds = qterms[order], weights[order], bounds[order]
+        # Most the terms after each one can still add to any document
+        rest = np.append(np.cumsum(bounds[::-1])[::-1][1:], 0.0)
+
+        acc_docs = np.empty(0, dtype=np.int32)
+        acc_scores = np.empty(0, dtype=np.float32)
+        dense = None            # a score per document, once the postings read are long
+        threshold = 0.0         # never above the final k-th best score
+        open_to_new = True
+        for term, weight, left in zip(qterms, weights, rest):
+            start, end = int(self.indptr[term]), int(self.indptr[term + 1])
+            if start == end:
+                continue
+            postings = self.docs[start:end]
+            if open_to_new and dense is None and len(acc_docs) + end - start > self.documents // DENSE_FRACTION:
+                dense = np.zeros(self.documents, dtype=np.float32)
+                dense[acc_docs] = acc_scores
+            if dense is not None:
+                if open_to_new or len(acc_docs) * LOOKUP_COST > end - start:
+                    # A term has at most one posting per document
+                    dense[postings] += self.impacts[start:end] * weight
+                else:
+                    pos = np.searchsorted(postings, acc_docs)
+                    hit = pos < len(postings)
+                    hit[hit] = postings[pos[hit]] == acc_docs[hit]
+                    dense[acc_docs[hit]] += self.impacts[start:end][pos[hit]] * weight
+                if open_to_new:
+                    touched = dense[postings]
+                    if len(touched) >= k:
+                        threshold = max(threshold, float(np.partition(touched, len(touched) - k)[len(touched) - k]))
+                    if left >= threshold:
+                        continue
+                    # Closed to new documents: only those that can still make the top k are kept
+                    open_to_new = False
+                    acc_docs = np.flatnonzero(dense >= threshold - left).astype(np.int32)
+                acc_scores = dense[acc_docs]
+            elif open_to_new:
+                docs = np.asarray(postings)
+                impacts = np.asarray(self.impacts[start:end]) * weight
+                if not len(acc_docs):
+                    acc_docs, acc_scores = docs.copy(), impacts.astype(np.float32)
+                else:
+                    # Both sides sorted by document: add to the seen ones, insert the new ones in order
+                    pos = np.searchsorted(acc_docs, docs)
+                    seen = pos < len(acc_docs)
+                    seen[seen] = acc_docs[pos[seen]] == docs[seen]
+                    acc_scores[pos[seen]] += impacts[seen]
+                    new = ~seen
+                    acc_docs = np.insert(acc_docs, pos[new], docs[new])
+                    acc_scores = np.insert(acc_scores, pos[new], impacts[new])
+            else:
+                # Only documents already seen can still make the top k
+                pos = np.searchsorted(postings, acc_docs)
+                hit = pos < len(postings)
+                hit[hit] = postings[pos[hit]] == acc_docs[hit]
+                acc_scores[hit] += self.impacts[start:end][pos[hit]] * weight
+            # No need for the k-th best score while the rest could still lift anything past the best,
+            # nor after the last term: _top() picks the k best anyway
+            if len(acc_scores) < k or not left or (open_to_new and left >= acc_scores.max()):
+                continue
+            threshold = max(threshold, float(np.partition(acc_scores, len(acc_scores) - k)[len(acc_scores) - k]))
+            if open_to_new and left < threshold:
+                open_to_new = False
+            if not open_to_new:
+                keep = acc_scores + left >= threshold
+                if not keep.all():
+                    acc_docs, acc_scores = acc_docs[keep], acc_scores[keep]
+        if dense is not None:
+            if open_to_new:
+                acc_docs = np.flatnonzero(dense).astype(np.int32)
+            acc_scores = dense[acc_docs]
+        return self._top(acc_docs, acc_scores, k)
+
+    def search_exhaustive(self, terms, k=10):
+        """search() without pruning, into a dense score per document (the reference)."""
+        scores = np.zeros(self.documents, dtype=np.float32)
+        for term, weight in Counter(t for t in terms if 0 <= t < len(self.max_impact)).items():
+            start, end = int(self.indptr[term]), int(self.indptr[term + 1])
+            # A term has at most one posting per document
+            scores[self.docs[start:end]] += self.impacts[start:end] * weight
+        matched = np.flatnonzero(scores)
+        return self._top(matched.astype(np.int32), scores[matched], k)
+
+    @staticmethod
+    def _top(docs, scores, k):
+        # Partial selection of the k best, then only those k are sorted
+        if not len(docs):
+            return []
+        n = min(k, len(docs))
+        best = np.argpartition(-scores, n - 1)[:n]
+        best = best[np.lexsort((docs[best], -scores[best]))]
+        return [(float(scores[i]), int(docs[i])) for i in best]
+
+
+# =============================
+# Benchmark
+# =============================
+def synthetic_corpus(documents, vocabulary=100_000, seed=7):
+    """(doc_of_token, term_of_token): 4-12 Zipf-distributed terms per document, like short questions."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(4, 13, size=documents)
+    ranks = np.arange(1, vocabulary + 1, dtype=np.float64)
+    cdf = np.cumsum(ranks ** -1.07)
+    cdf /= cdf[-1]
+    terms = np.searchsorted(cdf, rng.random(int(lengths.sum()))).astype(np.int32)
+    docs = np.repeat(np.arange(documents, dtype=np.int32), lengths)
+    return docs, terms, lengths
+
+
+def synthetic_queries(docs, terms, lengths, count, seed=11):
+    """Term ids of count questions: 2-5 words of a stored question plus, half the time, a common word."""
+    rng = np.random.default_rng(seed)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    queries = []
+    for doc in rng.integers(0, len(lengths), size=count):
+        words = terms[starts[doc]:starts[doc] + lengths[doc]]
+        picked = rng.choice(words, size=min(len(words), int(rng.integers(2, 6))), replace=False).tolist()
+        if rng.random() < 0.5:
+            picked.append(int(rng.integers(0, 20)))
+        queries.append(picked)
+    return queries
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000, 5_000_000), queries=300, k=10):
+    """p50/p99 query latency and index memory, MaxScore against scoring every document.
+
+    MaxScore is timed for the top k and for the single best answer (get_answer()).
+    """
+    def percentile(values, q):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(q / 100.0 * len(values)))]
+
+    print(f"{'questions':>10} {'postings':>11} {'build s':>8} {'index MB':>9}   p50 / p99 ms: "
+          f"{'exhaustive':>15} {f'maxscore k={k}':>15} {'maxscore k=1':>15} {'same top-k':>11}")
+    for size in sizes:
+        docs, terms, lengths = synthetic_corpus(size)
+        started = time.perf_counter()
+        index = InvertedIndex.from_postings(docs, terms, size, int(terms.max()) + 1)
+        build_s = time.perf_counter() - started
+        qs = synthetic_queries(docs, terms, lengths, queries)
+        del docs, terms
+        full, pruned, best, same = [], [], [], 0
+        for q in qs:
+            t0 = time.perf_counter()
+            reference = index.search_exhaustive(q, k)
+            t1 = time.perf_counter()
+            hits = index.search(q, k)
+            t2 = time.perf_counter()
+            top = index.search(q, 1)
+            t3 = time.perf_counter()
+            full.append((t1 - t0) * 1000)
+            pruned.append((t2 - t1) * 1000)
+            best.append((t3 - t2) * 1000)
+            same += (np.allclose([s for s, _ in hits], [s for s, _ in reference], rtol=1e-5)
+                     and np.isclose(top[0][0], reference[0][0], rtol=1e-5))
+        row = "".join(f" {percentile(t, 50):>7.2f} /{percentile(t, 99):>6.2f}" for t in (full, pruned, best))
+        print(f"{size:>10,} {len(index.docs):>11,} {build_s:>8.2f} {index.nbytes() / 2 ** 20:>9.1f}"
+              f"{'':>14}{row} {same / len(qs):>11.0%}")
+        del index
+
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    benchmark(tuple(s for s in (10_000, 100_000, 1_000_000, 5_000_000) if limit is None or s <= limit))
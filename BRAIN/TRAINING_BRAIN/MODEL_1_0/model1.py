@@ -1,10 +1,33 @@
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from FUNCTION.JARVIS_SPEAK.speak import speak # Make sure your Mouth.py has a valid speak() function
+# BM25 retriever over qna.txt.
+# The questions are indexed once into an inverted index (see
+# BRAIN/TRAINING_BRAIN/INVERTED_INDEX) saved next to the dataset: the
+# vocabulary as JSON, the postings and the byte offset of every answer in
+# qna.txt as an uncompressed npz that is memory-mapped at startup. The
+# index is rebuilt only when the SHA-256 of qna.txt changes; a question
+# only reads the postings of its own terms, so large FAQ files load too.
+#   python -m BRAIN.TRAINING_BRAIN.MODEL_1_0.model1          benchmark
+#   python -m BRAIN.TRAINING_BRAIN.MODEL_1_0.model1 build    rebuild the index
+import functools
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+from BRAIN.TRAINING_BRAIN.INVERTED_INDEX.inverted_index import InvertedIndex
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+DATASET_PATH = os.path.join(PROJECT_ROOT, "DATA", "BRAIN_DATA", "QNA_DATA", "qna.txt")
+INDEX_DIR = os.path.join(PROJECT_ROOT, "DATA", "BRAIN_DATA", "QNA_INDEX")
+INDEX_VERSION = 2            # bump when preprocess_text() changes: old indexes are rebuilt
+
+# Terms of preprocessed text (TfidfVectorizer's default tokenizer)
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
 
 # Load your Q&A dataset from a text file
 def load_dataset(file_path):
@@ -14,40 +37,191 @@ def load_dataset(file_path):
         dataset = [{'question': q.strip(), 'answer': a.strip()} for q, a in qna_pairs]
     return dataset
 
+
+# Stopwords and the stemmer are built once, stems remembered per token
+@functools.lru_cache(maxsize=None)
+def stop_words():
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+@functools.lru_cache(maxsize=None)
+def stemmer():
+    from nltk.stem import PorterStemmer
+    return PorterStemmer()
+
+
+@functools.lru_cache(maxsize=65536)
+def stem(token):
+    return stemmer().stem(token)
+
+
 # Preprocess the text
 def preprocess_text(text):
-    stop_words = set(stopwords.words('english'))
-    ps = PorterStemmer()
+    from nltk.tokenize import word_tokenize
+    stop = stop_words()
     tokens = word_tokenize(text.lower(), preserve_line=True)
 
-    tokens = [ps.stem(token) for token in tokens if token.isalnum() and token not in stop_words]
+    tokens = [stem(token) for token in tokens if token.isalnum() and token not in stop]
     return ' '.join(tokens)
 
+
 # Train the TF-IDF vectorizer
 def train_tfidf_vectorizer(dataset):
+    from sklearn.feature_extraction.text import TfidfVectorizer
     corpus = [preprocess_text(qa['question']) for qa in dataset]
     vectorizer = TfidfVectorizer()
     X = vectorizer.fit_transform(corpus)
     return vectorizer, X
 
-# Retrieve the most relevant answer
-def get_answer(question, vectorizer, X, dataset):
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return f"{digest.hexdigest()}-v{INDEX_VERSION}"
+
+
+# =============================
+# Persisted index
+# =============================
+def index_paths(index_dir=INDEX_DIR):
+    return os.path.join(index_dir, "qna_index.json"), os.path.join(index_dir, "qna_index.npz")
+
+
+def read_questions(dataset_path):
+    """(questions, byte offset of each answer) of the lines with a ':' in qna.txt."""
+    questions, offsets = [], []
+    offset = 0
+    with open(dataset_path, 'rb') as f:
+        for line in f:
+            colon = line.find(b':')
+            if colon >= 0:
+                questions.append(line[:colon].decode('utf-8').strip())
+                offsets.append(offset + colon + 1)
+            offset += len(line)
+    return questions, np.asarray(offsets, dtype=np.int64)
+
+
+def build_index(dataset_path=DATASET_PATH, index_dir=INDEX_DIR):
+    """Index the questions of dataset_path and save the index; returns it loaded."""
+    started = time.perf_counter()
+    source_hash = file_hash(dataset_path)
+    questions, offsets = read_questions(dataset_path)
+    index = InvertedIndex.build(TOKEN_PATTERN.findall(preprocess_text(q)) for q in questions)
+    os.makedirs(index_dir, exist_ok=True)
+    meta_path, matrix_path = index_paths(index_dir)
+    index.save(matrix_path, meta_path, extra_arrays={"answer_offsets": offsets},
+               extra_meta={"source_hash": source_hash})
+    if DEBUG:
+        print(f"[Model1] indexed {len(questions)} questions, {len(index.vocabulary)} terms "
+              f"in {time.perf_counter() - started:.2f}s")
+    return QnAIndex(*InvertedIndex.load(matrix_path, meta_path), dataset_path)
+
+
+class QnAIndex:
+    """The BM25 index of the questions; answers are read from qna.txt when chosen."""
+
+    def __init__(self, index, meta, arrays, dataset_path=DATASET_PATH):
+        self.index = index
+        self.source_hash = meta["source_hash"]
+        self.answer_offsets = arrays["answer_offsets"]
+        self.dataset_path = dataset_path
+
+    def best(self, text):
+        """Row of the question that best matches the preprocessed text, or None."""
+        hits = self.index.search(self.index.lookup(TOKEN_PATTERN.findall(text)), k=1)
+        # No shared term: nothing here answers it
+        return hits[0][1] if hits else None
+
+    def answer(self, row):
+        with open(self.dataset_path, 'rb') as f:
+            f.seek(int(self.answer_offsets[row]))
+            return f.readline().decode('utf-8').strip()
+
+
+def load_index(dataset_path=DATASET_PATH, index_dir=INDEX_DIR):
+    """The saved index, rebuilt first if it is missing or qna.txt has changed since."""
+    meta_path, matrix_path = index_paths(index_dir)
+    source_hash = file_hash(dataset_path)
+    try:
+        loaded = InvertedIndex.load(matrix_path, meta_path)
+        if loaded[1].get("source_hash") == source_hash:
+            return QnAIndex(*loaded, dataset_path)
+    except (OSError, ValueError, KeyError) as e:
+        if DEBUG:
+            print(f"[Model1] no saved index ({e})")
+    if DEBUG:
+        print("[Model1] qna.txt changed or not indexed yet; rebuilding")
+    return build_index(dataset_path, index_dir)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = load_index()
+    return _index
+
+
+# Retrieve the most relevant answer, None when no question shares a term with it
+def get_answer(question, index=None):
+    index = index or get_index()
     question = preprocess_text(question)
-    question_vec = vectorizer.transform([question])
-    similarities = cosine_similarity(question_vec, X)
-    best_match_index = similarities.argmax()
-    return dataset[best_match_index]['answer']
+    best_match_index = index.best(question)
+    if best_match_index is None:
+        return None
+    return index.answer(best_match_index)
+
 
 # Main function
 def mind(text):
-    # Replace 'your_dataset.txt' with the path to you Q&A dataset
-    dataset_path = r"C:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\BRAIN_DATA\QNA_DATA\qna.txt"  # Make sure this file exists
-    dataset = load_dataset(dataset_path)
-
-    vectorizer, X = train_tfidf_vectorizer(dataset)
+    from FUNCTION.JARVIS_SPEAK.speak import speak
     user_question = text
-    answer = get_answer(user_question, vectorizer, X, dataset)
+    answer = get_answer(user_question)
+    if answer is None:
+        # Not in qna.txt: ask the web brain, as brain_cmd() does
+        from BRAIN.MAIN_BRAIN.GOOGLE_SMALL_DATA.google_small_data import search_brain
+        from FUNCTION.ANSWER_CACHE.answer_cache import cached_answer
+        answer, _ = cached_answer("search_brain", user_question, search_brain)
     speak(answer)
+    return answer
+
+
+def benchmark(rounds=200):
+    """Per-question time of the old fit-every-call path against the saved index."""
+    from sklearn.metrics.pairwise import cosine_similarity
+    dataset = load_dataset(DATASET_PATH)
+    questions = [qa['question'] for qa in dataset]
+
+    started = time.perf_counter()
+    for question in questions[:20]:
+        dataset = load_dataset(DATASET_PATH)
+        vectorizer, X = train_tfidf_vectorizer(dataset)
+        similarities = cosine_similarity(vectorizer.transform([preprocess_text(question)]), X)
+        dataset[similarities.argmax()]['answer']
+    refit_ms = (time.perf_counter() - started) / min(20, len(questions)) * 1000
+
+    started = time.perf_counter()
+    index = load_index()
+    load_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    correct = 0
+    for i in range(rounds):
+        qa = dataset[i % len(dataset)]
+        correct += get_answer(qa['question'], index) == qa['answer']
+    query_us = (time.perf_counter() - started) / rounds * 1e6
+    print(f"refit per call {refit_ms:8.2f} ms   load saved index {load_ms:6.2f} ms   "
+          f"query {query_us:7.1f} us   ({correct}/{rounds} questions find their own answer)")
+
 
-x = mind("hello")
-print(x)
\ No newline at end of file
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["build"]:
+        build_index()
+    else:
+        benchmark()
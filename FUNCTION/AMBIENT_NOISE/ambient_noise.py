@@ -0,0 +1,240 @@
+# Ambient noise tracking.
+# Calibrates once, then keeps the noise floor current from the quiet frames
+# on the mic bus, instead of each listen() spending a second in
+# adjust_for_ambient_noise(). listen.endpointer() seeds every turn's
+# Endpointer from the floor. It is saved to disk so a restart starts out
+# already tuned.
+import array
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from FUNCTION.MIC_BUS import mic_bus
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+PROFILE_PATH = os.path.join(PROJECT_ROOT, "DATA", "VOICE_PROFILE", "noise_profile.json")
+
+CALIBRATION_SECONDS = 1.0    # what adjust_for_ambient_noise() used per call
+SAVE_EVERY = 30.0            # seconds between profile writes
+FLOOR_DAMPING = 0.995        # per 20 ms quiet frame, about 4 s time constant
+SPEECH_RATIO = 1.5           # frames this far above the floor do not move it
+
+
+def frame_rms(frame):
+    """RMS of int16 samples, the same scale as audioop.rms / energy_threshold."""
+    samples = array.array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class NoiseTracker:
+    """Background noise floor shared by every listener."""
+
+    def __init__(self, path=PROFILE_PATH, bus=None):
+        self.path = path
+        self.bus = bus
+        self.noise_floor = None
+        self.updated = 0.0
+        self.quiet_frames = 0
+        self._thread = None
+        self._sub = None
+        self._last_save = 0.0
+
+    # ---- profile on disk ----
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                profile = json.load(f)
+            self.noise_floor = float(profile["noise_floor"])
+            self.updated = float(profile.get("updated", 0.0))
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def save(self):
+        if self.noise_floor is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"noise_floor": round(self.noise_floor, 2), "updated": time.time(),
+                           "rate": mic_bus.RATE, "frame_ms": mic_bus.FRAME_MS}, f)
+            os.replace(tmp, self.path)
+            self._last_save = time.monotonic()
+        except OSError as e:
+            print(f"[Noise] could not save {self.path}: {e}")
+
+    # ---- tracking ----
+    def calibrate(self, seconds=CALIBRATION_SECONDS):
+        """One-off measurement, only used when there is no saved profile."""
+        sub = (self.bus or mic_bus.get_bus()).subscribe("noise-calibration")
+        try:
+            levels = []
+            for _ in range(int(seconds * 1000 / mic_bus.FRAME_MS)):
+                frame = sub.read(timeout=seconds)
+                if not frame:
+                    break
+                levels.append(frame_rms(frame))
+        finally:
+            sub.close()
+        if levels:
+            self.noise_floor = sum(levels) / len(levels)
+            self.save()
+        return self.noise_floor
+
+    def update(self, rms):
+        """Feed one frame's RMS; only frames below speech level move the floor."""
+        if self.noise_floor is None:
+            self.noise_floor = rms
+            return
+        if rms >= self.noise_floor * SPEECH_RATIO:
+            return
+        self.noise_floor = FLOOR_DAMPING * self.noise_floor + (1 - FLOOR_DAMPING) * rms
+        self.quiet_frames += 1
+
+    def _run(self):
+        for frame in self._sub.frames():
+            self.update(frame_rms(frame))
+            if time.monotonic() - self._last_save > SAVE_EVERY:
+                self.save()
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        started = time.perf_counter()
+        if self.load():
+            source = "profile"
+        else:
+            self.calibrate()
+            source = "calibration"
+        if DEBUG and self.noise_floor is not None:
+            print(f"[Noise] floor {self.noise_floor:.0f} from {source} "
+                  f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+        self._last_save = time.monotonic()
+        self._sub = (self.bus or mic_bus.get_bus()).subscribe("noise")
+        self._thread = threading.Thread(target=self._run, name="noise-tracker", daemon=True)
+        self._thread.start()
+        return self
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = NoiseTracker().start()
+    return _tracker
+
+
+# =============================
+# Benchmark: wake word -> capture start
+# =============================
+class _Playback:
+    """A subscription that hands out recorded frames, at real time if asked."""
+
+    def __init__(self, frames, realtime):
+        self._frames = iter(frames)
+        self.realtime = realtime
+        self._due = time.monotonic()
+
+    def read(self, timeout=None):
+        if self.realtime:
+            # A mic frame is ready once FRAME_MS of audio has been captured
+            self._due += mic_bus.FRAME_MS / 1000.0
+            delay = self._due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return next(self._frames, b"")
+
+    def frames(self):
+        while True:
+            frame = self.read()
+            if not frame:
+                return
+            yield frame
+
+    def close(self):
+        pass
+
+
+class FrameBus:
+    """Stands in for the mic bus: every subscriber hears the frames from the start."""
+
+    def __init__(self, frames, realtime=True):
+        self.frames = list(frames)
+        self.realtime = realtime
+
+    def subscribe(self, name="consumer", preroll=0.0, after=None):
+        return _Playback(self.frames, self.realtime)
+
+
+def split_frames(pcm):
+    size = mic_bus.FRAME_BYTES
+    return [pcm[i:i + size] for i in range(0, len(pcm) - size + 1, size)]
+
+
+def room_noise():
+    """Frames of background noise from a synthetic VAD fixture (after its speech)."""
+    from FUNCTION.VOICE_ACTIVITY.voice_activity import synthetic_fixtures
+    _, pcm, speech_end = synthetic_fixtures()[1]
+    start = int((speech_end + 0.3) * mic_bus.RATE) * mic_bus.SAMPLE_WIDTH
+    return split_frames(pcm[start:])
+
+
+def _wake_to_capture(bus, noise_floor, profile_path):
+    from FUNCTION.VOICE_ACTIVITY.voice_activity import Endpointer
+    woke = time.perf_counter()
+    if noise_floor is None:
+        # Old listen(): a calibration pass before every capture
+        noise_floor = NoiseTracker(profile_path, bus=bus).calibrate()
+    endpointer = Endpointer(noise_rms=noise_floor)
+    sub = bus.subscribe("bench")
+    # Capture starts with the first frame the endpointer can classify
+    while endpointer.seen <= endpointer.init_frames:
+        endpointer.feed(sub.read())
+    return (time.perf_counter() - woke) * 1000.0
+
+
+def benchmark(frames=None, trials=5):
+    """Time from the wake word to the first classified frame, before and after.
+
+    frames is the room audio (FRAME_BYTES int16 frames), played back at
+    real time as the mic would deliver it; by default synthetic noise, so
+    no microphone or pyaudio is needed.
+    """
+    import tempfile
+    global DEBUG
+
+    frames = room_noise() if frames is None else frames
+    debug, DEBUG = DEBUG, False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "noise_profile.json")
+        tracker = NoiseTracker(path, bus=FrameBus(frames, realtime=False)).start()
+        tracker._thread.join()
+        bus = FrameBus(frames)
+        before = [_wake_to_capture(bus, None, path) for _ in range(trials)]
+        after = [_wake_to_capture(bus, tracker.noise_floor, path) for _ in range(trials)]
+    DEBUG = debug
+    print(f"tracked floor {tracker.noise_floor:.0f} over {len(frames)} frames")
+    for name, values in (("per-call calibration", before), ("tracked floor", after)):
+        values.sort()
+        print(f"{name:<24} median {values[len(values) // 2]:8.1f} ms   max {values[-1]:8.1f} ms")
+    return before, after
+
+
+if __name__ == "__main__":
+    if sys.argv[1:]:
+        from FUNCTION.VOICE_ACTIVITY.voice_activity import read_wav
+        benchmark(split_frames(read_wav(sys.argv[1])))
+    else:
+        benchmark()
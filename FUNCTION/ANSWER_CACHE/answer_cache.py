@@ -0,0 +1,279 @@
+# Answer cache for the web-backed brain.
+# search_brain() and deep_search() cost a Google round trip (and a summary
+# for deep_search) on every question, even one asked yesterday. brain_cmd()
+# now looks the question up here first: an in-memory LRU, then a SQLite
+# table on disk, keyed by the query with "jarvis" and filler words removed.
+#
+# Every entry has its own TTL (minutes for "latest news", a week for
+# definitions). An expired answer is still spoken at once while a
+# background thread fetches a fresh one for next time; only answers past
+# MAX_STALE_S wait for the web again. Failures are never cached.
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+CACHE_PATH = os.path.join(PROJECT_ROOT, "DATA", "ANSWER_CACHE", "answers.sqlite3")
+MEMORY_ENTRIES = 512
+
+DEFAULT_TTL_S = 7 * 24 * 3600
+VOLATILE_TTL_S = 15 * 60
+MAX_STALE_S = 30 * 24 * 3600     # past expiry, an answer is still spoken (and refreshed) for this long
+
+# Questions about things that change get the short TTL
+VOLATILE_WORDS = frozenset("""
+    today tonight now current currently latest live news weather temperature
+    score scores price prices rate rates stock trending yesterday tomorrow
+""".split())
+
+FILLERS = frozenset("jarvis hey hi hello ok okay please plz kindly um uh hmm just actually".split())
+LEAD_INS = ("can you tell me", "could you tell me", "tell me", "do you know", "i want to know",
+            "i wanna know", "search for", "look up")
+CONTRACTIONS = {"what's": "what is", "who's": "who is", "where's": "where is", "how's": "how is",
+                "when's": "when is", "whats": "what is", "whos": "who is"}
+
+
+class NoAnswer(str):
+    """What search_brain() / deep_search() say when they have no answer.
+
+    Still spoken like any reply, but never cached.
+    """
+
+
+def normalize_query(text):
+    """"Jarvis, what's machine learning please?" -> "what is machine learning"."""
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    words = [CONTRACTIONS.get(w, w) for w in text.split()]
+    words = [w for w in words if w.strip("'") and w not in FILLERS]
+    query = " ".join(words)
+    for lead_in in LEAD_INS:
+        if query.startswith(lead_in + " "):
+            query = query[len(lead_in) + 1:]
+            break
+    return query
+
+
+def ttl_for(query):
+    return VOLATILE_TTL_S if VOLATILE_WORDS.intersection(query.split()) else DEFAULT_TTL_S
+
+
+def cacheable(answer):
+    return isinstance(answer, str) and not isinstance(answer, NoAnswer) and bool(answer.strip())
+
+
+class AnswerCache:
+    """LRU in front of a SQLite table, both keyed by (kind, normalized query)."""
+
+    def __init__(self, path=CACHE_PATH, entries=MEMORY_ENTRIES, max_stale_s=MAX_STALE_S):
+        self.path = path
+        self.entries = entries
+        self.max_stale_s = max_stale_s
+        self._memory = OrderedDict()       # key -> (answer, expires)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._db = None
+        self.stats = {"memory": 0, "disk": 0, "stale": 0, "miss": 0, "refreshed": 0, "refresh_failed": 0}
+
+    def _conn(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            with self._db as db:
+                db.execute("CREATE TABLE IF NOT EXISTS answers ("
+                           "kind TEXT, query TEXT, answer TEXT, created REAL, expires REAL, "
+                           "PRIMARY KEY (kind, query))")
+                # Too old to speak even while refreshing
+                db.execute("DELETE FROM answers WHERE expires < ?", (time.time() - self.max_stale_s,))
+        return self._db
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.entries:
+            self._memory.popitem(last=False)
+
+    def get(self, kind, query):
+        """(answer, expires, tier) with tier "memory" or "disk", or None."""
+        key = (kind, query)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value + ("memory",)
+            try:
+                row = self._conn().execute("SELECT answer, expires FROM answers WHERE kind=? AND query=?",
+                                           key).fetchone()
+            except sqlite3.Error as e:
+                print(f"[AnswerCache] read failed: {e}")
+                row = None
+            if row is not None:
+                self._remember(key, tuple(row))
+                return tuple(row) + ("disk",)
+        return None
+
+    def put(self, kind, query, answer, ttl=None):
+        key = (kind, query)
+        now = time.time()
+        expires = now + (ttl_for(query) if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, (answer, expires))
+            try:
+                with self._conn() as db:
+                    db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                               key + (answer, now, expires))
+            except sqlite3.Error as e:
+                print(f"[AnswerCache] write failed: {e}")
+
+    def count(self, stat):
+        # Refresh threads count too
+        with self._lock:
+            self.stats[stat] += 1
+
+    def refresh(self, kind, query, text, fetch):
+        """Fetch a new answer on a background thread; one at a time per query."""
+        key = (kind, query)
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                answer = fetch(text)
+            except Exception as e:
+                answer = None
+                print(f"[AnswerCache] refresh of {query!r} failed: {e}")
+            try:
+                if cacheable(answer):
+                    self.put(kind, query, answer)
+                    self.count("refreshed")
+                else:
+                    # Keep the stale answer; the next ask tries again
+                    self.count("refresh_failed")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=run, name="answer-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def hit_ratio(self):
+        hits = self.stats["memory"] + self.stats["disk"] + self.stats["stale"]
+        total = hits + self.stats["miss"]
+        return hits / total if total else 0.0
+
+    def report(self):
+        s = self.stats
+        return (f"hit ratio {self.hit_ratio():.0%} (memory {s['memory']}, disk {s['disk']}, stale {s['stale']}, "
+                f"miss {s['miss']}; refreshed {s['refreshed']}, refresh failed {s['refresh_failed']})")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+    return _cache
+
+
+def set_cache(cache):
+    """Swap the process cache (the replay harness uses an in-memory one); returns the old one."""
+    global _cache
+    with _cache_lock:
+        old, _cache = _cache, cache
+    return old
+
+
+def cached_answer(kind, text, fetch, cache=None):
+    """fetch(text), or the cached answer to the same question.
+
+    Returns (answer, tier): tier is "memory", "disk", "stale" (spoken while
+    a fresh answer is fetched) or "miss".
+    """
+    query = normalize_query(text)
+    if not query:
+        return fetch(text), "miss"
+    cache = cache or get_cache()
+    entry = cache.get(kind, query)
+    now = time.time()
+    if entry is not None:
+        answer, expires, tier = entry
+        if now < expires:
+            cache.count(tier)
+            return answer, tier
+        if now < expires + cache.max_stale_s:
+            cache.count("stale")
+            cache.refresh(kind, query, text, fetch)
+            return answer, "stale"
+    cache.count("miss")
+    answer = fetch(text)
+    if cacheable(answer):
+        cache.put(kind, query, answer)
+    if DEBUG:
+        print(f"[AnswerCache] {kind} {query!r}: {cache.report()}")
+    return answer, "miss"
+
+
+def benchmark(asks=200, fetch_ms=1500.0):
+    """Time per question with and without the cache, over a repetitive question mix.
+
+    Web fetches are not run: each miss is charged fetch_ms, lookups are measured.
+    """
+    import random
+    import tempfile
+    global DEBUG
+    questions = [f"jarvis what is topic {i}" for i in range(20)] + ["jarvis what's the latest news", "define photosynthesis"]
+    # A few questions make up most asks, like the real history
+    weights = [1.0 / (rank + 1) for rank in range(len(questions))]
+    mix = random.Random(7).choices(questions, weights, k=asks)
+
+    def fetch(text):
+        return f"Answer to {text}."
+
+    def run(cache, texts):
+        lookup_s = 0.0
+        for text in texts:
+            started = time.perf_counter()
+            _, tier = cached_answer("search_brain", text, fetch, cache)
+            if tier != "miss":
+                lookup_s += time.perf_counter() - started
+        hits = len(texts) - cache.stats["miss"]
+        return lookup_s / max(1, hits) * 1e6
+
+    debug, DEBUG = DEBUG, False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        cache = AnswerCache(path)
+        hit_us = run(cache, mix)
+        cached_ms = (cache.stats["miss"] * fetch_ms + (asks - cache.stats["miss"]) * hit_us / 1000.0) / asks
+        print(f"{asks} asks, {len(set(map(normalize_query, mix)))} distinct questions: {cache.report()}")
+        print(f"uncached {fetch_ms:8.1f} ms/ask   cached {cached_ms:8.1f} ms/ask   ({hit_us:.0f} us per memory hit)")
+
+        # Restart: the memory tier is empty, the disk tier answers
+        restarted = AnswerCache(path)
+        hit_us = run(restarted, questions)
+        print(f"after restart  {restarted.report()}   {hit_us:.0f} us per disk hit")
+
+        # Expired: spoken at once from the stale copy, refreshed behind it
+        expired = AnswerCache(path)
+        expired.put("search_brain", normalize_query(questions[0]), "Old answer.", ttl=-1)
+        answer, tier = cached_answer("search_brain", questions[0], fetch, expired)
+        time.sleep(0.2)
+        again, _ = cached_answer("search_brain", questions[0], fetch, expired)
+        print(f"expired entry  {tier}: {answer!r}, next ask: {again!r}   {expired.report()}")
+    DEBUG = debug
+
+
+if __name__ == "__main__":
+    benchmark()
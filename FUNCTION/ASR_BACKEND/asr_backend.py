@@ -0,0 +1,419 @@
+# Pluggable speech recognition backends.
+# listen() opens a session per utterance, feeds it audio while the user is
+# still speaking and asks for the final text when the VAD closes the
+# utterance. Streaming backends report partial hypotheses along the way, so
+# callers registered with on_partial() can start on the command early.
+#
+#   google   recognize_google on the finished utterance (default, no partials)
+#   vosk     offline Kaldi decoder, partials while speaking
+#   standin  scripted transcripts, no network and no model; for testing
+#   hedged   the same audio to several of the above at once (JARVIS_ASR_HEDGE)
+#
+# The hedging rules are tested in asr_backend_test.py with stand-in backends.
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import speech_recognition as sr
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+VOSK_MODEL_PATH = os.environ.get("JARVIS_VOSK_MODEL", os.path.join(PROJECT_ROOT, "DATA", "VOSK_MODEL"))
+DEFAULT_BACKEND = os.environ.get("JARVIS_ASR", "google")
+HEDGE_MEMBERS = os.environ.get("JARVIS_ASR_HEDGE", "google,vosk").split(",")
+GOOGLE_TIMEOUT = 8.0         # seconds before a stalled recognize_google gives up
+HEDGE_DEADLINE = 2.5         # seconds the hedge waits for anything better than the first answer
+CONFIDENT = 0.8              # a result at least this sure wins without waiting
+N_BEST = 5                   # alternatives requested for rescoring
+
+
+@dataclass
+class Result:
+    text: str
+    confidence: float = 1.0
+    backend: str = ""
+    # [(text, confidence or None)], best first; the recognizer's n-best list
+    alternatives: list = field(default_factory=list)
+
+    def hypotheses(self):
+        return self.alternatives or [(self.text, self.confidence)]
+
+
+_partial_listeners = []
+
+
+def on_partial(callback):
+    """callback(text) runs for every new partial hypothesis, on the capture thread."""
+    _partial_listeners.append(callback)
+    return callback
+
+
+class Session:
+    """One utterance. Backends override accept() and result()."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.partial = ""
+        self.cancelled = threading.Event()
+
+    def feed(self, pcm):
+        text = self.accept(pcm)
+        if text and text != self.partial:
+            self.partial = text
+            for callback in list(_partial_listeners):
+                try:
+                    callback(text)
+                except Exception as e:
+                    print(f"[ASR] partial listener failed: {e}")
+        return text
+
+    def accept(self, pcm):
+        """Take more audio; return the current partial hypothesis or None."""
+        return None
+
+    def finish(self, audio):
+        """Final Result for the utterance; raises sr.UnknownValueError if nothing was heard."""
+        result = self.result(audio)
+        if not result.text:
+            raise sr.UnknownValueError()
+        result.backend = self.backend.name
+        return result
+
+    def result(self, audio):
+        raise NotImplementedError
+
+    def cancel(self):
+        """Another backend won; stop working on this utterance if possible."""
+        self.cancelled.set()
+
+
+class Backend:
+    name = ""
+    streaming = False
+
+    def start(self):
+        return Session(self)
+
+    def recognize(self, audio):
+        """Whole-utterance convenience: one session, all audio, final text."""
+        session = self.start()
+        session.feed(audio.frame_data)
+        return session.finish(audio)
+
+
+# =============================
+# Google
+# =============================
+class _GoogleSession(Session):
+    def result(self, audio):
+        response = self.backend.recognizer.recognize_google(audio, show_all=True)
+        if not response:
+            return Result("")
+        alternatives = [(a.get("transcript", ""), a.get("confidence")) for a in response["alternative"]]
+        text, confidence = alternatives[0]
+        return Result(text, 1.0 if confidence is None else confidence, alternatives=alternatives[:N_BEST])
+
+
+class GoogleBackend(Backend):
+    name = "google"
+
+    def __init__(self, timeout=GOOGLE_TIMEOUT):
+        self.recognizer = sr.Recognizer()
+        # None (the default) lets a stalled request freeze listen() forever
+        self.recognizer.operation_timeout = timeout
+
+    def start(self):
+        return _GoogleSession(self)
+
+
+# =============================
+# Vosk
+# =============================
+class _VoskSession(Session):
+    def __init__(self, backend):
+        super().__init__(backend)
+        from vosk import KaldiRecognizer
+        self.rec = KaldiRecognizer(backend.model, backend.rate)
+        self.rec.SetWords(True)
+        self.segments = []
+        self.confidences = []
+
+    def _keep(self, raw):
+        res = json.loads(raw)
+        if res.get("text"):
+            self.segments.append(res["text"])
+            self.confidences.extend(w.get("conf", 1.0) for w in res.get("result", []))
+
+    def accept(self, pcm):
+        if self.rec.AcceptWaveform(pcm):
+            self._keep(self.rec.Result())
+            return " ".join(self.segments)
+        partial = json.loads(self.rec.PartialResult()).get("partial", "")
+        return " ".join(self.segments + [partial]).strip()
+
+    def result(self, audio):
+        self._keep(self.rec.FinalResult())
+        conf = sum(self.confidences) / len(self.confidences) if self.confidences else 0.0
+        text = " ".join(self.segments).strip()
+        # SetMaxAlternatives() would drop the per-word confidences above, so
+        # Vosk hands over its single best hypothesis for rescoring
+        return Result(text, conf, alternatives=[(text, conf)])
+
+
+class VoskBackend(Backend):
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, rate=16000):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        self.model = Model(model_path)
+        self.rate = rate
+
+    def start(self):
+        return _VoskSession(self)
+
+
+# =============================
+# Stand-in
+# =============================
+class _StandInSession(Session):
+    def __init__(self, backend):
+        super().__init__(backend)
+        # A script entry is a transcript, or a list of n-best alternatives
+        with backend.lock:
+            entry = backend.script.pop(0) if backend.script else ""
+        self.alternatives = [entry] if isinstance(entry, str) else list(entry)
+        self.words = self.alternatives[0].split() if self.alternatives else []
+        self.bytes = 0
+
+    def accept(self, pcm):
+        # Reveal one word per word_ms of audio, like a decoder catching up
+        self.bytes += len(pcm)
+        heard_ms = self.bytes / 2 / self.backend.rate * 1000
+        count = min(len(self.words), int(heard_ms // self.backend.word_ms))
+        return " ".join(self.words[:count])
+
+    def result(self, audio):
+        # Injected latency; a cancelled session stops waiting straight away
+        if self.cancelled.wait(self.backend.latency):
+            return Result("")
+        if self.backend.fail:
+            raise sr.RequestError(f"{self.backend.name}: simulated failure")
+        return Result(" ".join(self.words), self.backend.confidence,
+                      alternatives=[(a, self.backend.confidence if i == 0 else None)
+                                    for i, a in enumerate(self.alternatives)])
+
+
+class StandInBackend(Backend):
+    """Plays back queued transcripts, one per utterance, with partials.
+
+    latency (seconds), confidence and fail shape the final result, so the
+    hedged recognizer can be exercised without a network or a model.
+    """
+    name = "standin"
+    streaming = True
+
+    def __init__(self, script=(), word_ms=250, rate=16000, latency=0.0, confidence=1.0,
+                 fail=False, name="standin"):
+        self.script = list(script)
+        self.word_ms = word_ms
+        self.rate = rate
+        self.latency = latency
+        self.confidence = confidence
+        self.fail = fail
+        self.name = name
+        self.lock = threading.Lock()
+
+    def say(self, *texts):
+        with self.lock:
+            self.script.extend(texts)
+        return self
+
+    def start(self):
+        return _StandInSession(self)
+
+
+# =============================
+# Hedged
+# =============================
+class _HedgedSession(Session):
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.sessions = [b.start() for b in backend.members]
+
+    def accept(self, pcm):
+        # Partials come from the first streaming member that has one
+        partial = None
+        for session in self.sessions:
+            text = session.accept(pcm)
+            partial = partial or text
+        return partial
+
+    def result(self, audio):
+        backend = self.backend
+        started = time.perf_counter()
+        futures = {backend.pool.submit(s.finish, audio): s for s in self.sessions}
+        pending, done, best, winner = set(futures), [], None, None
+        deadline = started + backend.deadline
+        while pending:
+            finished, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()),
+                                     return_when=FIRST_COMPLETED)
+            if not finished:
+                break        # deadline: settle for the best answer so far
+            for future in finished:
+                try:
+                    result = future.result()
+                except (sr.UnknownValueError, sr.RequestError, sr.WaitTimeoutError) as e:
+                    if DEBUG:
+                        print(f"[ASR] {futures[future].backend.name} failed: {e or type(e).__name__}")
+                    continue
+                done.append(result)
+                if best is None or result.confidence > best.confidence:
+                    best = result
+            if best is not None and (best.confidence >= backend.confident or not pending):
+                break
+            if best is None and time.perf_counter() >= deadline:
+                break
+        if best is None and pending:
+            # Nothing usable yet; wait out the stragglers rather than drop the turn
+            finished, pending = wait(pending, timeout=backend.straggler_timeout)
+            for future in finished:
+                try:
+                    result = future.result()
+                except Exception:
+                    continue
+                if best is None or result.confidence > best.confidence:
+                    best = result
+        losers = [s for f, s in futures.items() if f in pending]
+        for session in losers:
+            session.cancel()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        backend.record(best, elapsed_ms)
+        if DEBUG:
+            won = f"{best.backend} won ({best.confidence:.2f})" if best else "no backend answered"
+            lost = ", ".join(s.backend.name for s in losers) or "none"
+            print(f"[ASR] hedged: {won} in {elapsed_ms:.0f} ms; cancelled {lost}")
+        if best is None:
+            return Result("")
+        return Result(best.text, best.confidence, best.backend, best.alternatives)
+
+    def finish(self, audio):
+        result = self.result(audio)
+        if not result.text:
+            raise sr.UnknownValueError()
+        # Keep the winning member's name, not "hedged"
+        return result
+
+    def cancel(self):
+        super().cancel()
+        for session in self.sessions:
+            session.cancel()
+
+
+class HedgedBackend(Backend):
+    """Sends each utterance to every member and arbitrates on confidence.
+
+    The first result at least `confident` sure wins at once; otherwise the
+    most confident answer in by `deadline` seconds does. Slower members are
+    cancelled, and wins per backend are counted in `wins`.
+    """
+    name = "hedged"
+
+    def __init__(self, members=None, deadline=HEDGE_DEADLINE, confident=CONFIDENT, straggler_timeout=None):
+        if members is None:
+            members = []
+            for name in HEDGE_MEMBERS:
+                try:
+                    members.append(BACKENDS[name.strip()]())
+                except Exception as e:
+                    print(f"[ASR] hedge member {name} unavailable: {e}")
+        if not members:
+            raise ValueError("hedged recognizer needs at least one backend")
+        self.members = list(members)
+        self.streaming = any(m.streaming for m in self.members)
+        self.deadline = deadline
+        self.confident = confident
+        self.straggler_timeout = GOOGLE_TIMEOUT if straggler_timeout is None else straggler_timeout
+        self.pool = ThreadPoolExecutor(max_workers=2 * len(self.members), thread_name_prefix="asr-hedge")
+        self.wins = {}
+        self.latencies_ms = []
+
+    def record(self, best, elapsed_ms):
+        key = best.backend if best else "none"
+        self.wins[key] = self.wins.get(key, 0) + 1
+        self.latencies_ms.append(elapsed_ms)
+
+    def start(self):
+        return _HedgedSession(self)
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "standin": StandInBackend,
+    "hedged": HedgedBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def select(name_or_backend):
+    """Switch the backend listen() uses, by name or instance."""
+    global _backend
+    backend = BACKENDS[name_or_backend]() if isinstance(name_or_backend, str) else name_or_backend
+    with _backend_lock:
+        _backend = backend
+    if DEBUG:
+        print(f"[ASR] using {backend.name}")
+    return backend
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            return _backend
+    try:
+        return select(DEFAULT_BACKEND)
+    except Exception as e:
+        print(f"[ASR] {DEFAULT_BACKEND} unavailable ({e}), falling back to google")
+        return select("google")
+
+
+# =============================
+# Hedging scenarios
+# =============================
+def benchmark(deadline=1.0):
+    """Hedged recognition against stand-in backends with injected latency."""
+    audio = sr.AudioData(b"\0\0" * 16000, 16000, 2)
+    scenarios = (
+        # (description, [(name, latency s, confidence, fail)], expected winner)
+        ("online stalls", [("online", 30.0, 0.95, False), ("offline", 0.3, 0.9, False)], "offline"),
+        ("offline unsure", [("online", 0.5, 0.95, False), ("offline", 0.1, 0.5, False)], "online"),
+        ("stalls + unsure", [("online", 30.0, 0.95, False), ("offline", 0.1, 0.5, False)], "offline"),
+        ("offline fails", [("online", 0.4, 0.7, False), ("offline", 0.1, 0.9, True)], "online"),
+    )
+    ok = True
+    for description, members, expected in scenarios:
+        fakes = [StandInBackend(["play music"], latency=latency, confidence=conf, fail=fail, name=name)
+                 for name, latency, conf, fail in members]
+        hedged = HedgedBackend(fakes, deadline=deadline, straggler_timeout=deadline)
+        started = time.perf_counter()
+        result = hedged.recognize(audio)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok &= result.backend == expected
+        slowest = max(latency for _, latency, _, _ in members) * 1000
+        print(f"{description:<16} winner {result.backend:<8} ({result.confidence:.2f}) "
+              f"{elapsed_ms:7.0f} ms  (slowest member alone: {slowest:.0f} ms)")
+        hedged.pool.shutdown(wait=False)
+    return ok
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,85 @@
+# Hedged recognition against stand-in backends with injected latency.
+#   python -m pytest FUNCTION/ASR_BACKEND/asr_backend_test.py
+import time
+
+import pytest
+import speech_recognition as sr
+
+from FUNCTION.ASR_BACKEND.asr_backend import HedgedBackend, StandInBackend
+
+DEADLINE = 0.5
+AUDIO = sr.AudioData(b"\0\0" * 16000, 16000, 2)
+
+
+def fake(name, latency, confidence=0.9, fail=False):
+    return StandInBackend(["play music"], latency=latency, confidence=confidence, fail=fail, name=name)
+
+
+@pytest.fixture
+def hedge():
+    made = []
+
+    def make(*members, **kwargs):
+        kwargs.setdefault("deadline", DEADLINE)
+        kwargs.setdefault("straggler_timeout", DEADLINE)
+        hedged = HedgedBackend(list(members), **kwargs)
+        made.append(hedged)
+        return hedged
+
+    yield make
+    for hedged in made:
+        hedged.pool.shutdown(wait=False)
+
+
+def recognize(hedged):
+    """(result, session, seconds) of one hedged utterance."""
+    session = hedged.start()
+    session.feed(AUDIO.frame_data)
+    started = time.perf_counter()
+    result = session.finish(AUDIO)
+    return result, session, time.perf_counter() - started
+
+
+def test_deadline_settles_for_the_best_answer_so_far(hedge):
+    hedged = hedge(fake("online", 30.0, 0.95), fake("offline", 0.05, 0.5))
+    result, _, seconds = recognize(hedged)
+    assert result.backend == "offline"
+    assert result.text == "play music"
+    assert DEADLINE <= seconds < DEADLINE + 0.3
+
+
+def test_confident_early_result_wins_without_waiting(hedge):
+    hedged = hedge(fake("online", 2.0, 0.95), fake("offline", 0.05, 0.9))
+    result, _, seconds = recognize(hedged)
+    assert result.backend == "offline"
+    assert seconds < DEADLINE
+    assert hedged.wins == {"offline": 1}
+
+
+def test_unsure_early_result_waits_for_a_better_one(hedge):
+    hedged = hedge(fake("online", 0.2, 0.95), fake("offline", 0.05, 0.5))
+    result, _, seconds = recognize(hedged)
+    assert result.backend == "online"
+    assert seconds < DEADLINE
+
+
+def test_straggler_is_cancelled(hedge):
+    hedged = hedge(fake("online", 30.0, 0.95), fake("offline", 0.05, 0.9))
+    _, session, _ = recognize(hedged)
+    online, offline = session.sessions
+    assert online.cancelled.is_set()
+    assert not offline.cancelled.is_set()
+
+
+def test_failed_backend_falls_back_to_the_other(hedge):
+    hedged = hedge(fake("online", 0.1, 0.7), fake("offline", 0.05, 0.9, fail=True))
+    result, _, _ = recognize(hedged)
+    assert result.backend == "online"
+    assert result.confidence == pytest.approx(0.7)
+
+
+def test_every_backend_failing_hears_nothing(hedge):
+    hedged = hedge(fake("online", 0.05, fail=True), fake("offline", 0.05, fail=True))
+    with pytest.raises(sr.UnknownValueError):
+        recognize(hedged)
+    assert hedged.wins == {"none": 1}
@@ -0,0 +1,329 @@
+# Pool of warm headless Chrome drivers for the web-backed brain.
+# search_brain() and deep_search() used to start a new Chrome, load
+# google.com and quit again on every question (2-4 s each). They now check
+# a driver out of this pool and check it back in afterwards. A maintenance
+# thread puts returned drivers back on the Google home page, checks they
+# still respond, and replaces them once they have served MAX_PAGES queries
+# or their Chrome processes grew past MAX_RSS_MB.
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+DEBUG = False
+
+POOL_SIZE = 2                # drivers alive at most (search_brain + deep_search)
+WARM_DRIVERS = 1             # started ahead of the first question
+MAX_PAGES = 50               # queries served before a driver is replaced
+MAX_RSS_MB = 700             # Chrome + chromedriver memory before a driver is replaced
+CHECKOUT_TIMEOUT_S = 15.0    # waiting for a free (or new) driver
+HOME_URL = "https://www.google.com"
+
+CHROME_DRIVER_PATH = r'c:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\JARVIS_DRIVER\chromedriver.exe'
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/120.0.0.0 Safari/537.36")
+
+
+def make_driver():
+    """Headless Chrome with the flags the brain searches have always used."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+
+    # Add options to avoid detection and CAPTCHA
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument("--user-agent=" + USER_AGENT)
+
+    driver = webdriver.Chrome(service=Service(CHROME_DRIVER_PATH), options=chrome_options)
+    # Execute script to hide automation indicators
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+def driver_rss_mb(driver):
+    """Memory of chromedriver and the Chrome processes under it, or None if unknown."""
+    try:
+        import psutil
+        proc = psutil.Process(driver.service.process.pid)
+        procs = [proc] + proc.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running()) / 2 ** 20
+    except Exception:
+        return None
+
+
+class PooledDriver:
+    def __init__(self, driver, number):
+        self.driver = driver
+        self.number = number
+        self.created = time.perf_counter()
+        self.pages = 0
+        self.broken = False
+
+
+class BrowserPool:
+    """Checkout/checkin of warm drivers; at most size drivers exist at once."""
+
+    def __init__(self, factory=make_driver, size=POOL_SIZE, max_pages=MAX_PAGES,
+                 max_rss_mb=MAX_RSS_MB, home_url=HOME_URL):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.home_url = home_url
+        self.idle = queue.LifoQueue()        # most recently used first: its pages are cached
+        self.stats = {"checkouts": 0, "created": 0, "recycled": 0, "unhealthy": 0,
+                      "warm_hits": 0, "wait_ms": 0.0}
+        self._returned = queue.Queue()
+        self._alive = 0
+        self._numbers = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._maintainer = threading.Thread(target=self._maintain, name="browser-pool", daemon=True)
+        self._maintainer.start()
+
+    # ---- driver lifecycle ----
+    def _create(self):
+        with self._lock:
+            if self._closed or self._alive >= self.size:
+                return None
+            self._alive += 1
+            self._numbers += 1
+            number = self._numbers
+        started = time.perf_counter()
+        try:
+            driver = self.factory()
+            if self.home_url:
+                driver.get(self.home_url)
+        except Exception:
+            with self._lock:
+                self._alive -= 1
+            raise
+        with self._lock:
+            self.stats["created"] += 1
+        if DEBUG:
+            print(f"[Browser] driver {number} started in {time.perf_counter() - started:.2f}s")
+        return PooledDriver(driver, number)
+
+    def _discard(self, pooled, reason):
+        with self._lock:
+            self._alive -= 1
+            self.stats[reason] += 1
+        if DEBUG:
+            print(f"[Browser] driver {pooled.number} {reason} after {pooled.pages} pages")
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def healthy(self, pooled):
+        """The driver still answers and has a window."""
+        try:
+            pooled.driver.execute_script("return 1")
+            return bool(pooled.driver.window_handles)
+        except Exception:
+            return False
+
+    def worn_out(self, pooled):
+        if pooled.pages >= self.max_pages:
+            return True
+        rss = driver_rss_mb(pooled.driver)
+        return rss is not None and rss > self.max_rss_mb
+
+    def _maintain(self):
+        """Park returned drivers on the home page, or replace them, off the caller's thread."""
+        while True:
+            pooled = self._returned.get()
+            if pooled is None:
+                return
+            if pooled.broken or not self.healthy(pooled):
+                self._discard(pooled, "unhealthy")
+                self._refill()
+                continue
+            if self.worn_out(pooled):
+                self._discard(pooled, "recycled")
+                self._refill()
+                continue
+            try:
+                if self.home_url:
+                    pooled.driver.get(self.home_url)
+            except Exception:
+                self._discard(pooled, "unhealthy")
+                self._refill()
+                continue
+            self.idle.put(pooled)
+
+    def _refill(self):
+        # Keep a warm driver ready in place of one that was thrown away
+        if self.idle.qsize() < WARM_DRIVERS:
+            self.warm(1, background=False)
+
+    def warm(self, count=WARM_DRIVERS, background=True):
+        """Start drivers ahead of the first question."""
+        def run():
+            for _ in range(count):
+                try:
+                    pooled = self._create()
+                except Exception as e:
+                    print(f"[Browser] could not start Chrome: {e}")
+                    return
+                if pooled is None:
+                    return
+                self.idle.put(pooled)
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="browser-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    # ---- checkout / checkin ----
+    def checkout(self, timeout=CHECKOUT_TIMEOUT_S):
+        """A healthy driver: an idle one, a new one if below size, else wait for a checkin."""
+        started = time.perf_counter()
+        deadline = started + timeout
+        pooled = None
+        while pooled is None:
+            try:
+                pooled = self.idle.get_nowait()
+                warm = True
+            except queue.Empty:
+                pooled = self._create()
+                warm = False
+                if pooled is None:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise TimeoutError(f"no browser free after {timeout:.0f}s")
+                    try:
+                        pooled = self.idle.get(timeout=remaining)
+                        warm = True
+                    except queue.Empty:
+                        raise TimeoutError(f"no browser free after {timeout:.0f}s")
+            if warm and not self.healthy(pooled):
+                self._discard(pooled, "unhealthy")
+                pooled = None
+        with self._lock:
+            self.stats["checkouts"] += 1
+            self.stats["warm_hits"] += warm
+            self.stats["wait_ms"] += (time.perf_counter() - started) * 1000
+        return pooled
+
+    def checkin(self, pooled, broken=False):
+        pooled.pages += 1
+        pooled.broken = pooled.broken or broken
+        if self._closed:
+            self._discard(pooled, "recycled")
+        else:
+            self._returned.put(pooled)
+
+    @contextmanager
+    def driver(self, timeout=CHECKOUT_TIMEOUT_S):
+        """with pool.driver() as driver: ... -- an error marks the driver for replacement."""
+        pooled = self.checkout(timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self.checkin(pooled, broken)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._returned.put(None)
+        while True:
+            try:
+                self._discard(self.idle.get_nowait(), "recycled")
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+    return _pool
+
+
+def browser(timeout=CHECKOUT_TIMEOUT_S):
+    """Context manager for a warm pooled driver."""
+    return get_pool().driver(timeout)
+
+
+def warm_up():
+    get_pool().warm()
+
+
+# =============================
+# Benchmark
+# =============================
+class StandInDriver:
+    """Sleeps like Chrome does: startup, page loads and quit."""
+
+    def __init__(self, start_ms=2500.0, page_ms=400.0, quit_ms=300.0):
+        time.sleep(start_ms / 1000.0)
+        self.page_ms = page_ms
+        self.quit_ms = quit_ms
+        self.window_handles = ["main"]
+        self.current_url = ""
+
+    def get(self, url):
+        time.sleep(self.page_ms / 1000.0)
+        self.current_url = url
+
+    def execute_script(self, *args):
+        return 1
+
+    def quit(self):
+        time.sleep(self.quit_ms / 1000.0)
+
+
+def benchmark(queries=6, think_s=0.5):
+    """Seconds per query: a new Chrome per question against the warm pool.
+
+    A query is load home page + submit search (one more page). The pool
+    has think_s between questions to park its driver on the home page.
+    """
+    def ask(driver):
+        driver.get("https://www.google.com/search?q=x")
+
+    started = time.perf_counter()
+    for _ in range(queries):
+        driver = StandInDriver()
+        driver.get(HOME_URL)
+        ask(driver)
+        driver.quit()
+    fresh = (time.perf_counter() - started) / queries
+
+    pool = BrowserPool(factory=StandInDriver, size=2, max_pages=4)
+    pool.warm(background=False)
+    latencies = []
+    for _ in range(queries):
+        started = time.perf_counter()
+        with pool.driver() as driver:
+            ask(driver)
+        latencies.append(time.perf_counter() - started)
+        time.sleep(think_s)
+    pool.close()
+    print(f"new Chrome per query {fresh:5.2f} s   warm pool {sum(latencies) / len(latencies):5.2f} s "
+          f"(worst {max(latencies):.2f} s)   {pool.stats}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,16 +1,15 @@
 from itertools import count
 
-import pyaudio
 import struct
 import math
 
+from FUNCTION.MIC_BUS import mic_bus
+
 INITIAL_TAP_THERESHOLD = 0.7222
-FORMAT = pyaudio.paInt16
 SHORT_NORMALIZE =(1.0 / 32768.0)
-CHANNELS = 3
-RATE = 44100
-INPUT_BLOCK_TIME = 0.01
-INPUT_FRAMES_PER_BLOCK = int(RATE * INPUT_BLOCK_TIME)
+RATE = mic_bus.RATE
+INPUT_BLOCK_TIME = mic_bus.FRAME_MS / 1000.0
+INPUT_FRAMES_PER_BLOCK = mic_bus.FRAME_SAMPLES
 OVERSENSITIVE = 9.0 / INPUT_BLOCK_TIME
 UNDERSENSITIVE = 10.0 / INPUT_BLOCK_TIME
 MAX_TAP_BLOCKS = 0.15 / INPUT_BLOCK_TIME
@@ -19,7 +18,8 @@ REQUIRED_CLAPS = 2 # Adjust this value as needed
 class TapTester(object):
 
     def __init__(self):
-        self.pa = pyaudio.PyAudio()
+        # Blocks come from the shared mic bus, so clap detection can run
+        # while listen() is recognizing speech
         self.stream = self.open_mic_stream()
         self.tap_threshold = INITIAL_TAP_THERESHOLD
         self.noisycount = MAX_TAP_BLOCKS + 1
@@ -27,36 +27,11 @@ class TapTester(object):
         self.errorcount = 0
 
     def stop(self):
-        if self.stream and not self.stream.is_stopped():
-            self.stream.stop_stream()
+        if self.stream and not self.stream.closed:
             self.stream.close()
-        if self.pa:
-            self.pa.terminate()
-
-    def find_input_device(self):
-        device_index = None
-        for i in range(self.pa.get_device_count()):
-            devinfo = self.pa.get_device_info_by_index(i)
-            for keyword in ["mic", "input"]:
-                if keyword in devinfo["name"].lower():
-                    device_index = i
-                    return device_index
-
-        if device_index is None:
-            print("No preferred input found, using default input device.")
-
-        return device_index
 
     def open_mic_stream(self):
-        device_index = self.find_input_device()
-
-        stream = self.pa.open(format=FORMAT,
-                              channels=CHANNELS,
-                              rate=RATE,
-                              input=True,
-                              input_device_index=device_index,
-                              frames_per_buffer=INPUT_FRAMES_PER_BLOCK)
-        return stream
+        return mic_bus.subscribe("clap")
 
     @staticmethod
     def get_rms(block):
@@ -72,9 +47,11 @@ class TapTester(object):
 
     def listen(self):
         try:
-            if self.stream.is_stopped():
+            if self.stream.closed:
+                return False
+            block = self.stream.read(timeout=1.0)
+            if not block:
                 return False
-            block = self.stream.read(INPUT_FRAMES_PER_BLOCK, exception_on_overflow=False)
         except Exception as e:
             self.errorcount += 1
             print("(%d) Error recording: %s" % (self.errorcount, e))
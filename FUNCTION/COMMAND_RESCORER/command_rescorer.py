@@ -0,0 +1,223 @@
+# N-best rescoring against the command grammar.
+# The recognizer returns several hypotheses for an utterance. Each one is
+# routed as is, and otherwise compared with every phrase the dispatchers
+# accept (spelling and sound), so "seek to beginnin" or a second-choice
+# "zoom in" still runs the command instead of falling through silently.
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from FUNCTION.HINGLISH_NORMALIZER.hinglish_normalizer import token_similarity
+from FUNCTION.INTENT_ROUTER.intent_router import normalize
+
+DEBUG = False
+
+MIN_SCORE = 0.8              # weaker grammar matches leave the hypothesis alone
+CHAR_WEIGHT = 0.5            # rest of the score is the phonetic similarity
+MAX_LENGTH_RATIO = 0.4       # phrases this much longer/shorter are not compared
+MAX_CANDIDATES = 12          # phrases sharing the most words/sounds get scored
+COMMON_KEY = 0.1             # keys in more phrases than this share are not indexed
+PARTIAL_ROUTE_SCORE = MIN_SCORE   # routes on part of the utterance ("open ...")
+
+_SOUND_RULES = (
+    (re.compile(r"ph"), "f"), (re.compile(r"ck|q"), "k"), (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"c"), "k"), (re.compile(r"x"), "ks"), (re.compile(r"z"), "s"), (re.compile(r"w"), "v"),
+    # Voiced and voiceless pairs are the usual mishearings
+    (re.compile(r"d"), "t"), (re.compile(r"b"), "p"), (re.compile(r"g"), "k"), (re.compile(r"v"), "f"),
+)
+
+
+@lru_cache(maxsize=4096)
+def phonetic(word):
+    """Sound key of a word: first letter, then consonant classes without repeats."""
+    for pattern, repl in _SOUND_RULES:
+        word = pattern.sub(repl, word)
+    if not word:
+        return word
+    key = word[0] + re.sub(r"[aeiouyh']", "", word[1:])
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+@lru_cache(maxsize=65536)
+def word_similarity(a, b):
+    return token_similarity(a, b)
+
+
+def similarity(a, b):
+    """Weighted edit similarity of two token sequences (a near-miss word costs less than 1)."""
+    prev = [float(j) for j in range(len(b) + 1)]
+    for i, ta in enumerate(a, 1):
+        cur = [float(i)]
+        for j, tb in enumerate(b, 1):
+            sub = 1.0 - word_similarity(ta, tb)
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + sub))
+        prev = cur
+    return 1.0 - prev[-1] / max(len(a), len(b), 1)
+
+
+@dataclass
+class Match:
+    text: str            # the grammar phrase to route
+    intent: str
+    score: float
+
+
+class CommandGrammar:
+    """Every whole-utterance trigger phrase, indexed by word and by sound."""
+
+    def __init__(self, skills):
+        self.entries = []
+        self.by_key = {}
+        for s in skills:
+            if s.slot:
+                continue     # free-form queries are not part of the grammar
+            for phrase in s.phrases:
+                phrase = normalize(phrase)
+                words = tuple(phrase.split())
+                if not words:
+                    continue
+                codes = tuple(phonetic(w) for w in words)
+                index = len(self.entries)
+                self.entries.append((phrase, words, codes, s.name))
+                for key in set(words) | set(codes):
+                    self.by_key.setdefault(key, []).append(index)
+        # "to", "open", "youtube" say little about which phrase was meant
+        limit = max(2, COMMON_KEY * len(self.entries))
+        self.by_key = {k: v for k, v in self.by_key.items() if len(v) <= limit}
+
+    def candidates(self, words, codes):
+        """Entries sharing the most indexed words or sounds with the hypothesis."""
+        shared = {}
+        for key in set(words) | set(codes):
+            for index in self.by_key.get(key, ()):
+                shared[index] = shared.get(index, 0) + 1
+        return sorted(shared, key=shared.get, reverse=True)[:MAX_CANDIDATES]
+
+    def match(self, text):
+        """Closest grammar phrase to text, or None below MIN_SCORE."""
+        text = normalize(text)
+        words = tuple(text.split())
+        if not words:
+            return None
+        codes = tuple(phonetic(w) for w in words)
+        best = None
+        for index in self.candidates(words, codes):
+            phrase, p_words, p_codes, intent = self.entries[index]
+            if abs(len(phrase) - len(text)) > MAX_LENGTH_RATIO * max(len(phrase), len(text)):
+                continue
+            score = (CHAR_WEIGHT * similarity(words, p_words)
+                     + (1 - CHAR_WEIGHT) * similarity(codes, p_codes))
+            if best is None or score > best.score:
+                best = Match(phrase, intent, score)
+        if best is None or best.score < MIN_SCORE:
+            return None
+        return best
+
+
+class Rescorer:
+    """Picks the hypothesis to route: one that routes as heard, else the best grammar match."""
+
+    def __init__(self, index, grammar):
+        self.index = index
+        self.grammar = grammar
+
+    def choose(self, hypotheses):
+        """hypotheses: [(text, confidence or None)], recognizer's best first."""
+        if not hypotheses:
+            return ""
+        best_key, best_text = None, hypotheses[0][0]
+        for rank, (text, confidence) in enumerate(hypotheses):
+            route = self.index.route(text)
+            if route.intent is not None and route.phrase == route.text:
+                score, chosen = 1.0, text
+            else:
+                # A near-miss of a whole phrase beats a catch-all on one word
+                match = self.grammar.match(text)
+                if match is not None:
+                    score, chosen = match.score, match.text
+                elif route.intent is not None:
+                    score, chosen = PARTIAL_ROUTE_SCORE, text
+                else:
+                    continue
+            key = (score, confidence or 0.0, -rank)
+            if best_key is None or key > best_key:
+                best_key, best_text = key, chosen
+        if DEBUG and best_text != hypotheses[0][0]:
+            print(f"[Rescore] {hypotheses[0][0]!r} -> {best_text!r} ({best_key[0]:.2f})")
+        return best_text
+
+
+_rescorer = None
+_lock = threading.Lock()
+
+
+def get_rescorer():
+    global _rescorer
+    with _lock:
+        if _rescorer is None:
+            from FUNCTION.SKILL_REGISTRY.skill_registry import build_command_index, skills
+            index = build_command_index()
+            _rescorer = Rescorer(index, CommandGrammar(skills()))
+    return _rescorer
+
+
+def best_command(hypotheses):
+    """Text of the best hypothesis to hand to the router."""
+    return get_rescorer().choose(hypotheses)
+
+
+# =============================
+# Benchmark
+# =============================
+# ("k", "l") is how "seek" ended up as "seel" in the YouTube key table
+_SOUNDALIKES = (("k", "l"), ("ee", "ea"), ("ck", "k"), ("s", "z"), ("v", "w"), ("ph", "f"), ("t", "d"))
+
+
+def _misheard(phrase, rng):
+    """The phrase with one sound-alike swap or one dropped letter."""
+    words = phrase.split()
+    i = rng.randrange(len(words))
+    word = words[i]
+    swaps = [(a, b) for a, b in _SOUNDALIKES if a in word]
+    if swaps and rng.random() < 0.6:
+        a, b = rng.choice(swaps)
+        word = word.replace(a, b, 1)
+    elif len(word) > 3:
+        j = rng.randrange(1, len(word))
+        word = word[:j] + word[j + 1:]
+    words[i] = word
+    return " ".join(words)
+
+
+def benchmark(seed=5):
+    """Accuracy and cost of rescoring n-best lists built from misheard phrases."""
+    import random
+    rng = random.Random(seed)
+    rescorer = get_rescorer()
+    # Phrases shared by two skills count for whichever the router picks
+    phrases = [(e[0], rescorer.index.route(e[0]).intent) for e in rescorer.grammar.entries]
+    hypotheses = 0
+    fixed = total = 0
+    started = time.perf_counter()
+    for phrase, intent in phrases:
+        for _ in range(3):
+            nbest = [(_misheard(phrase, rng), 0.9), (_misheard(phrase, rng), None),
+                     ("what is the weather like", None)]
+            hypotheses += len(nbest)
+            chosen = rescorer.choose(nbest)
+            route = rescorer.index.route(chosen)
+            total += 1
+            fixed += route.intent is intent
+    per_hypothesis_us = (time.perf_counter() - started) / hypotheses * 1e6
+    # The two phrases from the backlog, heard correctly and misheard
+    for text in ("seek to beginning", "seek to beginnin", "move to next video ", "move to next vidio"):
+        print(f"{text!r:24} -> {rescorer.choose([(text, None)])!r}")
+    print(f"{len(phrases)} grammar phrases; {fixed}/{total} misheard n-best lists routed to the "
+          f"intended command; {per_hypothesis_us:.0f} us per hypothesis")
+    return fixed, total
+
+
+if __name__ == "__main__":
+    benchmark()
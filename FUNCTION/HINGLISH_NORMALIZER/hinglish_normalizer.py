@@ -0,0 +1,310 @@
+# Offline Hinglish command normalizer.
+# Maps romanized or Devanagari Hindi commands ("gaana band karo",
+# "गाना बजाओ") onto the canonical English phrase of the skill they trigger,
+# using a dictionary compiled from every skill's trigger phrases (which come
+# from the DLG keyword lists) plus a fuzzy token matcher for spelling
+# variants. A known command never has to go through mtranslate.
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from FUNCTION.JARVIS_TRANSLATE.translate import is_english
+
+DEBUG = False
+
+MIN_SCORE = 0.75             # phrase similarity needed for a fuzzy match
+MIN_TOKEN_SIM = 0.6          # below this two words count as different
+FILLERS = frozenset(("jarvis", "please", "plz", "zara", "jara", "ji", "bhai", "na"))
+MAX_FUZZY_CANDIDATES = 64
+
+
+# =============================
+# Devanagari -> Latin
+# =============================
+CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v", "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+    "क़": "q", "ख़": "kh", "ग़": "g", "ज़": "z", "ड़": "d", "ढ़": "rh", "फ़": "f", "य़": "y",
+}
+VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o",
+}
+MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o",
+}
+VIRAMA = "्"
+NUKTA = "़"
+MARKS = {"ं": "n", "ँ": "n", "ः": "h"}
+
+
+def transliterate(text):
+    """Romanize Devanagari (Hunterian-style, word-final schwa dropped)."""
+    out = []
+    chars = list(text)
+    i = 0
+    while i < len(chars):
+        ch = chars[i]
+        if i + 1 < len(chars) and chars[i + 1] == NUKTA and ch + NUKTA in CONSONANTS:
+            ch = ch + NUKTA
+            i += 1
+        if ch in CONSONANTS:
+            after_vowel = len(out) > 1 and out[-1][-1] in "aeiou"
+            out.append(CONSONANTS[ch])
+            nxt = chars[i + 1] if i + 1 < len(chars) else ""
+            if nxt in MATRAS:
+                out.append(MATRAS[nxt])
+                i += 1
+            elif nxt == VIRAMA:
+                i += 1
+            elif "ऀ" <= nxt <= "ॿ" and nxt not in MARKS:
+                # Inherent vowel, dropped between a vowel and a consonant that
+                # carries its own vowel sign (कितनी -> kitnee, not kitanee)
+                after = chars[i + 2] if i + 2 < len(chars) else ""
+                if after == NUKTA:
+                    after = chars[i + 3] if i + 3 < len(chars) else ""
+                if not (after_vowel and after in MATRAS):
+                    out.append("a")
+            elif nxt in MARKS:
+                out.append("a")
+            # end of word: schwa deleted
+        elif ch in VOWELS:
+            out.append(VOWELS[ch])
+        elif ch in MARKS:
+            out.append(MARKS[ch])
+        elif ch in MATRAS or ch in (VIRAMA, NUKTA):
+            pass
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+# =============================
+# Fuzzy tokens
+# =============================
+_SKELETON_RULES = (
+    (re.compile(r"aa+"), "a"), (re.compile(r"ee+|ii+"), "i"), (re.compile(r"oo+|uu+"), "u"),
+    (re.compile(r"ai"), "e"), (re.compile(r"y$"), "i"), (re.compile(r"(?<=[^aeiou])y(?=u)"), ""),
+    (re.compile(r"ph"), "f"), (re.compile(r"w"), "v"), (re.compile(r"z"), "j"),
+    (re.compile(r"c(?!h)|q"), "k"), (re.compile(r"(.)\1+"), r"\1"),
+)
+
+
+def skeleton(word):
+    """Spelling-insensitive key: gaana/gana, bajaao/bajao, music/myoojik, battery/baitaree."""
+    for pattern, repl in _SKELETON_RULES:
+        word = pattern.sub(repl, word)
+    return word
+
+
+_FILLER_KEYS = frozenset(skeleton(w) for w in FILLERS)
+
+
+def tokens(text):
+    if not text.isascii():
+        text = transliterate(text)
+    # Fillers are dropped after the skeleton, along with mis-hearings of "jarvis"
+    words = (skeleton(w) for w in re.findall(r"[a-z0-9']+", text.lower()))
+    return [w for w in words if w not in _FILLER_KEYS and token_similarity(w, "jarvis") < 0.8]
+
+
+def token_similarity(a, b):
+    if a == b:
+        return 1.0
+    if abs(len(a) - len(b)) > max(len(a), len(b)) // 2:
+        return 0.0
+    # Optimal string alignment: a swapped pair of letters is one edit
+    before, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, before[j - 2] + 1)
+            cur.append(d)
+        before, prev = prev, cur
+    return 1.0 - prev[-1] / max(len(a), len(b))
+
+
+def phrase_similarity(a, b):
+    """1 - token edit distance / longer length; near-miss words cost less than 1."""
+    prev = [float(j) for j in range(len(b) + 1)]
+    for i, ta in enumerate(a, 1):
+        cur = [float(i)]
+        for j, tb in enumerate(b, 1):
+            sim = token_similarity(ta, tb)
+            sub = 1.0 - sim if sim >= MIN_TOKEN_SIM else 1.0
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + sub))
+        prev = cur
+    return 1.0 - prev[-1] / max(len(a), len(b), 1)
+
+
+# =============================
+# Compiled command dictionary
+# =============================
+@dataclass
+class Command:
+    text: str            # canonical English phrase for the skill
+    intent: str
+    phrase: str          # the trigger phrase that matched
+    score: float
+
+
+class HinglishNormalizer:
+    """Exact skeleton lookup, then fuzzy matching over candidates sharing a word."""
+
+    def __init__(self, skills):
+        self.exact = {}
+        self.entries = []
+        self.by_token = {}
+        for s in skills:
+            if s.slot:
+                continue     # prefix/suffix triggers around a free-form query
+            canonical = next((p for p in s.phrases if is_english(p)), s.phrases[0])
+            for phrase in s.phrases:
+                toks = tokens(phrase)
+                if not toks:
+                    continue
+                entry = (tuple(toks), s.name, phrase, canonical, s.tier)
+                self.exact.setdefault(entry[0], entry)
+                index = len(self.entries)
+                self.entries.append(entry)
+                for t in set(toks):
+                    self.by_token.setdefault(t, []).append(index)
+        self.by_initial = {}
+        for t in self.by_token:
+            self.by_initial.setdefault(t[:1], []).append(t)
+
+    def match(self, text):
+        toks = tuple(tokens(text))
+        if not toks:
+            return None
+        entry = self.exact.get(toks)
+        if entry is not None:
+            return Command(entry[3], entry[1], entry[2], 1.0)
+        candidates = set()
+        for t in toks:
+            candidates.update(self.by_token.get(t, ()))
+        for t in toks:
+            if len(candidates) >= MAX_FUZZY_CANDIDATES:
+                break
+            # A misspelt word shares no exact token; try words with the same initial
+            for key in self.by_initial.get(t[:1], ()):
+                if key != t and token_similarity(key, t) >= MIN_TOKEN_SIM:
+                    candidates.update(self.by_token[key])
+        best, best_key = None, None
+        for index in candidates:
+            entry = self.entries[index]
+            score = phrase_similarity(toks, entry[0])
+            key = (-score, entry[4], -len(entry[0]))
+            if score >= MIN_SCORE and (best_key is None or key < best_key):
+                best, best_key = entry, key
+        if best is None:
+            return None
+        return Command(best[3], best[1], best[2], -best_key[0])
+
+
+_normalizer = None
+_lock = threading.Lock()
+
+
+def get_normalizer():
+    global _normalizer
+    with _lock:
+        if _normalizer is None:
+            from FUNCTION.SKILL_REGISTRY.skill_registry import import_manifests, skills
+            import_manifests()
+            _normalizer = HinglishNormalizer(skills())
+    return _normalizer
+
+
+def normalize_command(text):
+    """Canonical English command for a Hindi/Hinglish utterance, or None.
+
+    Plain English is left alone (None) so the router sees it unchanged.
+    """
+    if not text or is_english(text):
+        return None
+    command = get_normalizer().match(text)
+    if command is not None and DEBUG:
+        print(f"[Hinglish] {text!r} -> {command.text!r} ({command.intent}, {command.score:.2f})")
+    return command
+
+
+# =============================
+# Benchmark
+# =============================
+DEVANAGARI_SAMPLES = (
+    ("गाना बजाओ", "youtube_play_music"),
+    ("गाना बंद करो", "youtube_stop"),
+    ("म्यूजिक रोको", "youtube_stop"),
+    ("बैटरी कितनी है", "battery_percentage"),
+    ("बंद कर दो", "close"),
+    ("उठो जार्विस", "wake"),
+    ("स्टार्ट करो", "youtube_play"),
+)
+
+
+def _variants(phrase):
+    """The phrase as typed, with 'jarvis', with long vowels and with one typo."""
+    yield phrase
+    yield "jarvis " + phrase
+    yield re.sub(r"a(?=[^aeiou ]{1}[aeiou])", "aa", phrase, count=1)
+    words = phrase.split()
+    longest = max(range(len(words)), key=lambda i: len(words[i]))
+    if len(words[longest]) > 4:
+        w = words[longest]
+        words[longest] = w[:2] + w[3] + w[2] + w[4:]
+        yield " ".join(words)
+
+
+def benchmark():
+    """Accuracy and speed over every trigger phrase the normalizer knows."""
+    from FUNCTION.SKILL_REGISTRY.skill_registry import import_manifests, skills
+    import_manifests()
+    started = time.perf_counter()
+    normalizer = HinglishNormalizer(skills())
+    build_ms = (time.perf_counter() - started) * 1000
+    cases = []
+    for s in skills():
+        if s.slot:
+            continue
+        for phrase in s.phrases:
+            for variant in _variants(phrase):
+                cases.append((variant, s.name))
+    cases.extend(DEVANAGARI_SAMPLES)
+
+    # Phrases shared by two skills resolve to whichever the router would pick
+    owners = {}
+    for s in skills():
+        for phrase in s.phrases:
+            owners.setdefault(tuple(tokens(phrase)), set()).add(s.name)
+
+    correct = missed = wrong = 0
+    started = time.perf_counter()
+    for text, expected in cases:
+        command = normalizer.match(text)
+        if command is None:
+            missed += 1
+        elif command.intent == expected or command.intent in owners.get(tuple(tokens(text)), ()):
+            correct += 1
+        else:
+            wrong += 1
+            if DEBUG:
+                print(f"  {text!r}: expected {expected}, got {command.intent} ({command.phrase!r})")
+    per_call_us = (time.perf_counter() - started) / len(cases) * 1e6
+    print(f"{len(normalizer.entries)} phrases compiled in {build_ms:.1f} ms")
+    print(f"{len(cases)} utterances: {correct} correct, {wrong} wrong, {missed} unmatched; "
+          f"{per_call_us:.1f} us per utterance, 0 network calls")
+    return correct, wrong, missed
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,316 @@
+# Browserless search backend for the brain.
+# Fetches the Google results page over one pooled keep-alive HTTP session
+# and picks the snippet text out of it with a streaming HTML parser, using
+# the same selectors the Selenium path queries. search_brain() and
+# deep_search() take backend="http" (or JARVIS_SEARCH=http) to use it.
+#
+# Saved result pages in DATA/SEARCH_FIXTURES are served by FixtureServer,
+# so extraction and latency can be measured offline:
+#   python -m FUNCTION.HTTP_SEARCH.http_search            benchmark
+#   python -m FUNCTION.HTTP_SEARCH.http_search save QUERY  save a live page
+import json
+import os
+import re
+import sys
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urlparse
+
+DEBUG = False
+
+BACKENDS = ("browser", "http")
+SEARCH_BACKEND = os.environ.get("JARVIS_SEARCH", "browser")
+SEARCH_URL = "https://www.google.com/search"
+# Same order as the Selenium path: the first selector with a usable snippet wins
+RESULT_SELECTORS = ['.VwiC3b', '.s3v9rd', '.IsZvec', 'div.g', '[data-ved]']
+MIN_SNIPPET_CHARS = 20
+TIMEOUT_S = 5.0
+POOL_SIZE = 4
+MAX_DRAIN_BYTES = 1 << 20    # rest of the page read after parsing stops, so the connection is reused
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+FIXTURE_DIR = os.path.join(PROJECT_ROOT, "DATA", "SEARCH_FIXTURES")
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/120.0.0.0 Safari/537.36")
+
+
+# =============================
+# Streaming snippet parser
+# =============================
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                       "param", "source", "track", "wbr"))
+SKIP_TAGS = frozenset(("script", "style", "noscript", "template"))
+BLOCK_TAGS = frozenset(("div", "p", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section"))
+
+
+def parse_selector(selector):
+    """'.cls', 'tag.cls' or '[attr]' as (tag, class, attribute)."""
+    m = re.fullmatch(r"([a-z0-9]*)(?:\.([\w-]+))?(?:\[([\w-]+)\])?", selector.strip())
+    if m is None:
+        raise ValueError(f"unsupported selector {selector!r}")
+    return m.group(1) or None, m.group(2), m.group(3)
+
+
+class SnippetParser(HTMLParser):
+    """Collects the text of every element matching the selectors, as the page streams in.
+
+    found[selector] lists element texts in document order, like
+    driver.find_elements(By.CSS_SELECTOR, selector). done turns True once
+    the first selector has enough usable snippets to answer, so the rest
+    of the page need not be parsed.
+    """
+
+    def __init__(self, selectors=RESULT_SELECTORS, enough=1):
+        super().__init__(convert_charrefs=True)
+        self.selectors = list(selectors)
+        self.rules = [parse_selector(s) for s in self.selectors]
+        self.enough = enough
+        self.found = {s: [] for s in self.selectors}
+        self.done = False
+        self._open = []              # [(depth, selector index, slot in found, text parts)]
+        self._stack = []             # open tag names
+        self._skip = 0
+
+    def _matches(self, rule, tag, attrs):
+        want_tag, want_class, want_attr = rule
+        if want_tag and tag != want_tag:
+            return False
+        if want_class and want_class not in (attrs.get("class") or "").split():
+            return False
+        return not want_attr or want_attr in attrs
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._text("\n")
+        if tag in VOID_TAGS:
+            return
+        self._stack.append(tag)
+        attrs = dict(attrs)
+        for i, rule in enumerate(self.rules):
+            if self._matches(rule, tag, attrs):
+                # Slot reserved now so outer elements come before inner ones, in document order
+                found = self.found[self.selectors[i]]
+                found.append(None)
+                self._open.append((len(self._stack), i, len(found) - 1, []))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._text("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+        if tag in VOID_TAGS or tag not in self._stack:
+            return
+        # Also closes anything left open inside it (<p> and <li> often are)
+        while self._stack:
+            closed = self._stack.pop()
+            while self._open and self._open[-1][0] > len(self._stack):
+                _, i, slot, parts = self._open.pop()
+                self._close(i, slot, parts)
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text(data)
+
+    def _text(self, data):
+        for _, _, _, parts in self._open:
+            parts.append(data)
+
+    def _close(self, i, slot, parts):
+        # Collapse whitespace within lines, as element.text does for rendered text
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        text = "\n".join(line for line in lines if line)
+        self.found[self.selectors[i]][slot] = text
+        first = self.found[self.selectors[0]]
+        if i == 0 and sum(t is not None and len(t) > MIN_SNIPPET_CHARS for t in first) >= self.enough:
+            self.done = True
+
+
+def parse_results(html, selectors=RESULT_SELECTORS, enough=1):
+    parser = SnippetParser(selectors, enough)
+    parser.feed(html)
+    parser.close()
+    return parser.found
+
+
+# =============================
+# Pooled HTTP client
+# =============================
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """One requests session for the process: keep-alive connections, browser headers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=1)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+            _session = session
+    return _session
+
+
+def fetch_results(query, selectors=RESULT_SELECTORS, enough=1, url=None, timeout=TIMEOUT_S):
+    """{selector: [element text]} for the results page of query, parsed while it downloads."""
+    parser = SnippetParser(selectors, enough)
+    started = time.perf_counter()
+    with get_session().get(url or SEARCH_URL, params={"q": query, "hl": "en"}, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.encoding = response.encoding or "utf-8"
+        chunks = response.iter_content(16384, decode_unicode=True)
+        for chunk in chunks:
+            parser.feed(chunk)
+            if parser.done:
+                break
+        parsed_ms = (time.perf_counter() - started) * 1000
+        drained = 0
+        for chunk in chunks:
+            drained += len(chunk)
+            if drained > MAX_DRAIN_BYTES:
+                break
+    parser.close()
+    if DEBUG:
+        print(f"[HTTPSearch] {query!r}: parsed in {parsed_ms:.0f} ms "
+              f"({sum(map(len, parser.found.values()))} elements{', stopped early' if parser.done else ''})")
+    return parser.found
+
+
+def texts_for(found):
+    """A find_elements() stand-in over parsed results for the brain's selector loop."""
+    # Elements still open when parsing stopped early have no text yet
+    return lambda selector: [t for t in found.get(selector, ()) if t is not None]
+
+
+# =============================
+# Offline fixtures
+# =============================
+def load_manifest(fixture_dir=FIXTURE_DIR):
+    """{query: {"file": ..., "expect": snippet substring or ""}}."""
+    with open(os.path.join(fixture_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FixtureServer:
+    """Serves saved result pages at /search?q=<query> on localhost."""
+
+    def __init__(self, fixture_dir=FIXTURE_DIR, latency_ms=0.0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        manifest = load_manifest(fixture_dir)
+        pages = {}
+        for query, entry in manifest.items():
+            with open(os.path.join(fixture_dir, entry["file"]), "rb") as f:
+                pages[" ".join(query.lower().split())] = f.read()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"        # keep-alive, like Google
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                body = pages.get(" ".join(query.lower().split()))
+                time.sleep(server.latency_ms / 1000.0)
+                server.requests += 1
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.connections = 0
+        original = self.httpd.process_request
+
+        def counted(request, client_address):
+            self.connections += 1
+            original(request, client_address)
+
+        self.httpd.process_request = counted
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/search"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="search-fixtures", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def save_fixture(query, fixture_dir=FIXTURE_DIR):
+    """Save the live results page for query and add it to the manifest."""
+    response = get_session().get(SEARCH_URL, params={"q": query, "hl": "en"}, timeout=TIMEOUT_S)
+    response.raise_for_status()
+    os.makedirs(fixture_dir, exist_ok=True)
+    name = re.sub(r"[^a-z0-9]+", "_", query.lower()).strip("_") + ".html"
+    with open(os.path.join(fixture_dir, name), "w", encoding="utf-8") as f:
+        f.write(response.text)
+    try:
+        manifest = load_manifest(fixture_dir)
+    except FileNotFoundError:
+        manifest = {}
+    manifest[query] = {"file": name, "expect": ""}
+    with open(os.path.join(fixture_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"[HTTPSearch] saved {len(response.content) / 1024:.0f} KB to {name}; fill in 'expect' in manifest.json")
+
+
+def benchmark(rounds=5, latency_ms=40.0):
+    """Extraction and latency of both answer paths over the saved pages, served locally."""
+    global SEARCH_URL
+    from BRAIN.MAIN_BRAIN.GOOGLE_SMALL_DATA.google_small_data import search_brain
+    from BRAIN.MAIN_BRAIN.GOOGLE_BIG_DATA.google_big_data import search_and_extract
+    from FUNCTION.ANSWER_CACHE.answer_cache import NoAnswer
+    manifest = load_manifest()
+    live_url = SEARCH_URL
+    with FixtureServer(latency_ms=latency_ms) as server:
+        SEARCH_URL = server.url
+        for name, answer in (("search_brain", search_brain), ("search_and_extract", search_and_extract)):
+            correct, times = 0, []
+            for _ in range(rounds):
+                for query, entry in manifest.items():
+                    started = time.perf_counter()
+                    text = answer(query, backend="http")
+                    times.append((time.perf_counter() - started) * 1000)
+                    if entry["expect"]:
+                        correct += entry["expect"] in (text or "")
+                    else:
+                        # A page without results must come back as the no-answer reply
+                        correct += text is None or isinstance(text, NoAnswer)
+            times.sort()
+            print(f"{name:<19} {correct}/{len(times)} expected snippets  p50 {times[len(times) // 2]:5.1f} ms  "
+                  f"max {times[-1]:5.1f} ms  ({latency_ms:.0f} ms server delay)")
+        print(f"{server.requests} requests over {server.connections} connections")
+        SEARCH_URL = live_url
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["save"]:
+        save_fixture(" ".join(sys.argv[2:]))
+    else:
+        benchmark()
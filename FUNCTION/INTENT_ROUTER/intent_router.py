@@ -0,0 +1,225 @@
+# Compiled command router.
+# Every trigger phrase from every dispatcher goes into one Aho-Corasick
+# automaton, so a single pass over the utterance finds all candidate
+# intents and exactly one of them is picked and run.
+import re
+import time
+from collections import deque, namedtuple
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+DEBUG = False
+
+# Match kinds, in ranking order (an exact match beats a suffix beats a substring)
+EXACT = "exact"
+SUFFIX = "suffix"
+CONTAINS = "contains"
+_KIND_RANK = {EXACT: 0, SUFFIX: 1, CONTAINS: 2}
+
+# Dispatcher tiers, in the order comain() used to run them
+TIER_YOUTUBE = 0
+TIER_GOOGLE = 1
+TIER_BATTERY = 2
+TIER_COMMON = 3
+TIER_FUNCTION = 4
+TIER_GREETING = 5
+TIER_DIALOG = 6
+TIER_BRAIN = 7
+
+# "jarvis <question>" is a question for the brain: a trigger word inside it
+# ("why do flowers open", "how much time") only counts as a command when
+# the question starts with it ("jarvis what time is it")
+ADDRESS = "jarvis"
+QUESTION_WORDS = frozenset("what who whom whose why how when where which define explain".split())
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A handler plus the phrases that trigger it.
+
+    slot=False calls action(), slot=True calls action(text without the
+    trigger phrase) and a callable slot calls action(slot(text, phrase)).
+    """
+    name: str
+    phrases: tuple
+    action: Callable
+    match: str = CONTAINS
+    slot: object = False
+
+
+@dataclass
+class Route:
+    text: str
+    intent: Optional[Intent] = None
+    phrase: str = ""
+    slot: str = ""
+    match_ms: float = 0.0
+
+
+_Entry = namedtuple("_Entry", "phrase intent tier")
+
+
+# Sentence punctuation in a trigger phrase ("goodbye, my friend") never
+# reaches recognizer text; apostrophes and symbols ("c++") stay for slots
+PUNCTUATION = re.compile(r'[,.!?;:"]')
+
+
+def normalize(text: str) -> str:
+    return " ".join(PUNCTUATION.sub(" ", (text or "").lower()).split())
+
+
+def strip_phrase(text: str, phrase: str) -> str:
+    return " ".join(text.replace(phrase, " ").split())
+
+
+class CommandIndex:
+    """Aho-Corasick automaton over the trigger phrases of a set of intents."""
+
+    def __init__(self, intents=(), tier=0):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._intents = []
+        self._built = False
+        self.add(intents, tier)
+
+    def add(self, intents, tier=0):
+        for intent in intents:
+            self._intents.append(intent)
+            for phrase in intent.phrases:
+                phrase = normalize(phrase)
+                if phrase:
+                    self._insert(phrase, _Entry(phrase, intent, tier))
+        self._built = False
+        return self
+
+    @property
+    def intents(self):
+        return list(self._intents)
+
+    def _insert(self, phrase, entry):
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node].append(entry)
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def scan(self, text):
+        """Yield (entry, start, end) for every phrase occurrence in text."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for entry in out[node]:
+                yield entry, i + 1 - len(entry.phrase), i + 1
+
+    @staticmethod
+    def _accepts(entry, text, start, end):
+        kind = entry.intent.match
+        if kind == EXACT:
+            return start == 0 and end == len(text)
+        # Whole words only, so "time" no longer fires inside "sometimes"
+        if start > 0 and text[start - 1] != " ":
+            return False
+        if end < len(text) and text[end] != " ":
+            return False
+        return kind == CONTAINS or end == len(text)
+
+    @staticmethod
+    def _question_start(text):
+        """Where the question starts in "jarvis <question word> ...", else None."""
+        words = text.split(" ", 2)
+        if len(words) > 2 and words[0] == ADDRESS and words[1] in QUESTION_WORDS:
+            return len(ADDRESS) + 1
+        return None
+
+    def route(self, text: str) -> Route:
+        """Pick the single best intent for text without running it."""
+        started = time.perf_counter()
+        text = normalize(text)
+        question = self._question_start(text)
+        best_key, best = None, None
+        for entry, start, end in self.scan(text):
+            if not self._accepts(entry, text, start, end):
+                continue
+            # A trigger that is the whole utterance beats every tier
+            partial = start > 0 or end < len(text)
+            # Inside a question, a trigger that does not open it ranks after the brain
+            aside = (question is not None and entry.intent.match != EXACT
+                     and entry.tier < TIER_BRAIN and start != question)
+            key = (partial, aside, entry.tier, _KIND_RANK[entry.intent.match], -len(entry.phrase), start)
+            if best_key is None or key < best_key:
+                best_key, best = key, entry
+        route = Route(text)
+        if best is not None:
+            intent = best.intent
+            route.intent = intent
+            route.phrase = best.phrase
+            if callable(intent.slot):
+                route.slot = intent.slot(text, best.phrase)
+            elif intent.slot:
+                route.slot = strip_phrase(text, best.phrase)
+        route.match_ms = (time.perf_counter() - started) * 1000.0
+        return route
+
+    def route_addressed(self, command: str) -> Route:
+        """Route a command said to jarvis in one breath with the wake word.
+
+        The command is matched as said first, so EXACT triggers ("seek
+        forward", "take care") still fire; "jarvis <command>" is routed only
+        for a question or when nothing else matches, for the brain.
+        """
+        command = normalize(command)
+        addressed = f"{ADDRESS} {command}"
+        elapsed = 0.0
+        if self._question_start(addressed) is None:
+            route = self.route(command)
+            if route.intent is not None:
+                return route
+            elapsed = route.match_ms
+        route = self.route(addressed)
+        route.match_ms += elapsed
+        return route
+
+    def run(self, route: Route) -> Route:
+        """Run the handler picked by route(), if any."""
+        if DEBUG:
+            name = route.intent.name if route.intent else "-"
+            print(f"[Router] {name} ({route.match_ms:.3f} ms)")
+        intent = route.intent
+        if intent is not None:
+            if intent.slot:
+                intent.action(route.slot)
+            else:
+                intent.action()
+        return route
+
+    def dispatch(self, text: str) -> Route:
+        """Route text and run the winning handler, if any."""
+        return self.run(self.route(text))
@@ -1,84 +1,135 @@
-import speech_recognition as sr
-import os
-import threading
-from mtranslate import translate
-from colorama import Fore, Style, init
-
-init(autoreset=True)
-
-def print_loop():
-    while True:
-        print(Fore.LIGHTGREEN_EX + "I am Listening...", end="", flush=True)
-        print(Style.RESET_ALL, end="", flush=True)
-        print("",end="",flush=True)
-
-def Trans_hindi_to_english(txt):
-    english_txt = translate(txt, to_language='en-us')
-    return english_txt
-
-def listen():
-    recognizer = sr.Recognizer()
-    recognizer.dynamic_energy_threshold = True
-    recognizer.energy_threshold = 1800
-    recognizer.dynamic_energy_adjustment_damping = 0.15
-    recognizer.dynamic_energy_ratio = 1.5
-    recognizer.pause_threshold = 0.8
-    recognizer.operation_timeout = None
-    recognizer.phrase_threshold = 0.3
-    recognizer.non_speaking_duration = 0.5
-    
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source)
-        while True:
-            print(Fore.LIGHTGREEN_EX + "I am Listening...", end="", flush=True)
-            try:
-                audio = recognizer.listen(source, timeout=None)
-                print("\r"+Fore.LIGHTYELLOW_EX + "Got it! Now Recognizing...",end="",flush=True)
-                recognized_txt = recognizer.recognize_google(audio).lower()
-                if recognized_txt:
-                    translated_txt = Trans_hindi_to_english(recognized_txt)
-                    print("\r"+Fore.BLUE + "Mr.Zeno: " + translated_txt)
-                    return translated_txt
-                else:
-                    return ""    
-            except sr.UnknownValueError:
-                recognized_txt = ""
-            finally:
-                print("\r",end="",flush=True)
-        
-        os.system("cls" if os.name == "nt" else "clear")
-        # threading part
-        listen_thread = threading.Thread(target=listen)
-        print_loop = threading.Thread(target=print_loop)
-        listen_thread.start()
-        print_loop.start()
-        listen_thread.join()
-        print_loop.join()
-
-def hearing():
-    recognizer = sr.Recognizer()
-    recognizer.dynamic_energy_threshold = True
-    recognizer.energy_threshold = 2500
-    recognizer.dynamic_energy_adjustment_damping = 0.015
-    recognizer.dynamic_energy_ratio = 1.5
-    recognizer.pause_threshold = 0.8
-    recognizer.operation_timeout = None
-    recognizer.phrase_threshold = 0.3
-    recognizer.non_speaking_duration = 0.5
-    
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source)
-        while True:
-            try:
-                audio = recognizer.listen(source, timeout=None)
-                recognized_txt = recognizer.recognize_google(audio).lower()
-                if recognized_txt:
-                    translated_txt = Trans_hindi_to_english(recognized_txt)
-                    return translated_txt
-                else:
-                    return ""    
-            except sr.UnknownValueError:
-                recognized_txt = ""
-            finally:
-                print("\r",end="",flush=True)
-
\ No newline at end of file
+import speech_recognition as sr
+import os
+import threading
+from colorama import Fore, Style, init
+from FUNCTION.TURN_TRACE.turn_trace import span, CAPTURE, ASR, TRANSLATE
+from FUNCTION.MIC_BUS.mic_bus import MicSource
+from FUNCTION.AMBIENT_NOISE.ambient_noise import get_tracker
+from FUNCTION.VOICE_ACTIVITY.voice_activity import Endpointer, record
+from FUNCTION.WAKE_WORD.wake_word import get_spotter
+from FUNCTION.ASR_BACKEND import asr_backend
+from FUNCTION.JARVIS_TRANSLATE.translate import to_english
+from FUNCTION.HINGLISH_NORMALIZER.hinglish_normalizer import normalize_command
+from FUNCTION.COMMAND_RESCORER.command_rescorer import best_command
+from DATA.JARVIS_DLG_DATASET.DLG import wake_key_word
+
+init(autoreset=True)
+
+def print_loop():
+    while True:
+        print(Fore.LIGHTGREEN_EX + "I am Listening...", end="", flush=True)
+        print(Style.RESET_ALL, end="", flush=True)
+        print("",end="",flush=True)
+
+def Trans_hindi_to_english(txt):
+    with span(TRANSLATE):
+        # Known Hinglish commands map straight onto their skill phrase
+        command = normalize_command(txt)
+        english_txt = command.text if command else to_english(txt)
+    return english_txt
+
+# listen() opens with up to PREROLL_SECONDS of audio captured before it was
+# called (words said while the welcome line was playing), but never earlier
+# than where the last utterance ended
+PREROLL_SECONDS = 1.5
+MIN_COMMAND_SECONDS = 0.3    # trailing audio after the wake word worth recognizing
+_handoff = {"position": None}
+
+# One endpointer per listener thread so its noise estimates carry over
+# between turns (the advice/joke threads call listen() too); its noise
+# energy is re-seeded from the tracked floor at the start of every turn
+_endpointers = {}
+
+def endpointer(name):
+    key = (name, threading.get_ident())
+    if key not in _endpointers:
+        _endpointers[key] = Endpointer()
+    _endpointers[key].set_noise_floor(get_tracker().noise_floor)
+    return _endpointers[key]
+
+def listen():
+    backend = asr_backend.get_backend()
+    
+    with MicSource("asr", preroll=PREROLL_SECONDS, after=_handoff["position"]) as source:
+        while True:
+            print(Fore.LIGHTGREEN_EX + "I am Listening...", end="", flush=True)
+            try:
+                # Streaming backends decode (and report partials) while the user speaks
+                session = backend.start()
+                with span(CAPTURE):
+                    audio = record(source, endpointer("asr"), on_audio=session.feed)
+                _handoff["position"] = source.position
+                print("\r"+Fore.LIGHTYELLOW_EX + "Got it! Now Recognizing...",end="",flush=True)
+                with span(ASR):
+                    # The n-best hypothesis that best fits a known command wins
+                    recognized_txt = best_command(session.finish(audio).hypotheses()).lower()
+                if recognized_txt:
+                    translated_txt = Trans_hindi_to_english(recognized_txt)
+                    print("\r"+Fore.BLUE + "Mr.Zeno: " + translated_txt)
+                    return translated_txt
+                else:
+                    return ""    
+            except sr.UnknownValueError:
+                recognized_txt = ""
+            finally:
+                print("\r",end="",flush=True)
+        
+        os.system("cls" if os.name == "nt" else "clear")
+        # threading part
+        listen_thread = threading.Thread(target=listen)
+        print_loop = threading.Thread(target=print_loop)
+        listen_thread.start()
+        print_loop.start()
+        listen_thread.join()
+        print_loop.join()
+
+def spot_wake_word(spotter):
+    # Enrolled wake word: nothing is sent to Google until it has been heard
+    with MicSource("wake") as source:
+        while True:
+            with span(CAPTURE):
+                audio = record(source, endpointer("wake"))
+            _handoff["position"] = source.position
+            with span(ASR):
+                end = spotter.detect(audio.frame_data)
+            if end is None:
+                continue
+            # "jarvis play music" in one breath: recognize what followed the
+            # wake word from the same utterance instead of listening again
+            tail = audio.frame_data[end * audio.sample_width:]
+            if len(tail) < MIN_COMMAND_SECONDS * audio.sample_rate * audio.sample_width:
+                return wake_key_word[0]
+            try:
+                with span(ASR):
+                    command = asr_backend.get_backend().recognize(
+                        sr.AudioData(tail, audio.sample_rate, audio.sample_width)).text.lower()
+            except sr.UnknownValueError:
+                return wake_key_word[0]
+            # Said as "jarvis <command>"; main() splits the wake word off again
+            return "jarvis " + Trans_hindi_to_english(command)
+
+def hearing():
+    spotter = get_spotter()
+    if spotter is not None:
+        return spot_wake_word(spotter)
+    backend = asr_backend.get_backend()
+    
+    with MicSource("wake") as source:
+        while True:
+            try:
+                session = backend.start()
+                with span(CAPTURE):
+                    audio = record(source, endpointer("wake"), on_audio=session.feed)
+                _handoff["position"] = source.position
+                with span(ASR):
+                    recognized_txt = session.finish(audio).text.lower()
+                if recognized_txt:
+                    translated_txt = Trans_hindi_to_english(recognized_txt)
+                    return translated_txt
+                else:
+                    return ""    
+            except sr.UnknownValueError:
+                recognized_txt = ""
+            finally:
+                print("\r",end="",flush=True)
+
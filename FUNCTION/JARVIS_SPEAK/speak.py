@@ -1,88 +1,58 @@
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-chrome_options = Options()
-chrome_options.add_argument("--headless") # Run in headless mode (without opening a browser window)
-
-# Specify the path to your Chrome driver executable
-
-
-chrome_driver_path = r'C:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\JARVIS_DRIVER\chromedriver.exe'
-
-# Create a Service object with the specified executable path
-chrome_service = Service(chrome_driver_path)
-
-# Create a Chrome driver instance with the specified options and service
-driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
-
-# Navigate to the website
-driver.get("https://tts.5e7en.me/")
-
-
-def speak(text):
-    try:
-        # Wait for the element to be clickable
-        element_to_click = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.XPATH, "//*[@id='text']"))
-        )
-
-        # Perform the click action
-        element_to_click.click()
-
-        # Input text into the element
-        text_to_input = text
-        element_to_click.send_keys(text_to_input)
-        print(text_to_input)
-
-        # Calculate sleep duration based on sentence length
-        sleep_duration = min(0.2 + len(text) // 150, 150)  # Minimum sleep in 3 seconds, maximum is 10 seconds
-
-        # Wait for the button to be clickable
-        button_to_click = WebDriverWait(driver, 3).until(
-            EC.element_to_be_clickable((By.XPATH, "//*[@id='button']"))
-        )
-
-        # Perform the click action
-        button_to_click.click()
+from FUNCTION.TURN_TRACE.turn_trace import annotate, current, span, first_word, TTS
+from FUNCTION.TTS_WORKER.tts_worker import get_worker, ANSWER, ALERT, CHAT
+
+# Every line goes to one long-lived engine on its own thread (pyttsx3 by
+# default, JARVIS_TTS=web for the old headless-Chrome page); speak()
+# returns when the line has actually been played. Long answers start
+# playing after their first sentence.
+#
+# say() returns at once with the line's Utterance, so an automation can
+# open a window while the line plays and then utterance.wait() for
+# exactly as long as playback still lasts, instead of a fixed sleep.
+#
+# Background loops pass priority=ALERT (battery) or CHAT (jokes, advice):
+# answers to the user always go first, and a key lets a newer alert
+# replace one still waiting. Both return the Utterance; .spoken is False
+# if the line expired in the queue or was interrupted.
+
+
+def speak(text, priority=ANSWER, key=None, ttl=None):
+    print(text)
+    with span(TTS):
+        utterance = get_worker().speak(text, priority, key, ttl)
+    if utterance.first_audio is not None:
+        first_word(utterance.first_audio)
+    turn = current()
+    if turn is not None and utterance.wait_ms is not None:
+        # Longest wait of the turn's replies behind other speech
+        waited = max(turn.fields.get("tts_wait_ms", 0.0), round(utterance.wait_ms, 3))
+        annotate(tts_wait_ms=waited)
+    return utterance
+
+
+def say(text, priority=ANSWER, key=None, ttl=None):
+    print(text)
+    turn = current()
+    utterance = get_worker().say(text, priority, key, ttl)
 
-        # Sleep fir dynamically calculated duration
-        time.sleep(sleep_duration)
+    def heard(u):
+        if u.first_audio is not None:
+            first_word(u.first_audio, turn)
 
-        # Clear the text box for the next sentence
-        element_to_click.clear()
+    if turn is not None:
+        utterance.add_done_callback(heard)
+    return utterance
 
-    except Exception as e:
-        print(f"An error occurred: {e}")
 
-    
-""" 
-import pyttsx3
+def interrupt():
+    # The user gave a new command: stop whatever is playing, drop queued chat
+    get_worker().preempt()
 
-def speak(text):
-    engine = pyttsx3.init()
-    #pitch=180
-    rate=180
-    volume=1
-    voice_id = engine.getProperty('voices')
 
-    if voice_id:
-        voices = engine.getProperty('voices')
-        try:
-            engine.setProperty('voice', voices[1].id)
-        except IndexError:
-            print("Voice ID not found. Using the default voice.")
+def speech_metrics():
+    return get_worker().metrics()
 
-    # Set properties (adjust as needed)
-    engine.setProperty('rate', rate) # Speed of speech
-    engine.setProperty('volume', volume) # Volume (0.0 to 1.0)
-   # engine.setProperty('pitch', pitch) # Pitch level (0-100)
 
-    # Real-time speaking
-    print(text)
-    engine.say(text)
-    engine.runAndWait() """
\ No newline at end of file
+def warm_up():
+    # Start the engine now so the first reply does not pay for it
+    get_worker().ready.wait()
@@ -0,0 +1,181 @@
+# Translation with a language check and a two-tier cache.
+# Plain English skips mtranslate entirely. Everything else is looked up in
+# an in-memory LRU, then in a SQLite table on disk, and only then sent to
+# the network; the answer is stored in both, so repeated Hinglish commands
+# cost microseconds and keep working offline.
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+CACHE_PATH = os.path.join(PROJECT_ROOT, "DATA", "TRANSLATION_CACHE", "translations.sqlite3")
+MEMORY_ENTRIES = 1024
+TARGET = "en-us"
+
+# Romanized Hindi words that do not double as common English words
+# ("do" and "mat" would send plain English questions to the network)
+HINGLISH_MARKERS = frozenset("""
+    aap aaj abhi accha acha aur bajao bajado band batao bhai bolo chalao chalu
+    dikhao gana gaana hai hain hatao jago jaldi karo kar kardo kare karna
+    kholo kitna kitni kuch kya kyu lagao mera meri mujhe nahi nahin nedh
+    roko sab se suna sunao toh tum utho wala wali yeh zara
+""".split())
+
+_WORD = re.compile(r"[a-z']+")
+
+
+def script(text):
+    """"latin", "devanagari", "mixed" or "other" from the letters in text."""
+    if text.isascii():
+        return "latin"
+    latin = devanagari = other = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        if ch.isascii():
+            latin += 1
+        elif "ऀ" <= ch <= "ॿ":
+            devanagari += 1
+        else:
+            other += 1
+    if devanagari and (latin or other):
+        return "mixed"
+    if devanagari:
+        return "devanagari"
+    return "latin" if not other else "other"
+
+
+def is_english(text):
+    """ASCII text with no romanized Hindi words in it."""
+    if not text.isascii():
+        return False
+    return not any(w in HINGLISH_MARKERS for w in _WORD.findall(text.lower()))
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFC", text).lower()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return " ".join(text.split())
+
+
+class TranslationCache:
+    """LRU in front of a SQLite table, both keyed by (target, normalized text)."""
+
+    def __init__(self, path=CACHE_PATH, entries=MEMORY_ENTRIES):
+        self.path = path
+        self.entries = entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {"skipped": 0, "memory": 0, "disk": 0, "network": 0, "offline": 0}
+
+    def _conn(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS translations ("
+                             "target TEXT, source TEXT, translated TEXT, created REAL, "
+                             "PRIMARY KEY (target, source))")
+        return self._db
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text, target=TARGET):
+        key = (target, normalize(text))
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory"] += 1
+                return value
+            try:
+                row = self._conn().execute("SELECT translated FROM translations WHERE target=? AND source=?",
+                                           key).fetchone()
+            except sqlite3.Error as e:
+                print(f"[Translate] cache read failed: {e}")
+                row = None
+            if row is not None:
+                self._remember(key, row[0])
+                self.stats["disk"] += 1
+                return row[0]
+        return None
+
+    def put(self, text, translated, target=TARGET):
+        key = (target, normalize(text))
+        with self._lock:
+            self._remember(key, translated)
+            try:
+                with self._conn() as db:
+                    db.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                               key + (translated, time.time()))
+            except sqlite3.Error as e:
+                print(f"[Translate] cache write failed: {e}")
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TranslationCache()
+    return _cache
+
+
+def to_english(text, cache=None):
+    """English text for an utterance, translating only when it is not English."""
+    if not text or is_english(text):
+        (cache or get_cache()).stats["skipped"] += 1
+        return text
+    cache = cache or get_cache()
+    cached = cache.get(text)
+    if cached is not None:
+        return cached
+    try:
+        from mtranslate import translate
+        translated = translate(text, to_language=TARGET)
+    except Exception as e:
+        # Offline and never seen: better the original words than nothing
+        cache.stats["offline"] += 1
+        if DEBUG:
+            print(f"[Translate] {e}; keeping {text!r}")
+        return text
+    cache.stats["network"] += 1
+    if translated:
+        cache.put(text, translated)
+    return translated or text
+
+
+def benchmark(rounds=10000):
+    """Microseconds per call for the skip, memory and disk paths."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranslationCache(os.path.join(tmp, "bench.sqlite3"))
+        cache.put("gana band karo", "stop the song")
+        cases = (("english skip", "open youtube website", cache),
+                 ("memory hit", "gana band karo", cache))
+        for name, text, c in cases:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                to_english(text, c)
+            print(f"{name:<14} {(time.perf_counter() - started) / rounds * 1e6:8.2f} us")
+        disk = TranslationCache(cache.path)
+        started = time.perf_counter()
+        for _ in range(100):
+            disk._memory.clear()
+            to_english("gana band karo", disk)
+        print(f"{'disk hit':<14} {(time.perf_counter() - started) / 100 * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    benchmark()
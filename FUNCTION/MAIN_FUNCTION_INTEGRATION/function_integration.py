@@ -1,26 +1,36 @@
-from FUNCTION.CHECK_INTERNET_SPEED.check_internet_speed import *
-from FUNCTION.CHECK_ONLINE_OFFLINE_STATUS.check_online_offline_status import *
-from FUNCTION.CHECK_TEMPERATURE.check_temperature import *
-from FUNCTION.CLOCK.clock import *
-from FUNCTION.FIND_MY_IP.find_my_ip import *
-from FUNCTION.MUSIC_WITH_CLAP.clap_with_music import *
+from FUNCTION.INTENT_ROUTER.intent_router import TIER_FUNCTION
+from FUNCTION.SKILL_REGISTRY.skill_registry import skill, register, resolve, index_for
+
+# Heavy modules, imported only when one of their skills fires
+INTERNET_SPEED = "FUNCTION.CHECK_INTERNET_SPEED.check_internet_speed"
+ONLINE_STATUS = "FUNCTION.CHECK_ONLINE_OFFLINE_STATUS.check_online_offline_status"
+TEMPERATURE = "FUNCTION.CHECK_TEMPERATURE.check_temperature"
+CLOCK = "FUNCTION.CLOCK.clock"
+FIND_MY_IP = "FUNCTION.FIND_MY_IP.find_my_ip"
+CLAP_MUSIC = "FUNCTION.MUSIC_WITH_CLAP.clap_with_music"
+SPEAK = "FUNCTION.JARVIS_SPEAK.speak"
+
+
+register("internet_speed", ("check internet speed", "check speed test", "speed test"), INTERNET_SPEED + ":check_internet_speed", tier=TIER_FUNCTION)
+register("internet_status", ("are you there", "hello there"), ONLINE_STATUS + ":internet_status", tier=TIER_FUNCTION)
+register("temperature", ("check temperature", "temperature"), TEMPERATURE + ":Temp", tier=TIER_FUNCTION)
+
+
+@skill("find_my_ip", ("find my ip", "ip address"), FIND_MY_IP, tier=TIER_FUNCTION)
+def say_my_ip(mod):
+    resolve(SPEAK + ":speak")("your ip is "+ mod.find_my_ip())
+
+
+register("time", ("what is the time", "time", "what time is"), CLOCK + ":what_is_the_time", tier=TIER_FUNCTION)
+
+
+@skill("clap_music", ("start clap with music system", "start smart music system"), CLAP_MUSIC, tier=TIER_FUNCTION)
+def start_clap_music(mod):
+    resolve(SPEAK + ":speak")("ok now starting")
+    mod.clap_to_music()
 
 
 def Function_cmd(text):
-    if "check internet speed" in text or "check speed test" in text or "speed test" in text:
-        check_internet_speed()
-    elif "are you there" in text or "hello there" in text:
-        internet_status()
-    elif "check temperature" in text or "temperature" in text:
-        Temp()
-    elif "find my ip" in text or "ip address" in text:
-        speak("your ip is "+ find_my_ip())
-    elif "what is the time" in text or "time" in text or "what time is" in text:
-        speak("your ip is "+ find_my_ip())
-    elif "start clap with music system" in text or "start smart music system" in text:
-        speak("ok now starting")
-        clap_to_music()
-    else:
-        pass
-
-#Function_cmd("find my ip")  # Commented out to prevent auto-execution
\ No newline at end of file
+    index_for(TIER_FUNCTION).dispatch(text)
+
+#Function_cmd("find my ip")  # Commented out to prevent auto-execution
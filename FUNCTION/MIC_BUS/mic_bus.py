@@ -0,0 +1,316 @@
+# Shared microphone capture bus.
+# One capture thread owns the only input stream and writes fixed-size frames
+# into a ring buffer. Every consumer (wake word, command ASR, clap detection,
+# VAD) subscribes with its own read cursor, so nobody opens the device per
+# turn and clap detection can run while speech is being recognized.
+import threading
+import time
+
+try:
+    import speech_recognition as sr
+    _AudioSource = sr.AudioSource
+except Exception:
+    _AudioSource = object
+
+DEBUG = False
+
+RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2            # paInt16
+FRAME_MS = 20
+FRAME_SAMPLES = RATE * FRAME_MS // 1000
+FRAME_BYTES = FRAME_SAMPLES * SAMPLE_WIDTH * CHANNELS
+RING_SECONDS = 10
+
+# Same preference the clap detector used when it opened its own stream
+DEVICE_KEYWORDS = ("mic", "input")
+
+
+class RingBuffer:
+    """Fixed number of frame slots with one writer and any number of readers.
+
+    Each slot holds (seq, frame, time) as one tuple, stored with a single
+    reference assignment before head is bumped, so readers never take a
+    lock: a reader that loses the race with the writer finds a newer seq
+    in the slot and gets None instead of a newer frame under the old seq.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self.head = 0
+
+    def write(self, frame, ts=None):
+        seq = self.head
+        self._slots[seq % self.capacity] = (seq, frame, time.monotonic() if ts is None else ts)
+        self.head = seq + 1
+        return seq
+
+    @property
+    def oldest(self):
+        return max(0, self.head - self.capacity)
+
+    def _slot(self, seq):
+        if seq < 0 or seq >= self.head:
+            return None
+        slot = self._slots[seq % self.capacity]
+        # The writer may have lapped us: the slot now stamps a newer seq
+        if slot is None or slot[0] != seq:
+            return None
+        return slot
+
+    def get(self, seq):
+        """Frame seq, or None if it was overwritten or is not written yet."""
+        slot = self._slot(seq)
+        return None if slot is None else slot[1]
+
+    def timestamp(self, seq):
+        """When frame seq was written, or None if it was overwritten or is not written yet."""
+        slot = self._slot(seq)
+        return None if slot is None else slot[2]
+
+
+class Subscription:
+    """A consumer's cursor into the bus."""
+
+    def __init__(self, bus, name, start):
+        self.bus = bus
+        self.name = name
+        self.cursor = start
+        self.dropped = 0
+        self.closed = False
+
+    def read(self, timeout=None):
+        """Next frame (FRAME_BYTES of int16 mono), or b"" on timeout/close."""
+        ring = self.bus.ring
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.closed:
+            if self.cursor < ring.oldest:
+                # Fell more than RING_SECONDS behind; skip to what is left
+                self.dropped += ring.oldest - self.cursor
+                self.cursor = ring.oldest
+            frame = ring.get(self.cursor)
+            if frame is not None:
+                self.cursor += 1
+                return frame
+            if not self.bus.running:
+                return b""
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return b""
+            self.bus.wait_for_frame(self.cursor, remaining)
+        return b""
+
+    def frames(self):
+        while True:
+            frame = self.read()
+            if not frame:
+                return
+            yield frame
+
+    def pending(self):
+        return self.bus.ring.head - self.cursor
+
+    def drain(self):
+        """Skip everything already captured; the next read is live audio."""
+        self.cursor = self.bus.ring.head
+
+    def rewind(self, seconds, after=None):
+        """Move the cursor back up to seconds of already captured audio.
+
+        after is a bus position (another subscription's cursor) the rewind
+        stops at, so audio someone already consumed is not heard twice.
+        """
+        frames = int(seconds * 1000 / FRAME_MS)
+        self.cursor = max(self.bus.ring.oldest, self.bus.ring.head - frames, after or 0)
+
+    def close(self):
+        self.closed = True
+        self.bus.unsubscribe(self)
+
+
+class MicBus:
+    """Owns the microphone; start() opens it once for the whole process."""
+
+    def __init__(self, ring_seconds=RING_SECONDS, device_index=None):
+        self.ring = RingBuffer(int(ring_seconds * 1000 / FRAME_MS))
+        self.device_index = device_index
+        self.running = False
+        self.device_opens = 0
+        self.read_errors = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition()
+        self._thread = None
+        self._pa = None
+        self._stream = None
+
+    # ---- capture side ----
+    def find_input_device(self, pa):
+        for i in range(pa.get_device_count()):
+            info = pa.get_device_info_by_index(i)
+            if info.get("maxInputChannels", 0) <= 0:
+                continue
+            if any(k in info["name"].lower() for k in DEVICE_KEYWORDS):
+                return i
+        if DEBUG:
+            print("[MicBus] no preferred input found, using default input device.")
+        return None
+
+    def open_stream(self):
+        import pyaudio
+        self._pa = pyaudio.PyAudio()
+        if self.device_index is None:
+            self.device_index = self.find_input_device(self._pa)
+        self.device_opens += 1
+        return self._pa.open(format=pyaudio.paInt16,
+                             channels=CHANNELS,
+                             rate=RATE,
+                             input=True,
+                             input_device_index=self.device_index,
+                             frames_per_buffer=FRAME_SAMPLES)
+
+    def start(self, stream=None):
+        """Start capturing; a stream with read(n) can stand in for the mic."""
+        with self._lock:
+            if self.running:
+                return self
+            self._stream = stream if stream is not None else self.open_stream()
+            self.running = True
+            self._thread = threading.Thread(target=self._capture, name="mic-bus", daemon=True)
+            self._thread.start()
+        if DEBUG:
+            print(f"[MicBus] capturing {RATE} Hz in {FRAME_MS} ms frames")
+        return self
+
+    def _capture(self):
+        while self.running:
+            try:
+                frame = self._stream.read(FRAME_SAMPLES, exception_on_overflow=False)
+            except TypeError:
+                frame = self._stream.read(FRAME_SAMPLES)
+            except Exception as e:
+                self.read_errors += 1
+                if DEBUG:
+                    print(f"[MicBus] ({self.read_errors}) error recording: {e}")
+                time.sleep(FRAME_MS / 1000.0)
+                continue
+            if not frame:
+                break
+            self.ring.write(frame)
+            with self._new_frame:
+                self._new_frame.notify_all()
+        self.running = False
+        with self._new_frame:
+            self._new_frame.notify_all()
+
+    def wait_for_frame(self, seq, timeout=None):
+        with self._new_frame:
+            if self.ring.head <= seq and self.running:
+                self._new_frame.wait(timeout if timeout is not None else 1.0)
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        stream, self._stream = self._stream, None
+        for close in ("stop_stream", "close"):
+            try:
+                getattr(stream, close)()
+            except Exception:
+                pass
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    # ---- consumer side ----
+    def subscribe(self, name="consumer", preroll=0.0, after=None):
+        sub = Subscription(self, name, self.ring.head)
+        if preroll:
+            sub.rewind(preroll, after)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    @property
+    def subscribers(self):
+        with self._lock:
+            return [s.name for s in self._subscribers]
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """The process-wide bus, started on first use."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = MicBus()
+        if not _bus.running:
+            _bus.start()
+    return _bus
+
+
+def subscribe(name="consumer", preroll=0.0, after=None):
+    return get_bus().subscribe(name, preroll, after)
+
+
+class _SubscriptionStream:
+    """The stream.read(n) interface speech_recognition expects."""
+
+    def __init__(self, sub):
+        self.sub = sub
+        self._buffer = b""
+
+    def read(self, size):
+        want = size * SAMPLE_WIDTH * CHANNELS
+        while len(self._buffer) < want:
+            frame = self.sub.read()
+            if not frame:
+                break
+            self._buffer += frame
+        data, self._buffer = self._buffer[:want], self._buffer[want:]
+        return data
+
+    def close(self):
+        self.sub.close()
+
+
+class MicSource(_AudioSource):
+    """Drop-in for sr.Microphone() that reads from the shared bus.
+
+    Entering it subscribes instead of opening the device, so
+    recognizer.listen(source) and adjust_for_ambient_noise(source) work
+    unchanged.
+    """
+
+    def __init__(self, name="asr", preroll=0.0, bus=None, after=None):
+        self.name = name
+        self.preroll = preroll
+        self.after = after
+        self.bus = bus
+        self.SAMPLE_RATE = RATE
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = FRAME_SAMPLES
+        self.stream = None
+
+    def __enter__(self):
+        bus = self.bus or get_bus()
+        self.stream = _SubscriptionStream(bus.subscribe(self.name, self.preroll, self.after))
+        return self
+
+    @property
+    def position(self):
+        """Bus position of the next frame this source will read."""
+        return self.stream.sub.cursor - len(self.stream._buffer) // FRAME_BYTES
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.close()
+        self.stream = None
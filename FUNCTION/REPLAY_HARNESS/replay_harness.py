@@ -0,0 +1,389 @@
+# Headless replay harness.
+# Feeds a file of transcripts through the same handle_command() path that
+# comain() uses, with no microphone, speech output or real browser:
+# listen, speak, pyautogui, Selenium, pywhatkit and webbrowser are replaced
+# by stub backends that record what would have happened.
+#
+# Transcript format, one command per line ('#' starts a comment):
+#     <utterance> [TAB <expected intent>] [TAB <reply> | <reply> ...]
+# Replies answer follow-up listen() prompts such as "which song?".
+import json
+import sys
+import time
+import types
+import webbrowser
+from collections import deque
+
+from FUNCTION.ANSWER_CACHE.answer_cache import AnswerCache, set_cache
+from FUNCTION.TTS_WORKER.tts_worker import Utterance
+from FUNCTION.TURN_TRACE.turn_trace import percentile
+
+
+# =============================
+# Stub backends
+# =============================
+class StubListen:
+    """Answers listen()/hearing() from queued replies, '' when none are left."""
+
+    def __init__(self):
+        self.replies = deque()
+        self.prompts = 0
+
+    def queue(self, replies):
+        self.replies.extend(replies)
+
+    def listen(self):
+        self.prompts += 1
+        return self.replies.popleft() if self.replies else ""
+
+    hearing = listen
+
+    def Trans_hindi_to_english(self, txt):
+        return txt
+
+    def module(self):
+        mod = types.ModuleType("FUNCTION.JARVIS_LISTEN.listen")
+        mod.listen = self.listen
+        mod.hearing = self.hearing
+        mod.Trans_hindi_to_english = self.Trans_hindi_to_english
+        return mod
+
+
+class StubSpeak:
+    """Records every line instead of synthesizing it."""
+
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text, priority=0, key=None, ttl=None):
+        return self.say(text, priority, key, ttl)
+
+    def say(self, text, priority=0, key=None, ttl=None):
+        self.spoken.append(text)
+        utterance = Utterance(text, priority, key, ttl)
+        utterance.finish()
+        return utterance
+
+    def interrupt(self):
+        return None
+
+    def warm_up(self):
+        return None
+
+    def module(self):
+        mod = types.ModuleType("FUNCTION.JARVIS_SPEAK.speak")
+        mod.speak = self.speak
+        mod.say = self.say
+        mod.interrupt = self.interrupt
+        mod.warm_up = self.warm_up
+        return mod
+
+
+class CallRecorder:
+    """Module stand-in whose every attribute is a function that logs its call."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def module(self):
+        mod = types.ModuleType(self.name)
+        recorder = self
+
+        def __getattr__(attr):
+            if attr.startswith("__"):
+                raise AttributeError(attr)
+
+            def call(*args, **kwargs):
+                recorder.calls.append((attr, args))
+            return call
+
+        mod.__getattr__ = __getattr__
+        return mod
+
+
+class StubElement:
+    def __init__(self, text=""):
+        self.text = text
+
+    def click(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def send_keys(self, *keys):
+        pass
+
+    def get_attribute(self, name):
+        return ""
+
+
+class StubDriver:
+    """Just enough of a Chrome webdriver for the brain and TTS code paths."""
+
+    snippet = ("This is a canned search result served by the replay harness. "
+               "It stands in for the first Google snippet. It has enough sentences to summarize.")
+
+    def __init__(self, *args, **kwargs):
+        self.current_url = ""
+        self.window_handles = ["stub"]
+        self.page_source = f"<html><body><p>{self.snippet}</p></body></html>"
+        self.pages = 0
+
+    def get(self, url):
+        self.current_url = url
+        self.pages += 1
+
+    def find_element(self, *args, **kwargs):
+        return StubElement(self.snippet)
+
+    def find_elements(self, *args, **kwargs):
+        return [StubElement(self.snippet)]
+
+    def execute_script(self, *args, **kwargs):
+        return None
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+
+class StubSelenium:
+    """Builds a fake 'selenium' package tree backed by StubDriver."""
+
+    def __init__(self, driver_class=StubDriver):
+        self.driver_class = driver_class
+
+    def modules(self):
+        def make(name, **attrs):
+            mod = types.ModuleType(name)
+            mod.__dict__.update(attrs)
+            return mod
+
+        class Options:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def add_argument(self, *args):
+                pass
+
+            def add_experimental_option(self, *args):
+                pass
+
+            def set_capability(self, *args):
+                pass
+
+        class Service:
+            def __init__(self, *args, **kwargs):
+                pass
+
+        class WebDriverWait:
+            def __init__(self, driver, timeout, *args, **kwargs):
+                self.driver = driver
+
+            def until(self, condition, *args):
+                return condition(self.driver) if callable(condition) else StubElement()
+
+        def locate(locator):
+            return lambda driver: driver.find_element(*locator)
+
+        class _Names:
+            def __getattr__(self, attr):
+                return attr
+
+        class ActionChains:
+            def __init__(self, driver, *args, **kwargs):
+                pass
+
+            def __getattr__(self, attr):
+                return lambda *args, **kwargs: self
+
+            def perform(self):
+                pass
+
+        class TimeoutException(Exception):
+            pass
+
+        ec = make("selenium.webdriver.support.expected_conditions",
+                  presence_of_element_located=locate, element_to_be_clickable=locate,
+                  visibility_of_element_located=locate)
+        webdriver = make("selenium.webdriver", Chrome=self.driver_class, ChromeOptions=Options,
+                         ActionChains=ActionChains)
+        return {
+            "selenium": make("selenium", webdriver=webdriver),
+            "selenium.webdriver": webdriver,
+            "selenium.webdriver.chrome": make("selenium.webdriver.chrome"),
+            "selenium.webdriver.chrome.service": make("selenium.webdriver.chrome.service", Service=Service),
+            "selenium.webdriver.chrome.options": make("selenium.webdriver.chrome.options", Options=Options),
+            "selenium.webdriver.common": make("selenium.webdriver.common"),
+            "selenium.webdriver.common.by": make("selenium.webdriver.common.by", By=_Names()),
+            "selenium.webdriver.common.keys": make("selenium.webdriver.common.keys", Keys=_Names()),
+            "selenium.webdriver.support": make("selenium.webdriver.support", expected_conditions=ec),
+            "selenium.webdriver.support.ui": make("selenium.webdriver.support.ui", WebDriverWait=WebDriverWait),
+            "selenium.webdriver.support.wait": make("selenium.webdriver.support.wait", WebDriverWait=WebDriverWait),
+            "selenium.webdriver.support.expected_conditions": ec,
+            "selenium.common": make("selenium.common"),
+            "selenium.common.exceptions": make("selenium.common.exceptions", TimeoutException=TimeoutException,
+                                               ElementClickInterceptedException=TimeoutException,
+                                               StaleElementReferenceException=TimeoutException),
+        }
+
+
+class Backends:
+    """The pluggable set of stubs; swap any attribute before install()."""
+
+    def __init__(self):
+        self.listen = StubListen()
+        self.speak = StubSpeak()
+        self.pyautogui = CallRecorder("pyautogui")
+        self.pywhatkit = CallRecorder("pywhatkit")
+        self.browser = CallRecorder("webbrowser")
+        self.selenium = StubSelenium()
+        self.real_sleep = False
+        self._saved = {}
+
+    def install(self):
+        stubs = {
+            "FUNCTION.JARVIS_LISTEN.listen": self.listen.module(),
+            "FUNCTION.JARVIS_SPEAK.speak": self.speak.module(),
+            "pyautogui": self.pyautogui.module(),
+            "pywhatkit": self.pywhatkit.module(),
+        }
+        stubs.update(self.selenium.modules())
+        for name, mod in stubs.items():
+            self._saved[name] = sys.modules.get(name)
+            sys.modules[name] = mod
+        browser = self.browser.module()
+        self._saved["webbrowser.open"] = webbrowser.open
+        webbrowser.open = browser.open
+        # Handlers sleep to wait for real windows; nothing to wait for here
+        self._saved["time.sleep"] = time.sleep
+        if not self.real_sleep:
+            time.sleep = lambda seconds: None
+        # Canned search results must not reach the real answer cache
+        self._saved["answer_cache"] = set_cache(AnswerCache(":memory:"))
+        return self
+
+    def uninstall(self):
+        webbrowser.open = self._saved.pop("webbrowser.open", webbrowser.open)
+        time.sleep = self._saved.pop("time.sleep", time.sleep)
+        if "answer_cache" in self._saved:
+            set_cache(self._saved.pop("answer_cache"))
+        for name, mod in self._saved.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
+        self._saved.clear()
+
+    def side_effects(self):
+        return len(self.speak.spoken) + len(self.pyautogui.calls) + len(self.pywhatkit.calls) + len(self.browser.calls)
+
+
+# =============================
+# Replay
+# =============================
+def read_transcripts(path):
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            cols = line.split("\t")
+            text = cols[0].strip()
+            expected = cols[1].strip() if len(cols) > 1 and cols[1].strip() else None
+            replies = [r.strip() for r in cols[2].split("|")] if len(cols) > 2 and cols[2].strip() else []
+            cases.append((text, expected, replies))
+    return cases
+
+
+def replay(cases, backends=None, route_only=False):
+    """Run every case through handle_command(); returns (results, stats)."""
+    backends = backends or Backends()
+    backends.install()
+    try:
+        from FUNCTION.INTENT_ROUTER import intent_router
+        intent_router.DEBUG = False
+        from FUNCTION.SKILL_REGISTRY import skill_registry
+        skill_registry.DEBUG = False
+        from MAIN import main as jarvis_main
+
+        results = []
+        started = time.perf_counter()
+        for text, expected, replies in cases:
+            backends.listen.queue(replies)
+            effects = backends.side_effects()
+            error = ""
+            t0 = time.perf_counter()
+            try:
+                # As main() does with the first utterance: a wake phrase may lead the command
+                wake, command = jarvis_main.split_wake_word(jarvis_main.clean_command(text))
+                if route_only:
+                    route = jarvis_main.route_command(command, wake)
+                else:
+                    route = jarvis_main.handle_command(command, wake)
+            except Exception as e:
+                route = jarvis_main.route_command(command, wake)
+                error = f"{type(e).__name__}: {e}"
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            backends.listen.replies.clear()
+            intent = route.intent.name if route.intent else None
+            results.append({
+                "text": text,
+                "intent": intent,
+                "slot": route.slot,
+                "expected": expected,
+                "ok": expected is None or expected == (intent or "-"),
+                "route_ms": round(route.match_ms, 4),
+                "elapsed_ms": round(elapsed_ms, 3),
+                "side_effects": backends.side_effects() - effects,
+                "error": error,
+            })
+        wall = time.perf_counter() - started
+    finally:
+        backends.uninstall()
+
+    stats = {"commands": len(results), "seconds": wall,
+             "commands_per_second": len(results) / wall if wall > 0 else 0.0, "handlers": {}}
+    by_handler = {}
+    for r in results:
+        by_handler.setdefault(r["intent"] or "-", []).append(r["elapsed_ms"])
+    for name, values in sorted(by_handler.items()):
+        values.sort()
+        stats["handlers"][name] = {"count": len(values), "p50": percentile(values, 50),
+                                   "p95": percentile(values, 95), "max": values[-1]}
+    stats["mismatches"] = sum(1 for r in results if not r["ok"])
+    stats["errors"] = sum(1 for r in results if r["error"])
+    return results, stats
+
+
+def print_report(results, stats):
+    width = max([len(r["text"]) for r in results] + [4])
+    for r in results:
+        mark = "ok " if r["ok"] else "FAIL"
+        expected = "" if r["ok"] or r["expected"] is None else f" (expected {r['expected']})"
+        error = f"  ! {r['error']}" if r["error"] else ""
+        print(f"{mark} {r['text']:<{width}}  -> {r['intent'] or '-'}{expected}  {r['elapsed_ms']:.2f} ms{error}")
+    print()
+    print(f"{'handler':<28} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for name, h in stats["handlers"].items():
+        print(f"{name:<28} {h['count']:>6} {h['p50']:>10.3f} {h['p95']:>10.3f} {h['max']:>10.3f}")
+    print()
+    print(f"{stats['commands']} commands in {stats['seconds']:.3f}s "
+          f"({stats['commands_per_second']:.0f} commands/s), "
+          f"{stats['mismatches']} routing mismatches, {stats['errors']} handler errors")
+
+
+def run_replay(path, route_only=False, json_path=None, real_sleep=False):
+    backends = Backends()
+    backends.real_sleep = real_sleep
+    results, stats = replay(read_transcripts(path), backends, route_only=route_only)
+    print_report(results, stats)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "stats": stats}, f, indent=2)
+    return 1 if stats["mismatches"] else 0
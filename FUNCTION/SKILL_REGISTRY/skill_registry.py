@@ -0,0 +1,170 @@
+# Lazy skill registry.
+# Skills declare their trigger phrases and the module that does the work;
+# that module (Selenium, pywhatkit, pygame, pyautogui, sumy...) is only
+# imported the first time the skill fires, or by warm() in the background.
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from FUNCTION.INTENT_ROUTER.intent_router import Intent, CommandIndex, CONTAINS, normalize
+
+DEBUG = False
+
+# Light modules that declare skills; importing them must stay cheap
+SKILL_MANIFESTS = (
+    "AUTOMATION.JARVIS_AUTOMATION_YOUTUBE.INTEGRATION_MAIN.integration_main",
+    "AUTOMATION.JARVIS_AUTOMATION_GOOGLE.GOOGLE_INETGRATION_MAIN.google_integration_main",
+    "AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_INTEGRATION_MAIN.battery_integration_main",
+    "AUTOMATION.COMMON_AUTOMATION.COMMON_INTEGRATION.common_integration",
+    "FUNCTION.MAIN_FUNCTION_INTEGRATION.function_integration",
+    "BRAIN.MAIN_BRAIN_INTEGRATION.brain_integration",
+)
+
+
+@dataclass
+class Skill:
+    name: str
+    phrases: tuple
+    module: str
+    handler: Callable
+    match: str = CONTAINS
+    slot: object = False
+    tier: int = 0
+
+    def __call__(self, *args):
+        return self.handler(load(self.module), *args)
+
+    def intent(self) -> Intent:
+        return Intent(self.name, self.phrases, self, self.match, self.slot)
+
+
+_skills = {}
+_modules = {}
+_lock = threading.Lock()
+
+
+def load(module: str):
+    """Import module on first use and keep it for every later call."""
+    mod = _modules.get(module)
+    if mod is not None:
+        return mod
+    with _lock:
+        mod = _modules.get(module)
+        if mod is None:
+            started = time.perf_counter()
+            mod = importlib.import_module(module)
+            _modules[module] = mod
+            if DEBUG:
+                print(f"[Skills] loaded {module} in {time.perf_counter() - started:.2f}s")
+    return mod
+
+
+def resolve(target: str):
+    """Return the callable named by 'package.module:attribute', importing lazily."""
+    module, _, attr = target.partition(":")
+    return getattr(load(module), attr)
+
+
+def skill(name, phrases, module, match=CONTAINS, slot=False, tier=0):
+    """Decorator: handler(mod[, slot]) runs with module imported on first use."""
+    def wrap(handler):
+        _skills[name] = Skill(name, tuple(phrases), module, handler, match, slot, tier)
+        return handler
+    return wrap
+
+
+def register(name, phrases, target, match=CONTAINS, slot=False, tier=0):
+    """Declare a skill that just calls 'package.module:attribute'."""
+    module, _, attr = target.partition(":")
+
+    def handler(mod, *args):
+        return getattr(mod, attr)(*args)
+
+    _skills[name] = Skill(name, tuple(phrases), module, handler, match, slot, tier)
+
+
+def skills(tiers=None):
+    return [s for s in _skills.values() if tiers is None or s.tier in tiers]
+
+
+def import_manifests():
+    for manifest in SKILL_MANIFESTS:
+        importlib.import_module(manifest)
+
+
+_indexes = {}
+
+
+def index_for(*tiers) -> CommandIndex:
+    """Compiled index over the skills of the given tiers (all tiers if none)."""
+    key = tiers or None
+    index = _indexes.get(key)
+    if index is None:
+        index = CommandIndex()
+        for s in skills(tiers or None):
+            index.add([s.intent()], s.tier)
+        _indexes[key] = index.build()
+    return index
+
+
+def build_command_index() -> CommandIndex:
+    """Compile every declared skill into one index, once at startup."""
+    import_manifests()
+    return index_for()
+
+
+_prewarming = set()
+
+
+def prewarm(text, index=None):
+    """Start importing the module of whichever skill text is heading for.
+
+    Fed partial ASR hypotheses: a routed match, or a trigger phrase that
+    starts with what has been heard so far ("play" -> "play music").
+    """
+    text = normalize(text)
+    if len(text) < 3:
+        return None
+    route = (index or index_for()).route(text)
+    candidates = [route.intent.action] if route.intent is not None else []
+    if not candidates:
+        candidates = [s for s in skills() if any(normalize(p).startswith(text) for p in s.phrases)]
+    modules = [m for m in dict.fromkeys(getattr(c, "module", None) for c in candidates)
+               if m and m not in _modules and m not in _prewarming]
+    if not modules:
+        return None
+    _prewarming.update(modules)
+
+    def run():
+        for module in modules:
+            try:
+                load(module)
+            except Exception as e:
+                # Not retried on every partial; the skill itself reports it when run
+                print(f"[Skills] could not prewarm {module}: {e}")
+
+    thread = threading.Thread(target=run, name="skill-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm(modules=(), background=True):
+    """Import every skill module (plus extra modules) so first use is instant."""
+    def run():
+        started = time.perf_counter()
+        for module in tuple(modules) + tuple(dict.fromkeys(s.module for s in skills())):
+            try:
+                load(module)
+            except Exception as e:
+                print(f"[Skills] could not preload {module}: {e}")
+        if DEBUG:
+            print(f"[Skills] warm-up done in {time.perf_counter() - started:.2f}s")
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="skill-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,189 @@
+# Pre-rendered audio for canned dialogue.
+# Most replies are random picks from the fixed lists in DLG.py. `build`
+# renders every one of them once with the current voice and stores the
+# audio compressed, named by a hash of the text, in a directory named by a
+# hash of the voice settings; changing voice, rate or engine simply starts
+# a new directory. The TTS worker plays a cached line straight away and
+# renders lines it had to synthesize live into the cache when it is idle.
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import wave
+import zlib
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+CACHE_DIR = os.path.join(PROJECT_ROOT, "DATA", "SPEECH_CACHE")
+SUFFIX = ".wav.z"
+
+# DLG lists that are spoken as they are (the rest are trigger phrases)
+CANNED_LISTS = (
+    "good_morningdlg", "good_afternoondlg", "good_eveningdlg", "good_nightdlg",
+    "welcome_dlg", "res_bye", "open_dlg", "playdlg", "pausedlg", "closedlg",
+    "open_maybe", "sorry_open", "success_open", "offline_dlg", "online_dlg",
+    "low_b", "last_low", "full_battery", "plug_in", "plug_out", "search_result",
+    "yt_search", "s1", "s2", "playsong", "q", "playing_dlg",
+)
+
+
+def canned_lines():
+    from DATA.JARVIS_DLG_DATASET import DLG
+    lines = []
+    for name in CANNED_LISTS:
+        lines.extend(getattr(DLG, name, ()))
+    return list(dict.fromkeys(line for line in lines if line.strip()))
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def voice_key(settings):
+    """Short hash of everything that changes how a line sounds."""
+    blob = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+def wav_seconds(data):
+    with wave.open(io.BytesIO(data), "rb") as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+def render_bytes(engine, text):
+    """WAV bytes of text from an engine that can only render to a file."""
+    fd, tmp = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        engine.render(text, tmp)
+        with open(tmp, "rb") as f:
+            data = f.read()
+    finally:
+        os.remove(tmp)
+    wav_seconds(data)        # refuse anything that is not a WAV
+    return data
+
+
+class SpeechCache:
+    """WAV audio per (voice settings, text), zlib-compressed on disk."""
+
+    def __init__(self, settings, root=CACHE_DIR):
+        self.settings = settings
+        self.root = root
+        self.key = voice_key(settings)
+        self.dir = os.path.join(root, self.key)
+        self.stats = {"hits": 0, "misses": 0, "rendered": 0}
+        self._lock = threading.Lock()
+
+    def path(self, text):
+        digest = hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()
+        return os.path.join(self.dir, digest + SUFFIX)
+
+    def __contains__(self, text):
+        return os.path.exists(self.path(text))
+
+    def get(self, text):
+        """WAV bytes for text, or None."""
+        try:
+            with open(self.path(text), "rb") as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+        return data
+
+    def put(self, text, wav_bytes):
+        os.makedirs(self.dir, exist_ok=True)
+        path = self.path(text)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(wav_bytes, 6))
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats["rendered"] += 1
+
+    def render(self, engine, text):
+        """Have engine synthesize text to a file and keep it."""
+        data = render_bytes(engine, text)
+        self.put(text, data)
+        return data
+
+    def write_manifest(self):
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, "voice.json"), "w", encoding="utf-8") as f:
+            json.dump(self.settings, f, indent=2, sort_keys=True, default=str)
+
+    def prune(self):
+        """Delete audio rendered with other voice settings."""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        for name in os.listdir(self.root):
+            if name != self.key and os.path.isdir(os.path.join(self.root, name)):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                removed += 1
+        return removed
+
+
+def build(engine=None, lines=None, root=CACHE_DIR):
+    """Render every canned line not cached yet with the current voice."""
+    from FUNCTION.TTS_WORKER.tts_worker import DEFAULT_ENGINE, ENGINES
+    engine = engine or ENGINES[DEFAULT_ENGINE]()
+    engine.open()
+    try:
+        settings = engine.voice_settings()
+        if settings is None:
+            print(f"[SpeechCache] the {engine.name} engine cannot render to files")
+            return None
+        cache = SpeechCache(settings, root)
+        cache.write_manifest()
+        removed = cache.prune()
+        todo = [line for line in (lines if lines is not None else canned_lines()) if line not in cache]
+        started = time.perf_counter()
+        for i, line in enumerate(todo, 1):
+            try:
+                cache.render(engine, line)
+            except Exception as e:
+                print(f"[SpeechCache] could not render {line!r}: {e}")
+            if DEBUG and i % 25 == 0:
+                print(f"[SpeechCache] {i}/{len(todo)}")
+        size = sum(os.path.getsize(os.path.join(cache.dir, n)) for n in os.listdir(cache.dir))
+        print(f"[SpeechCache] {cache.stats['rendered']} lines rendered in {time.perf_counter() - started:.1f}s "
+              f"into {cache.dir} ({size / 1024:.0f} KB, {removed} old voice dirs removed)")
+        return cache
+    finally:
+        engine.close()
+
+
+def benchmark():
+    """Time to first audio for a canned line: cached against live synthesis."""
+    from FUNCTION.TTS_WORKER.tts_worker import StandInEngine, TTSWorker
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = canned_lines()[:20]
+        # Stand-in timings: 400 ms to synthesize a line, 30 characters a second
+        engine = StandInEngine(synth_ms=400.0, chars_per_second=30.0)
+        build(StandInEngine(synth_ms=0.0, chars_per_second=30.0), lines, tmp)
+        worker = TTSWorker(engine, cache_root=tmp)
+        live = [worker.speak(line + " (live)") for line in lines[:5]]
+        cached = [worker.speak(line) for line in lines[:5]]
+        worker.stop()
+        for name, utterances in (("live", live), ("cached", cached)):
+            ttfa = sorted(u.time_to_first_audio_ms for u in utterances)
+            print(f"{name:<7} time to first audio: median {ttfa[len(ttfa) // 2]:6.1f} ms")
+        print(f"cache stats: {worker.cache.stats}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["build"]:
+        build()
+    else:
+        benchmark()
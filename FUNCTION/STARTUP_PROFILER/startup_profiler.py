@@ -0,0 +1,248 @@
+# Startup / import-time profiler.
+# Imports every module under AUTOMATION/, BRAIN/, FUNCTION/ and DATA/ with a
+# meta-path hook that records wall time and RSS growth for each import
+# (module-level side effects included), then prints a sorted table and
+# writes a Chrome trace (open it in chrome://tracing or Perfetto).
+import importlib
+import importlib.abc
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import psutil
+    _process = psutil.Process()
+except Exception:
+    _process = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+PROFILED_PACKAGES = ("AUTOMATION", "BRAIN", "FUNCTION", "DATA")
+
+# Standalone scripts that import their siblings as top-level packages (core, util, youtube)
+EXTRA_PATHS = (
+    os.path.join(PROJECT_ROOT, "AUTOMATION", "JARVIS_AUTOMATION_YOUTUBE", "YOUTUBE_VIDEO_HOME"),
+)
+
+# Modules whose import never returns (interactive loops at module level)
+SKIP_MODULES = (
+    "AUTOMATION.JARVIS_AUTOMATION_YOUTUBE.YOUTUBE_VIDEO_HOME.youtube_test",
+)
+
+# Side effects that moved out of import time but still cost a cold start
+PROBES = (
+    "FUNCTION.JARVIS_SPEAK.speak:warm_up",
+)
+
+
+def rss_bytes() -> int:
+    if _process is not None:
+        return _process.memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+class ImportRecord:
+    def __init__(self, name, depth, parent, kind="import"):
+        self.name = name
+        self.depth = depth
+        self.parent = parent
+        self.kind = kind
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = self.start
+        self.rss_start = rss_bytes()
+        self.rss_end = self.rss_start
+        self.child_time = 0.0
+        self.error = ""
+
+    @property
+    def total(self):
+        return self.end - self.start
+
+    @property
+    def self_time(self):
+        return self.total - self.child_time
+
+    @property
+    def rss_delta(self):
+        return self.rss_end - self.rss_start
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.span(module.__name__):
+            self._loader.exec_module(module)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta-path hook timing every module executed while installed."""
+
+    def __init__(self):
+        self.records = []
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def span(self, name, kind="import"):
+        profiler = self
+
+        class _Span:
+            def __enter__(self):
+                stack = profiler._stack()
+                parent = stack[-1] if stack else None
+                self.record = ImportRecord(name, len(stack), parent, kind)
+                stack.append(self.record)
+                return self.record
+
+            def __exit__(self, exc_type, exc, tb):
+                record = self.record
+                record.end = time.perf_counter()
+                record.rss_end = rss_bytes()
+                if exc is not None:
+                    record.error = f"{exc_type.__name__}: {exc}"
+                profiler._stack().pop()
+                if record.parent is not None:
+                    record.parent.child_time += record.total
+                profiler.records.append(record)
+                return False
+
+        return _Span()
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            events.append({
+                "name": r.name,
+                "cat": r.kind,
+                "ph": "X",
+                "ts": (r.start - self._origin) * 1e6,
+                "dur": r.total * 1e6,
+                "pid": pid,
+                "tid": r.tid,
+                "args": {
+                    "self_ms": round(r.self_time * 1000, 3),
+                    "rss_delta_kb": r.rss_delta // 1024,
+                    "error": r.error,
+                },
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def discover_modules(packages=PROFILED_PACKAGES):
+    """Dotted names of every .py file under the given top-level folders."""
+    modules = []
+    for package in packages:
+        base = os.path.join(PROJECT_ROOT, package)
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith((".", "__")))
+            rel = os.path.relpath(dirpath, PROJECT_ROOT).split(os.sep)
+            for filename in sorted(filenames):
+                if not filename.endswith(".py"):
+                    continue
+                stem = filename[:-3]
+                parts = rel if stem == "__init__" else rel + [stem]
+                modules.append(".".join(parts))
+    return modules
+
+
+def _is_project_module(name):
+    return name.split(".", 1)[0] in PROFILED_PACKAGES
+
+
+def print_table(records, limit=None, show_all=False):
+    rows = [r for r in records if r.kind == "probe" or show_all or _is_project_module(r.name)]
+    rows.sort(key=lambda r: r.total, reverse=True)
+    if limit:
+        rows = rows[:limit]
+    width = max([len(r.name) for r in rows] + [6])
+    print(f"{'module':<{width}}  {'total ms':>10}  {'self ms':>10}  {'rss +MB':>8}  status")
+    print("-" * (width + 46))
+    for r in rows:
+        status = r.error or "ok"
+        print(f"{r.name:<{width}}  {r.total * 1000:>10.1f}  {r.self_time * 1000:>10.1f}  "
+              f"{r.rss_delta / 1048576:>8.1f}  {status}")
+
+
+def profile_startup(trace_path="startup_trace.json", limit=None, show_all=False, probes=PROBES):
+    """Import every project module under the profiler and report the cost."""
+    for path in (PROJECT_ROOT,) + EXTRA_PATHS:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    profiler = ImportProfiler()
+    profiler.install()
+    rss_start = rss_bytes()
+    started = time.perf_counter()
+    try:
+        for module in discover_modules():
+            if module in SKIP_MODULES or module in sys.modules:
+                continue
+            try:
+                importlib.import_module(module)
+            except BaseException as e:
+                # A failed import is a result too (missing dependency, no driver...)
+                if isinstance(e, KeyboardInterrupt):
+                    raise
+                if not any(r.name == module for r in profiler.records):
+                    with profiler.span(module) as record:
+                        pass
+                    record.error = f"{type(e).__name__}: {e}"
+        for target in probes:
+            module, _, attr = target.partition(":")
+            with profiler.span(f"{target}()", kind="probe") as record:
+                try:
+                    getattr(importlib.import_module(module), attr)()
+                except Exception as e:
+                    record.error = f"{type(e).__name__}: {e}"
+    finally:
+        profiler.uninstall()
+
+    elapsed = time.perf_counter() - started
+    print_table(profiler.records, limit=limit, show_all=show_all)
+    print(f"\nTotal: {elapsed:.2f}s, RSS +{(rss_bytes() - rss_start) / 1048576:.1f} MB, "
+          f"{len(profiler.records)} imports")
+
+    if trace_path:
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(profiler.to_chrome_trace(), f)
+        print(f"Chrome trace written to {trace_path}")
+    return profiler
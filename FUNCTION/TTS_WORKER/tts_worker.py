@@ -0,0 +1,837 @@
+# Long-lived text-to-speech worker.
+# One thread owns the speech engine for the whole process: it is created
+# once, on that thread (pyttsx3 engines must not be shared between
+# threads), and every line to speak arrives through a queue. speak()
+# returns when the engine reports that playback has finished; say() hands
+# back the Utterance at once, to be waited on or chained. Lines found
+# in the speech cache are played from pre-rendered audio instead, and long
+# answers are spoken sentence by sentence, rendering the next sentence
+# while the current one plays.
+#
+# Lines are spoken by priority rather than arrival: direct answers first,
+# then alerts, then proactive jokes and advice. A repeated line or a newer
+# alert with the same key is folded into the one already waiting, jokes
+# that waited too long are dropped, and preempt() (a new user command)
+# cuts the current line short.
+#
+#   pyttsx3   local SAPI5 / NSSpeechSynthesizer / eSpeak voice (default)
+#   web       the headless-Chrome page at tts.5e7en.me (the old path)
+#   standin   no audio; sleeps for synthesis and playback, for testing
+import heapq
+import io
+import itertools
+import os
+import queue
+import re
+import threading
+import time
+import wave
+
+from FUNCTION.SPEECH_CACHE.speech_cache import CACHE_DIR, SpeechCache, render_bytes, wav_seconds
+from FUNCTION.TURN_TRACE.turn_trace import percentile
+
+DEBUG = False
+
+DEFAULT_ENGINE = os.environ.get("JARVIS_TTS", "pyttsx3")
+RATE = 180                   # words per minute
+VOLUME = 1.0
+VOICE_INDEX = 1              # second installed voice, as the old pyttsx3 speak() used
+
+CHROME_DRIVER_PATH = r'C:\Users\Deepak Bairagi\Desktop\JARVIS 1.1\DATA\JARVIS_DRIVER\chromedriver.exe'
+WEB_TTS_URL = "https://tts.5e7en.me/"
+
+WEB_AUDIO_POLL_S = 0.05      # how often the page's <audio> element is checked
+WEB_AUDIO_START_TIMEOUT_S = 3.0
+
+MAX_CACHED_CHARS = 200       # longer lines (brain answers) are rarely repeated
+IDLE_RENDER_S = 1.0          # quiet time before live lines are rendered into the cache
+MIN_SENTENCE_CHARS = 25      # shorter sentences are spoken together with the next one
+
+# Priorities, most urgent first
+ANSWER = 0                   # reply to what the user just said
+ALERT = 1                    # battery, charger
+CHAT = 2                     # unprompted jokes and advice
+PRIORITY_NAMES = {ANSWER: "answer", ALERT: "alert", CHAT: "chat"}
+# Seconds a line may wait before it is no longer worth saying
+DEFAULT_TTL = {ANSWER: None, ALERT: 300.0, CHAT: 60.0}
+WAIT_SAMPLES = 500           # recent queue waits kept per priority
+PREEMPT_HOLD_S = 3.0         # after a new command only answers may start for this long
+
+
+class Utterance:
+    """One line to speak; done is set once it has been played (or failed).
+
+    Works as a future: wait() blocks until playback has ended and
+    add_done_callback() chains the next action without blocking at all.
+    """
+
+    def __init__(self, text, priority=ANSWER, key=None, ttl=None):
+        self.text = text
+        self.priority = priority
+        self.key = key               # newer lines with the same key replace this one
+        self.queued = time.perf_counter()
+        self.expires = None if ttl is None else self.queued + ttl
+        self.started = None          # engine began working on it
+        self.first_audio = None      # first word audible
+        self.finished = None
+        self.error = None
+        self.outcome = None          # spoken, failed, expired or preempted
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        self.done.wait(timeout)
+        return self
+
+    def add_done_callback(self, fn):
+        """Call fn(utterance) once playback ends (at once if it already has)."""
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def finish(self, error=None, outcome=None):
+        self.error = error
+        self.outcome = outcome or ("failed" if error is not None else "spoken")
+        self.finished = time.perf_counter()
+        with self._lock:
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"[TTS] callback for {self.text!r} failed: {e}")
+
+    @property
+    def time_to_first_audio_ms(self):
+        if self.first_audio is None:
+            return None
+        return (self.first_audio - self.queued) * 1000
+
+    @property
+    def spoken(self):
+        return self.outcome == "spoken"
+
+    @property
+    def wait_ms(self):
+        """Time spent queued behind other lines."""
+        if self.started is None:
+            return None
+        return (self.started - self.queued) * 1000
+
+    @property
+    def playback_ms(self):
+        """How long the line was audible, first word to end of playback."""
+        if self.first_audio is None or self.finished is None:
+            return None
+        return (self.finished - self.first_audio) * 1000
+
+
+def play_wav(data, cancelled=None):
+    """Play WAV bytes and return once they have finished; False without a player.
+
+    cancelled (an Event) stops playback early where the player allows it;
+    winsound cannot play from memory asynchronously, so there the line ends
+    on its own and streaming stops before the next sentence.
+    """
+    if os.name == "nt":
+        import winsound
+        winsound.PlaySound(data, winsound.SND_MEMORY)
+        return True
+    try:
+        import pygame
+    except ImportError:
+        return False
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    channel = pygame.mixer.Sound(file=io.BytesIO(data)).play()
+    while channel is not None and channel.get_busy():
+        if cancelled is not None and cancelled.is_set():
+            channel.stop()
+            break
+        time.sleep(0.01)
+    return True
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+
+
+def split_sentences(text):
+    """Sentences of text, with very short ones joined to the next."""
+    sentences = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        pending = f"{pending} {part}".strip()
+        if len(pending) >= MIN_SENTENCE_CHARS:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+# =============================
+# Engines
+# =============================
+class Engine:
+    name = ""
+
+    def open(self):
+        """Called once, on the worker thread, before the first line."""
+
+    def play(self, utterance):
+        """Speak utterance.text and return when playback has finished.
+
+        Should return early once utterance.cancelled is set.
+        """
+        raise NotImplementedError
+
+    def voice_settings(self):
+        """Everything that changes the rendered audio, or None if render() is unsupported."""
+        return None
+
+    def render(self, text, path):
+        """Synthesize text into a WAV file instead of the speakers."""
+        raise NotImplementedError
+
+    def play_cached(self, utterance, data):
+        started = time.perf_counter()
+        if not play_wav(data, utterance.cancelled):
+            return False
+        if utterance.first_audio is None:
+            utterance.first_audio = started
+        return True
+
+    def close(self):
+        pass
+
+
+class Pyttsx3Engine(Engine):
+    name = "pyttsx3"
+
+    def __init__(self, rate=RATE, volume=VOLUME, voice_index=VOICE_INDEX):
+        self.rate = rate
+        self.volume = volume
+        self.voice_index = voice_index
+        self.engine = None
+        self.voice_id = None
+        self._current = None
+
+    def open(self):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        voices = self.engine.getProperty('voices') or []
+        if voices:
+            try:
+                self.engine.setProperty('voice', voices[self.voice_index].id)
+            except IndexError:
+                print("Voice ID not found. Using the default voice.")
+        self.voice_id = self.engine.getProperty('voice')
+        self.engine.setProperty('rate', self.rate)
+        self.engine.setProperty('volume', self.volume)
+        self.engine.connect('started-word', self._on_word)
+
+    def _on_word(self, name, location, length):
+        if self._current is None:
+            return
+        if self._current.first_audio is None:
+            self._current.first_audio = time.perf_counter()
+        if self._current.cancelled.is_set():
+            # stop() is only safe from inside the engine's own callbacks
+            self.engine.stop()
+
+    def play(self, utterance):
+        self._current = utterance
+        try:
+            self.engine.say(utterance.text)
+            self.engine.runAndWait()
+        finally:
+            self._current = None
+
+    def voice_settings(self):
+        return {"engine": self.name, "voice": self.voice_id, "rate": self.rate, "volume": self.volume}
+
+    def render(self, text, path):
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.stop()
+
+
+# Remember what each <audio> on the page was playing before the click ...
+_AUDIO_MARK_JS = """
+document.querySelectorAll('audio, video').forEach(function (m) { m.dataset.jarvisSrc = m.currentSrc; });
+"""
+# ... then whether a new one has started, and whether one is still playing
+_AUDIO_STATE_JS = """
+var media = Array.prototype.slice.call(document.querySelectorAll('audio, video'));
+var playing = media.some(function (m) { return !m.paused && !m.ended; });
+var started = playing || media.some(function (m) {
+    return m.currentSrc !== m.dataset.jarvisSrc && m.currentTime > 0;
+});
+return [started, playing];
+"""
+_AUDIO_STOP_JS = """
+document.querySelectorAll('audio, video').forEach(function (m) { m.pause(); });
+"""
+
+
+class WebPageEngine(Engine):
+    """Types each line into the tts.5e7en.me page in a headless Chrome."""
+    name = "web"
+
+    def __init__(self, driver_path=CHROME_DRIVER_PATH, url=WEB_TTS_URL):
+        self.driver_path = driver_path
+        self.url = url
+        self.driver = None
+
+    def open(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")  # Run in headless mode (without opening a browser window)
+        self.driver = webdriver.Chrome(service=Service(self.driver_path), options=chrome_options)
+        self.driver.get(self.url)
+
+    def play(self, utterance):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        text = utterance.text
+        # Wait for the element to be clickable
+        element_to_click = WebDriverWait(self.driver, 5).until(
+            EC.element_to_be_clickable((By.XPATH, "//*[@id='text']"))
+        )
+        element_to_click.click()
+        element_to_click.send_keys(text)
+
+        button_to_click = WebDriverWait(self.driver, 3).until(
+            EC.element_to_be_clickable((By.XPATH, "//*[@id='button']"))
+        )
+        self.driver.execute_script(_AUDIO_MARK_JS)
+        button_to_click.click()
+        self._wait_for_audio(utterance)
+
+        # Clear the text box for the next sentence
+        element_to_click.clear()
+
+    def _audio_state(self):
+        """(started, playing) of the page's <audio> elements since the click."""
+        return self.driver.execute_script(_AUDIO_STATE_JS) or (False, False)
+
+    def _wait_for_audio(self, utterance):
+        """Return when the page's audio has ended, not after a length-based guess."""
+        text = utterance.text
+        deadline = time.perf_counter() + WEB_AUDIO_START_TIMEOUT_S
+        while True:
+            started, playing = self._audio_state()
+            if started or playing:
+                break
+            if time.perf_counter() > deadline:
+                # No <audio> element ever played: fall back to the old estimate
+                utterance.first_audio = time.perf_counter()
+                time.sleep(min(0.2 + len(text) // 150, 150))
+                return
+            time.sleep(WEB_AUDIO_POLL_S)
+        utterance.first_audio = time.perf_counter()
+        # Generous ceiling in case the page stalls mid-line
+        deadline = time.perf_counter() + 5.0 + len(text) / 5.0
+        while playing and time.perf_counter() < deadline:
+            if utterance.cancelled.is_set():
+                self.driver.execute_script(_AUDIO_STOP_JS)
+                return
+            time.sleep(WEB_AUDIO_POLL_S)
+            started, playing = self._audio_state()
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+
+class StandInEngine(Engine):
+    """Silent engine with a fixed synthesis delay and a speaking rate."""
+    name = "standin"
+
+    def __init__(self, synth_ms=30.0, chars_per_second=15.0, open_ms=0.0, synth_ms_per_char=0.0):
+        self.synth_ms = synth_ms
+        self.synth_ms_per_char = synth_ms_per_char
+        self.chars_per_second = chars_per_second
+        self.open_ms = open_ms
+        self.spoken = []
+
+    def open(self):
+        time.sleep(self.open_ms / 1000.0)
+
+    def _synthesize(self, text):
+        time.sleep((self.synth_ms + self.synth_ms_per_char * len(text)) / 1000.0)
+
+    def play(self, utterance):
+        self._synthesize(utterance.text)
+        utterance.first_audio = time.perf_counter()
+        # The "audio" stops as soon as the line is cancelled
+        utterance.cancelled.wait(len(utterance.text) / self.chars_per_second)
+        self.spoken.append(utterance.text)
+
+    def voice_settings(self):
+        if self.chars_per_second == float("inf"):
+            return None      # the print-only fallback has nothing to render
+        return {"engine": self.name, "chars_per_second": self.chars_per_second}
+
+    def render(self, text, path):
+        # Silence as long as the line would take to say, at 8 kHz
+        self._synthesize(text)
+        frames = int(len(text) / self.chars_per_second * 8000)
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\0\0" * frames)
+
+    def play_cached(self, utterance, data):
+        if utterance.first_audio is None:
+            utterance.first_audio = time.perf_counter()
+        utterance.cancelled.wait(wav_seconds(data))
+        self.spoken.append(utterance.text)
+        return True
+
+
+ENGINES = {
+    "pyttsx3": Pyttsx3Engine,
+    "web": WebPageEngine,
+    "standin": StandInEngine,
+}
+
+
+# =============================
+# Worker
+# =============================
+_IDLE = object()
+
+
+class TTSWorker:
+    """Owns one engine on one thread and speaks queued lines by priority."""
+
+    def __init__(self, engine=None, cache_root=CACHE_DIR, stream=True):
+        self.engine = engine
+        self.cache_root = cache_root
+        self.stream = stream
+        self.cache = None
+        self.ready = threading.Event()
+        self.open_error = None
+        self.stats = {"queued": 0, "spoken": 0, "failed": 0, "deduplicated": 0,
+                      "coalesced": 0, "expired": 0, "preempted": 0, "max_depth": 0}
+        self._waits = {p: [] for p in PRIORITY_NAMES}
+        self._pending = []           # heap of (priority, seq, Utterance)
+        self._seq = itertools.count()
+        self._current = None
+        self._stopping = False
+        self._hold_until = 0.0
+        self._cond = threading.Condition()
+        self._to_render = []
+        self._wav_player = True      # False once play_cached() finds no way to play WAV data
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+                self._thread.start()
+        return self
+
+    def _open(self):
+        if self.engine is None:
+            self.engine = ENGINES[DEFAULT_ENGINE]()
+        try:
+            self.engine.open()
+        except Exception as e:
+            if self.engine.name == "standin":
+                raise
+            # No local voice (or no Chrome): keep going without audio
+            print(f"[TTS] {self.engine.name} unavailable ({e}); lines will only be printed")
+            self.open_error = e
+            self.engine = StandInEngine(synth_ms=0.0, chars_per_second=float("inf"))
+        settings = self.engine.voice_settings()
+        if settings is not None and self.cache_root:
+            self.cache = SpeechCache(settings, self.cache_root)
+        if DEBUG:
+            print(f"[TTS] {self.engine.name} engine ready")
+
+    def _play(self, utterance):
+        cacheable = self.cache is not None and len(utterance.text) <= MAX_CACHED_CHARS
+        data = self.cache.get(utterance.text) if cacheable else None
+        if data is not None and self.engine.play_cached(utterance, data):
+            return
+        sentences = split_sentences(utterance.text) if self.stream else [utterance.text]
+        if len(sentences) > 1:
+            self._play_streaming(utterance, sentences)
+            if utterance.cancelled.is_set():
+                return
+        else:
+            self.engine.play(utterance)
+        if cacheable:
+            self._to_render.append(utterance.text)
+
+    def _play_live(self, utterance, sentences):
+        # Nothing to render ahead with; at least start after the first sentence
+        for sentence in sentences:
+            if utterance.cancelled.is_set():
+                return
+            part = Utterance(sentence)
+            part.cancelled = utterance.cancelled
+            self.engine.play(part)
+            utterance.first_audio = utterance.first_audio or part.first_audio
+
+    def _play_streaming(self, utterance, sentences):
+        """Render sentence N+1 on this thread while a player thread plays sentence N."""
+        if self.engine.voice_settings() is None or not self._wav_player:
+            self._play_live(utterance, sentences)
+            return
+        rendered = queue.Queue(maxsize=2)
+        failed = []
+        unplayable = []              # index of the first sentence the player could not play
+
+        def player():
+            while True:
+                item = rendered.get()
+                if item is None or utterance.cancelled.is_set():
+                    return
+                index, data = item
+                try:
+                    if not self.engine.play_cached(utterance, data):
+                        unplayable.append(index)
+                        return
+                except Exception as e:
+                    failed.append(e)
+                    return
+
+        thread = threading.Thread(target=player, name="tts-player", daemon=True)
+        thread.start()
+        try:
+            for index, sentence in enumerate(sentences):
+                if utterance.cancelled.is_set():
+                    break
+                data = self.cache.get(sentence) if self.cache is not None else None
+                if data is None:
+                    data = render_bytes(self.engine, sentence)
+                while not failed and not unplayable and not utterance.cancelled.is_set():
+                    try:
+                        rendered.put((index, data), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if failed or unplayable:
+                    break
+        finally:
+            if not failed and not unplayable:
+                if utterance.cancelled.is_set():
+                    # Skip the sentences rendered ahead so the player sees the end at once
+                    while True:
+                        try:
+                            rendered.get_nowait()
+                        except queue.Empty:
+                            break
+                rendered.put(None)
+            thread.join()
+        if failed:
+            raise failed[0]
+        if unplayable:
+            # No WAV player here (no pygame outside Windows): say the rest live, and
+            # stop rendering ahead for later lines
+            print("[TTS] no WAV player available; speaking long lines sentence by sentence")
+            self._wav_player = False
+            self._play_live(utterance, sentences[unplayable[0]:])
+
+    def _render_pending(self):
+        text = self._to_render.pop(0)
+        if text in self.cache:
+            return
+        try:
+            self.cache.render(self.engine, text)
+        except Exception as e:
+            print(f"[TTS] could not cache {text!r}: {e}")
+
+    def _next(self):
+        """Most urgent line still worth saying, None once stopped, or _IDLE after IDLE_RENDER_S."""
+        with self._cond:
+            while True:
+                hold = self._hold_until - time.perf_counter()
+                while self._pending:
+                    if self._pending[0][0] != ANSWER and hold > 0 and not self._stopping:
+                        break    # keep the speaker free for the reply to the new command
+                    _, _, utterance = heapq.heappop(self._pending)
+                    if utterance.expires is not None and time.perf_counter() > utterance.expires:
+                        self.stats["expired"] += 1
+                        utterance.finish(outcome="expired")
+                        if DEBUG:
+                            print(f"[TTS] dropped stale {PRIORITY_NAMES[utterance.priority]} {utterance.text!r}")
+                        continue
+                    self._current = utterance
+                    return utterance
+                if self._stopping and not self._pending:
+                    return None
+                if self._pending:
+                    self._cond.wait(hold)
+                    continue
+                # Lines spoken live are rendered for next time once nothing is waiting
+                if not self._cond.wait(IDLE_RENDER_S if self._to_render else None) and self._to_render:
+                    return _IDLE
+
+    def _run(self):
+        self._open()
+        self.ready.set()
+        while True:
+            utterance = self._next()
+            if utterance is None:
+                break
+            if utterance is _IDLE:
+                self._render_pending()
+                continue
+            utterance.started = time.perf_counter()
+            waits = self._waits[utterance.priority]
+            waits.append(utterance.wait_ms)
+            del waits[:-WAIT_SAMPLES]
+            error = None
+            try:
+                if not utterance.cancelled.is_set():
+                    self._play(utterance)
+            except Exception as e:
+                error = e
+                print(f"An error occurred: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                outcome = "preempted" if utterance.cancelled.is_set() else None
+                utterance.finish(error, outcome)
+                self.stats[utterance.outcome] += 1
+        self.engine.close()
+
+    def _find(self, match):
+        for _, _, pending in self._pending:
+            if match(pending):
+                return pending
+        return None
+
+    def say(self, text, priority=ANSWER, key=None, ttl=None):
+        """Queue text and return its Utterance without waiting.
+
+        The same text already waiting (or playing) at the same priority is
+        not queued twice; a line with the key of one still waiting replaces
+        its text, so only the latest battery state is announced. ttl
+        defaults to DEFAULT_TTL for the priority.
+        """
+        self.start()
+        ttl = DEFAULT_TTL[priority] if ttl is None else ttl
+        with self._cond:
+            current = self._current
+            if current is not None and current.text == text and current.priority == priority \
+                    and not current.cancelled.is_set():
+                self.stats["deduplicated"] += 1
+                return current
+            same = self._find(lambda u: u.text == text and u.priority == priority)
+            if same is not None:
+                self.stats["deduplicated"] += 1
+                return same
+            if key is not None:
+                older = self._find(lambda u: u.key == key)
+                if older is not None:
+                    if DEBUG:
+                        print(f"[TTS] {older.text!r} replaced by {text!r}")
+                    older.text = text
+                    older.expires = None if ttl is None else time.perf_counter() + ttl
+                    self.stats["coalesced"] += 1
+                    return older
+            utterance = Utterance(text, priority, key, ttl)
+            heapq.heappush(self._pending, (priority, next(self._seq), utterance))
+            self.stats["queued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self._pending))
+            self._cond.notify()
+        return utterance
+
+    def speak(self, text, priority=ANSWER, key=None, ttl=None):
+        """Queue text and return once it has been played."""
+        return self.say(text, priority, key, ttl).wait()
+
+    def preempt(self, drop=CHAT):
+        """Cut the current line short and discard waiting lines of priority drop or lower.
+
+        Called when the user gives a new command: a joke in progress stops,
+        queued chat is discarded, and alerts wait up to PREEMPT_HOLD_S so the
+        reply is not queued behind one that started in the meantime.
+        """
+        with self._cond:
+            current = self._current
+            if current is not None:
+                current.cancelled.set()
+            self._hold_until = time.perf_counter() + PREEMPT_HOLD_S
+            kept = []
+            for item in self._pending:
+                if item[0] >= drop:
+                    item[2].cancelled.set()
+                    item[2].finish(outcome="preempted")
+                    self.stats["preempted"] += 1
+                else:
+                    kept.append(item)
+            heapq.heapify(kept)
+            self._pending = kept
+        if DEBUG and current is not None:
+            print(f"[TTS] interrupted {current.text!r}")
+        return current
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def metrics(self):
+        """Queue depth, outcome counts and queue-wait percentiles per priority."""
+        with self._cond:
+            out = dict(self.stats, depth=len(self._pending))
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            out[f"{name}_wait_ms"] = {"count": len(waits), "p50": percentile(waits, 50),
+                                      "p95": percentile(waits, 95), "max": waits[-1] if waits else 0.0}
+        return out
+
+    def stop(self):
+        if self._thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker().start()
+    return _worker
+
+
+# =============================
+# Benchmark
+# =============================
+def _rss_mb():
+    """Resident memory of this process and its children (Chrome) in MB."""
+    try:
+        import psutil
+        me = psutil.Process()
+        procs = [me] + me.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running()) / 2 ** 20
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def benchmark(lines=("Hello sir, how can I help you today?", "Opening YouTube for you.",
+                     "The battery is at 80 percent.")):
+    """Memory and time-to-first-audio per engine, cold start and warm.
+
+    standin shows what the worker itself costs on top of the engine.
+    """
+    for name in ("pyttsx3", "web", "standin"):
+        before = _rss_mb()
+        worker = TTSWorker(ENGINES[name]())
+        started = time.perf_counter()
+        first = worker.say(lines[0]).wait(60)
+        if worker.open_error is not None or not first.done.is_set():
+            print(f"{name:<8} unavailable: {worker.open_error or 'timed out'}")
+            worker.stop()
+            continue
+        cold_ms = (time.perf_counter() - started) * 1000
+        warm = [worker.speak(line) for line in lines[1:]]
+        ttfa = [u.time_to_first_audio_ms for u in warm if u.time_to_first_audio_ms is not None]
+        print(f"{name:<8} +{_rss_mb() - before:6.0f} MB  start + first line {cold_ms:7.0f} ms  "
+              f"time to first audio {sum(ttfa) / max(1, len(ttfa)):6.0f} ms")
+        worker.stop()
+
+
+def streaming_benchmark():
+    """Time to first word for a five-sentence answer, whole block against streamed."""
+    answer = ("Machine learning is a field of artificial intelligence. It builds models from data "
+              "instead of explicit rules. Common methods include regression, decision trees and neural "
+              "networks. Models are trained on examples and then evaluated on new data. It is used in "
+              "search, speech recognition and recommendation systems.")
+    # Stand-in voice: 2 ms of synthesis per character, 60 characters a second of speech
+    for name, stream in (("block", False), ("streamed", True)):
+        worker = TTSWorker(StandInEngine(synth_ms=20.0, synth_ms_per_char=2.0, chars_per_second=60.0),
+                           cache_root=None, stream=stream)
+        u = worker.speak(answer)
+        print(f"{name:<9} {len(split_sentences(answer)) if stream else 1} part(s)  time to first word "
+              f"{u.time_to_first_audio_ms:6.0f} ms  finished after {(u.finished - u.queued) * 1000:6.0f} ms")
+        worker.stop()
+
+
+def completion_benchmark(lines=("Opening YouTube for you.", "Searching for that right away, sir.",
+                                "Here are the results. Let me know if you want anything else.")):
+    """Gap between the end of playback and the next action: fixed sleeps against the done event."""
+    worker = TTSWorker(StandInEngine(synth_ms=50.0, chars_per_second=15.0), cache_root=None)
+    for line in lines:
+        # The old path: the page's length guess, then the automation's own sleep(3)
+        guess_s = min(0.2 + len(line) // 150, 150) + 3.0
+        started = time.perf_counter()
+        u = worker.say(line)
+        chained = []
+        u.add_done_callback(lambda u: chained.append(time.perf_counter()))
+        u.wait()
+        playback_s = u.finished - started
+        print(f"{len(line):3d} chars  playback {playback_s * 1000:6.0f} ms  "
+              f"fixed sleeps {'cut off' if guess_s < playback_s else f'{(guess_s - playback_s) * 1000:4.0f} ms idle'}  "
+              f"done event {(chained[0] - u.finished) * 1000:5.2f} ms late")
+    worker.stop()
+
+
+def priority_benchmark(answers=8, seed=3):
+    """Queue wait of answers while alerts and jokes pile up: everything at one priority against ordered."""
+    import random
+    from DATA.JARVIS_DLG_DATASET.DLG import low_b, plug_in, plug_out
+    for name, prioritized in (("one queue", False), ("priority", True)):
+        rng = random.Random(seed)
+        worker = TTSWorker(StandInEngine(synth_ms=20.0, chars_per_second=200.0), cache_root=None)
+        worker.start().ready.wait()
+        replies = []
+        for i in range(answers):
+            # Between two commands: a joke, the same low-battery line twice, the charger flapping
+            background = [(f"Here is joke number {i}, sir. " * 3, CHAT, None),
+                          (low_b[0], ALERT, "battery_level"), (low_b[0], ALERT, "battery_level"),
+                          (rng.choice(plug_in), ALERT, "battery_plug"), (rng.choice(plug_out), ALERT, "battery_plug")]
+            for text, priority, key in background:
+                if prioritized:
+                    worker.say(text, priority, key)
+                else:
+                    worker.say(text)
+            time.sleep(0.05)
+            if prioritized:
+                worker.preempt()
+            replies.append(worker.say(f"Answer {i}: the time is ten past {i}."))
+            replies[-1].wait()
+        worker.stop()
+        waits = sorted(u.wait_ms for u in replies)
+        m = worker.metrics()
+        print(f"{name:<10} answer wait p50 {percentile(waits, 50):6.0f} ms  p95 {percentile(waits, 95):6.0f} ms  "
+              f"max depth {m['max_depth']:2d}  spoken {m['spoken']:2d}  deduplicated {m['deduplicated']:2d}  "
+              f"coalesced {m['coalesced']:2d}  preempted {m['preempted']:2d}")
+
+
+if __name__ == "__main__":
+    benchmark()
+    streaming_benchmark()
+    completion_benchmark()
+    priority_benchmark()
@@ -0,0 +1,209 @@
+# Per-turn latency tracing.
+# comain() opens a turn, each stage (capture, ASR, translation, routing,
+# handler, brain, TTS) adds its duration with span(), and end_turn()
+# appends one JSON line per turn. summarize() reports p50/p95/p99 per stage.
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = True
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+TRACE_PATH = os.environ.get("JARVIS_TRACE_PATH", os.path.join(PROJECT_ROOT, "DATA", "TRACE", "turns.jsonl"))
+
+# Stage names, in pipeline order
+CAPTURE = "capture"
+ASR = "asr"
+TRANSLATE = "translate"
+ROUTE = "route"
+HANDLER = "handler"
+BRAIN = "brain"
+TTS = "tts"
+STAGES = (CAPTURE, ASR, TRANSLATE, ROUTE, HANDLER, BRAIN, TTS)
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_turn_ids = itertools.count(1)
+
+
+class Turn:
+    def __init__(self):
+        self.id = next(_turn_ids)
+        self.ts = time.time()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.fields = {}
+
+    def add(self, stage, ms):
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def to_record(self):
+        return {
+            "turn": self.id,
+            "ts": round(self.ts, 3),
+            "total_ms": round((time.perf_counter() - self.started) * 1000.0, 3),
+            "stages": {k: round(v, 3) for k, v in self.stages.items()},
+            **self.fields,
+        }
+
+
+def begin_turn():
+    """Start a turn on this thread; spans on other threads are not counted."""
+    if not ENABLED:
+        return None
+    _local.turn = Turn()
+    return _local.turn
+
+
+def current():
+    return getattr(_local, "turn", None)
+
+
+@contextmanager
+def span(stage):
+    turn = current()
+    if turn is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        turn.add(stage, (time.perf_counter() - started) * 1000.0)
+
+
+def record(stage, ms):
+    """Add a duration measured elsewhere (e.g. Route.match_ms)."""
+    turn = current()
+    if turn is not None:
+        turn.add(stage, ms)
+
+
+def annotate(**fields):
+    turn = current()
+    if turn is not None:
+        turn.fields.update(fields)
+
+
+def first_word(at=None, turn=None):
+    """Note when the reply became audible; the turn's first call wins.
+
+    Stored as first_word_ms, measured from the end of capture (when the
+    user stopped speaking) rather than from the start of the turn. Pass
+    turn when calling from another thread (e.g. a speech callback).
+    """
+    turn = turn or current()
+    if turn is None or "first_word_ms" in turn.fields:
+        return
+    at = time.perf_counter() if at is None else at
+    ms = (at - turn.started) * 1000.0 - turn.stages.get(CAPTURE, 0.0)
+    turn.fields["first_word_ms"] = round(ms, 3)
+
+
+def end_turn(path=None):
+    turn = current()
+    _local.turn = None
+    if turn is None:
+        return None
+    rec = turn.to_record()
+    path = path or TRACE_PATH
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _write_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[Trace] could not write {path}: {e}")
+    return rec
+
+
+def load(path=None):
+    records = []
+    with open(path or TRACE_PATH, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(records):
+    """{stage: {count, p50, p95, p99, max}} including 'total'."""
+    samples = {}
+    for rec in records:
+        for stage, ms in rec.get("stages", {}).items():
+            samples.setdefault(stage, []).append(ms)
+        if "total_ms" in rec:
+            samples.setdefault("total", []).append(rec["total_ms"])
+    order = {s: i for i, s in enumerate(STAGES + ("total",))}
+    summary = {}
+    for stage in sorted(samples, key=lambda s: (order.get(s, len(order)), s)):
+        values = sorted(samples[stage])
+        summary[stage] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+        }
+    return summary
+
+
+def print_summary(path=None):
+    path = path or TRACE_PATH
+    try:
+        records = load(path)
+    except FileNotFoundError:
+        print(f"No trace at {path}")
+        return {}
+    summary = summarize(records)
+    print(f"{len(records)} turns from {path}")
+    print(f"{'stage':<10} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for stage, s in summary.items():
+        print(f"{stage:<10} {s['count']:>6} {s['p50']:>10.1f} {s['p95']:>10.1f} {s['p99']:>10.1f} {s['max']:>10.1f}")
+    by_source = first_word_by_source(records)
+    if by_source:
+        print("\ntime to first word by answer source")
+        for source, s in by_source.items():
+            print(f"{source:<22} {s['count']:>6} {s['p50']:>10.1f} {s['p95']:>10.1f} {s['p99']:>10.1f} {s['max']:>10.1f}")
+    waits = sorted(rec["tts_wait_ms"] for rec in records if "tts_wait_ms" in rec)
+    if waits:
+        # Time replies spent queued behind other speech (alerts, jokes)
+        print(f"\n{'speech queue wait':<22} {len(waits):>6} {percentile(waits, 50):>10.1f} {percentile(waits, 95):>10.1f} "
+              f"{percentile(waits, 99):>10.1f} {waits[-1]:>10.1f}")
+    tiers = [rec["answer_cache"] for rec in records if "answer_cache" in rec]
+    if tiers:
+        # Web answers served from the answer cache (stale ones included)
+        hits = sum(tier != "miss" for tier in tiers)
+        counts = ", ".join(f"{tier} {tiers.count(tier)}" for tier in ("memory", "disk", "stale", "miss"))
+        print(f"\nanswer cache hit ratio {hits / len(tiers):.0%} of {len(tiers)} web answers ({counts})")
+    return summary
+
+
+def first_word_by_source(records):
+    """{answer source or intent: percentiles of first_word_ms}."""
+    samples = {}
+    for rec in records:
+        if "first_word_ms" in rec:
+            source = rec.get("answer_source") or rec.get("intent") or "-"
+            samples.setdefault(source, []).append(rec["first_word_ms"])
+    out = {}
+    for source in sorted(samples):
+        values = sorted(samples[source])
+        out[source] = {"count": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95),
+                       "p99": percentile(values, 99), "max": values[-1]}
+    return out
@@ -0,0 +1,342 @@
+# Voice-activity endpointing.
+# Classifies 10-20 ms frames as speech or not from three cheap features
+# (energy, zero-crossing rate, spectral flatness) against noise statistics
+# that adapt on every non-speech frame, and closes the utterance after a
+# short hangover instead of the recognizer's pause_threshold (0.8 s) plus
+# its energy heuristic.
+import glob
+import json
+import math
+import os
+import time
+import wave
+
+import numpy as np
+
+from FUNCTION.MIC_BUS import mic_bus
+
+DEBUG = False
+
+RATE = mic_bus.RATE
+SAMPLE_WIDTH = mic_bus.SAMPLE_WIDTH
+FRAME_MS = mic_bus.FRAME_MS
+
+ENERGY_MARGIN_DB = 4.0       # above the noise energy
+FLATNESS_MARGIN_DB = 4.0     # below the noise flatness (speech is tonal)
+ZCR_MARGIN = 0.12            # away from the noise zero-crossing rate
+NOISE_ADAPT = 0.95           # EMA weight of the old noise estimate
+INIT_FRAMES = 5              # frames assumed to be noise when there is no seed
+
+START_MS = 60                # speech needed before an utterance opens
+END_SILENCE_MS = 300         # silence that closes it
+MIN_SPEECH_MS = 150          # shorter bursts (claps, clicks) are dropped
+PRE_SPEECH_MS = 200          # audio kept from before the detected start
+
+
+def to_float(frame):
+    return np.frombuffer(frame, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def frame_features(x):
+    """(energy dB, zero-crossing rate, spectral flatness dB) of one frame."""
+    energy_db = 10.0 * math.log10(float(np.mean(x * x)) + 1e-10)
+    signs = np.signbit(x)
+    zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / max(1, len(x) - 1)
+    power = np.abs(np.fft.rfft(x * np.hanning(len(x)))) ** 2 + 1e-12
+    flatness = float(np.exp(np.mean(np.log(power))) / np.mean(power))
+    return energy_db, zcr, 10.0 * math.log10(flatness)
+
+
+class Endpointer:
+    """Frame-by-frame speech start/end detector with adaptive thresholds.
+
+    feed() returns "start" when an utterance opens, "end" when it closes and
+    None otherwise; audio() is the utterance including PRE_SPEECH_MS of lead
+    in. The noise estimates survive reset(), so one endpointer per listener
+    keeps adapting to the room across turns.
+    """
+
+    def __init__(self, frame_ms=FRAME_MS, end_silence_ms=END_SILENCE_MS, noise_rms=None):
+        self.frame_ms = frame_ms
+        self.frame_samples = RATE * frame_ms // 1000
+        self.start_frames = max(1, START_MS // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.min_frames = max(1, MIN_SPEECH_MS // frame_ms)
+        self.pre_frames = PRE_SPEECH_MS // frame_ms
+        self.noise_energy = None
+        self.noise_zcr = 0.0
+        self.noise_flatness = 0.0
+        self.seen = 0
+        self.init_frames = INIT_FRAMES
+        self.set_noise_floor(noise_rms)
+        self.reset()
+
+    def set_noise_floor(self, noise_rms):
+        """Seed the noise energy from a NoiseTracker floor; None leaves it alone."""
+        if noise_rms:
+            # NoiseTracker floor is an int16 RMS; same scale as energy_db here
+            self.noise_energy = 20.0 * math.log10(noise_rms / 32768.0 + 1e-10)
+            self.init_frames = 0
+
+    def reset(self):
+        self.frames = []
+        self.dropped = 0
+        self.in_speech = False
+        self.start_index = None
+        self.end_index = None
+        self.speech_run = 0
+        self.silence_run = 0
+        self.speech_frames = 0
+        self._pending = b""
+        self._taken = None
+
+    # ---- classification ----
+    def _adapt(self, energy_db, zcr, flatness_db):
+        if self.noise_energy is None:
+            self.noise_energy, self.noise_zcr, self.noise_flatness = energy_db, zcr, flatness_db
+            return
+        a = NOISE_ADAPT
+        # The floor follows quiet frames faster than loud ones
+        self.noise_energy = min(energy_db, a * self.noise_energy + (1 - a) * energy_db)
+        self.noise_zcr = a * self.noise_zcr + (1 - a) * zcr
+        self.noise_flatness = a * self.noise_flatness + (1 - a) * flatness_db
+
+    def is_speech(self, x):
+        energy_db, zcr, flatness_db = frame_features(x)
+        self.seen += 1
+        if self.noise_energy is None or self.seen <= self.init_frames:
+            self._adapt(energy_db, zcr, flatness_db)
+            return False
+        above = energy_db - self.noise_energy
+        votes = 0
+        if above > ENERGY_MARGIN_DB:
+            votes += 1
+        if self.noise_flatness - flatness_db > FLATNESS_MARGIN_DB:
+            votes += 1
+        if abs(zcr - self.noise_zcr) > ZCR_MARGIN:
+            votes += 1
+        # Energy alone only counts when it is far above the noise
+        speech = (votes >= 2 and above > ENERGY_MARGIN_DB) or above > 2 * ENERGY_MARGIN_DB
+        if not speech:
+            self._adapt(energy_db, zcr, flatness_db)
+        return speech
+
+    # ---- endpointing ----
+    def feed(self, data):
+        """Feed raw int16 audio (any length); returns "start", "end" or None."""
+        data = self._pending + data
+        size = self.frame_samples * SAMPLE_WIDTH
+        event = None
+        for offset in range(0, len(data) - size + 1, size):
+            e = self._feed_frame(data[offset:offset + size])
+            if e == "end":
+                self._pending = b""
+                return e
+            event = event or e
+        self._pending = data[len(data) - len(data) % size:]
+        return event
+
+    def _feed_frame(self, frame):
+        self.frames.append(frame)
+        index = len(self.frames) - 1
+        speech = self.is_speech(to_float(frame))
+        if not self.in_speech:
+            self.speech_run = self.speech_run + 1 if speech else 0
+            if self.speech_run >= self.start_frames:
+                self.in_speech = True
+                self.start_index = index + 1 - self.speech_run
+                self.speech_frames = self.speech_run
+                self.silence_run = 0
+                return "start"
+            if not speech and len(self.frames) > self.pre_frames + self.start_frames:
+                # Nothing is happening; keep only the lead-in window
+                del self.frames[0]
+                self.dropped += 1
+            return None
+        if speech:
+            self.speech_frames += 1
+            self.silence_run = 0
+            return None
+        self.silence_run += 1
+        if self.silence_run >= self.end_frames:
+            if self.speech_frames < self.min_frames:
+                # A click or a clap, not an utterance
+                self.reset()
+                return None
+            self.end_index = index + 1
+            return "end"
+        return None
+
+    @property
+    def end_time(self):
+        """Seconds into the fed audio where the utterance was closed."""
+        if self.end_index is None:
+            return None
+        return (self.dropped + self.end_index) * self.frame_ms / 1000.0
+
+    def audio(self):
+        start = max(0, (self.start_index or 0) - self.pre_frames)
+        end = self.end_index if self.end_index is not None else len(self.frames)
+        return b"".join(self.frames[start:end])
+
+    def take(self):
+        """Utterance audio not handed out yet (the lead-in comes with the first call)."""
+        if self.start_index is None:
+            return b""
+        if self._taken is None:
+            self._taken = max(0, self.start_index - self.pre_frames)
+        end = self.end_index if self.end_index is not None else len(self.frames)
+        data = b"".join(self.frames[self._taken:end])
+        self._taken = end
+        return data
+
+
+def record(source, endpointer=None, timeout=None, phrase_time_limit=None, on_audio=None):
+    """Drop-in for recognizer.listen(source) on a MicSource; returns sr.AudioData.
+
+    on_audio(pcm) receives the utterance as it is captured, for streaming
+    recognizers.
+    """
+    import speech_recognition as sr
+
+    endpointer = endpointer or Endpointer()
+    endpointer.reset()
+    started = time.monotonic()
+    opened = None
+    while True:
+        data = source.stream.read(source.CHUNK)
+        if not data:
+            break
+        event = endpointer.feed(data)
+        now = time.monotonic()
+        if event == "start" or (opened is None and endpointer.in_speech):
+            opened = now
+        if on_audio is not None and endpointer.in_speech:
+            chunk = endpointer.take()
+            if chunk:
+                on_audio(chunk)
+        if event == "end":
+            break
+        if opened is None and timeout is not None and now - started > timeout:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        if opened is not None and phrase_time_limit is not None and now - opened > phrase_time_limit:
+            break
+    return sr.AudioData(endpointer.audio(), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+
+# =============================
+# Benchmark over WAV fixtures
+# =============================
+def read_wav(path):
+    """16 kHz mono int16 bytes from a WAV file (downmixed/resampled if needed)."""
+    with wave.open(path, "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit WAV is supported")
+    x = np.frombuffer(raw, dtype="<i2").astype(np.float32)
+    if channels > 1:
+        x = x.reshape(-1, channels).mean(axis=1)
+    if rate != RATE:
+        t = np.arange(0, len(x) / rate, 1.0 / RATE)
+        x = np.interp(t, np.arange(len(x)) / rate, x)
+    return np.clip(x, -32768, 32767).astype("<i2").tobytes()
+
+
+def synthetic_fixtures(seed=7):
+    """(name, pcm bytes, speech end seconds) for a few SNRs and voices."""
+    rng = np.random.default_rng(seed)
+    fixtures = []
+    for f0 in (110.0, 210.0):
+        for snr_db in (30.0, 15.0, 5.0):
+            lead, speech, tail = 0.8, 1.6, 2.0
+            n = int((lead + speech + tail) * RATE)
+            t = np.arange(int(speech * RATE)) / RATE
+            # Voiced syllables: harmonics under a 4 Hz envelope, with a fricative in the middle
+            voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 8))
+            voiced *= 0.35 + 0.65 * np.abs(np.sin(2 * np.pi * 2.0 * t))
+            fric = np.zeros_like(t)
+            mid = slice(int(0.7 * RATE), int(0.85 * RATE))
+            fric[mid] = rng.normal(0, 0.6, mid.stop - mid.start)
+            voiced[mid] *= 0.2
+            clean = np.zeros(n)
+            clean[int(lead * RATE):int(lead * RATE) + len(t)] = 0.25 * (voiced + fric)
+            signal_power = np.mean(clean[clean != 0] ** 2)
+            noise = rng.normal(0, math.sqrt(signal_power / 10 ** (snr_db / 10)), n)
+            pcm = np.clip((clean + noise) * 32767, -32768, 32767).astype("<i2").tobytes()
+            fixtures.append((f"f0-{int(f0)}hz-snr-{int(snr_db)}db", pcm, lead + speech))
+    return fixtures
+
+
+def load_fixtures(directory):
+    """WAVs in directory plus labels.json: {"name.wav": speech_end_seconds}."""
+    with open(os.path.join(directory, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        name = os.path.basename(path)
+        if name in labels:
+            fixtures.append((name, read_wav(path), float(labels[name])))
+    return fixtures
+
+
+def recognizer_endpoint(pcm, energy_ratio=1.5, pause_threshold=0.8, chunk=1024):
+    """When speech_recognition's energy heuristic would close the phrase.
+
+    Mirrors Recognizer.listen(): threshold from 1 s of ambient calibration,
+    then the phrase ends after pause_threshold of chunks below it.
+    """
+    x = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+    chunks = [x[i:i + chunk] for i in range(0, len(x) - chunk + 1, chunk)]
+    rms = [math.sqrt(float(np.mean(c * c))) for c in chunks]
+    seconds_per_chunk = chunk / RATE
+    calib = rms[:int(1.0 / seconds_per_chunk)] or rms[:1]
+    threshold = (sum(calib) / len(calib)) * energy_ratio
+    pause_chunks = int(math.ceil(pause_threshold / seconds_per_chunk))
+    started, pause = False, 0
+    for i, energy in enumerate(rms):
+        if energy > threshold:
+            started, pause = True, 0
+        elif started:
+            pause += 1
+            if pause > pause_chunks:
+                return (i + 1) * seconds_per_chunk
+    return None
+
+
+def benchmark(directory=None):
+    """Endpointing delay (detected end - labelled speech end) per fixture."""
+    fixtures = load_fixtures(directory) if directory else synthetic_fixtures()
+    rows = []
+    for name, pcm, speech_end in fixtures:
+        ep = Endpointer()
+        step = RATE * FRAME_MS // 1000 * SAMPLE_WIDTH
+        started = time.perf_counter()
+        for offset in range(0, len(pcm), step):
+            if ep.feed(pcm[offset:offset + step]) == "end":
+                break
+        cpu_ms = (time.perf_counter() - started) * 1000.0
+        vad = None if ep.end_time is None else (ep.end_time - speech_end) * 1000.0
+        base = recognizer_endpoint(pcm)
+        base = None if base is None else (base - speech_end) * 1000.0
+        rows.append((name, vad, base, cpu_ms))
+
+    def fmt(ms):
+        return f"{ms:8.0f}" if ms is not None else "  missed"
+
+    width = max(len(r[0]) for r in rows)
+    print(f"{'fixture':<{width}}  {'vad ms':>8}  {'energy ms':>9}  {'vad cpu ms':>10}")
+    for name, vad, base, cpu_ms in rows:
+        print(f"{name:<{width}}  {fmt(vad)}  {fmt(base):>9}  {cpu_ms:>10.1f}")
+    for label, col in (("vad", 1), ("energy heuristic", 2)):
+        values = sorted(r[col] for r in rows if r[col] is not None)
+        if values:
+            p95 = values[min(len(values) - 1, int(math.ceil(0.95 * len(values))) - 1)]
+            print(f"{label:<17} mean {sum(values) / len(values):7.0f} ms  p95 {p95:7.0f} ms  "
+                  f"missed {len(rows) - len(values)}/{len(rows)}")
+    return rows
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,315 @@
+# Offline wake-word spotter.
+# MFCC features plus subsequence DTW against a handful of enrollment
+# recordings, so hearing() can decide "was that the wake word?" locally
+# instead of sending every noise to recognize_google and mtranslate.
+#
+#   python -m FUNCTION.WAKE_WORD.wake_word enroll [N]     record N examples from the mic
+#   python -m FUNCTION.WAKE_WORD.wake_word evaluate [DIR] FA/FR rates and CPU per hour
+import functools
+import glob
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from FUNCTION.MIC_BUS import mic_bus
+
+DEBUG = False
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+TEMPLATES_PATH = os.path.join(PROJECT_ROOT, "DATA", "VOICE_PROFILE", "wake_templates.npz")
+
+RATE = mic_bus.RATE
+WIN_MS = 25
+HOP_MS = 10
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+
+THRESHOLD_MARGIN = 1.25      # over the worst distance between enrollment takes
+MIN_TEMPLATES = 3
+
+
+# =============================
+# Features
+# =============================
+@functools.lru_cache(maxsize=None)
+def mel_filterbank(rate=RATE, n_fft=N_FFT, n_mels=N_MELS):
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(0.0), hz_to_mel(rate / 2.0), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / rate).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fb
+
+
+@functools.lru_cache(maxsize=None)
+def dct_matrix(n_mfcc=N_MFCC, n_mels=N_MELS):
+    k = np.arange(n_mfcc)[:, None]
+    n = np.arange(n_mels)[None, :]
+    m = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * math.sqrt(2.0 / n_mels)
+    m[0] /= math.sqrt(2.0)
+    return m
+
+
+def mfcc(pcm):
+    """(frames, N_MFCC) cepstral-mean-normalized MFCCs of int16 bytes or floats."""
+    if isinstance(pcm, (bytes, bytearray)):
+        x = np.frombuffer(pcm, dtype="<i2").astype(np.float64) / 32768.0
+    else:
+        x = np.asarray(pcm, dtype=np.float64)
+    win = RATE * WIN_MS // 1000
+    hop = RATE * HOP_MS // 1000
+    if len(x) < win:
+        x = np.pad(x, (0, win - len(x)))
+    x = np.append(x[0], x[1:] - PRE_EMPHASIS * x[:-1])
+    n_frames = 1 + (len(x) - win) // hop
+    idx = np.arange(win)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = x[idx] * np.hamming(win)
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    log_mel = np.log(power @ mel_filterbank().T + 1e-10)
+    ceps = log_mel @ dct_matrix().T
+    return ceps - ceps.mean(axis=0)
+
+
+# =============================
+# Matching
+# =============================
+def subsequence_dtw(template, segment):
+    """Best match of the whole template anywhere inside segment.
+
+    Steps (1,1), (1,2) and (2,1) keep the warp within a factor of two and
+    let every row depend only on the two rows above, so each template frame
+    is one vectorized update. Returns (mean cost per step, end frame).
+    """
+    n, m = len(template), len(segment)
+    cost = np.sqrt(((template[:, None, :] - segment[None, :, :]) ** 2).sum(axis=2))
+    inf = np.inf
+    D = np.full((n, m), inf)
+    L = np.zeros((n, m))
+    D[0] = cost[0]          # free start anywhere in the segment
+    L[0] = 1
+    for i in range(1, n):
+        cands = [(D[i - 1, :-1], L[i - 1, :-1], 1)]          # diagonal
+        if m > 2:
+            cands.append((D[i - 1, :-2], L[i - 1, :-2], 2))  # segment runs faster
+        if i > 1:
+            cands.append((D[i - 2, :-1], L[i - 2, :-1], 1))  # template runs faster
+        best_d = np.full(m, inf)
+        best_l = np.zeros(m)
+        for prev_d, prev_l, shift in cands:
+            d = np.full(m, inf)
+            l = np.zeros(m)
+            d[shift:] = prev_d[:m - shift]
+            l[shift:] = prev_l[:m - shift]
+            better = d / np.maximum(l, 1) < best_d / np.maximum(best_l, 1)
+            best_d = np.where(better, d, best_d)
+            best_l = np.where(better, l, best_l)
+        D[i] = best_d + cost[i]
+        L[i] = best_l + 1
+    score = D[-1] / np.maximum(L[-1], 1)
+    end = int(np.argmin(score))
+    return float(score[end]), end
+
+
+class WakeWordSpotter:
+    """Template matcher trained from a few recordings of the wake word."""
+
+    def __init__(self, templates=(), threshold=None):
+        self.templates = [np.asarray(t) for t in templates]
+        self.threshold = threshold
+
+    # ---- training ----
+    def enroll(self, recordings):
+        """recordings: int16 PCM bytes of the wake word, one per take."""
+        self.templates = [mfcc(pcm) for pcm in recordings]
+        self.threshold = self.calibrate()
+        return self
+
+    def calibrate(self):
+        """Worst template-to-template distance, with some headroom."""
+        if len(self.templates) < 2:
+            return None
+        worst = 0.0
+        for i, a in enumerate(self.templates):
+            for j, b in enumerate(self.templates):
+                if i != j:
+                    worst = max(worst, subsequence_dtw(a, b)[0])
+        return worst * THRESHOLD_MARGIN
+
+    def save(self, path=TEMPLATES_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path,
+                 frames=np.concatenate(self.templates),
+                 lengths=np.array([len(t) for t in self.templates]),
+                 threshold=np.array(self.threshold if self.threshold is not None else np.nan))
+
+    @classmethod
+    def load(cls, path=TEMPLATES_PATH):
+        with np.load(path) as data:
+            frames, lengths = data["frames"], data["lengths"]
+            threshold = float(data["threshold"])
+        templates = np.split(frames, np.cumsum(lengths)[:-1])
+        return cls(templates, None if math.isnan(threshold) else threshold)
+
+    # ---- detection ----
+    def spot(self, pcm):
+        """(distance, end sample of the wake word) for the closest template."""
+        if not self.templates:
+            return math.inf, 0
+        feats = mfcc(pcm)
+        best, end = math.inf, 0
+        for template in self.templates:
+            score, end_frame = subsequence_dtw(template, feats)
+            if score < best:
+                best, end = score, end_frame
+        hop = RATE * HOP_MS // 1000
+        return best, (end + 1) * hop + RATE * (WIN_MS - HOP_MS) // 1000
+
+    def detect(self, pcm):
+        """End sample of the wake word in pcm, or None."""
+        score, end = self.spot(pcm)
+        if self.threshold is not None and score <= self.threshold:
+            return end
+        return None
+
+
+_spotter = None
+
+
+def get_spotter(path=TEMPLATES_PATH):
+    """The enrolled spotter, or None until `enroll` has been run."""
+    global _spotter
+    if _spotter is None and os.path.exists(path):
+        try:
+            _spotter = WakeWordSpotter.load(path)
+            if DEBUG:
+                print(f"[Wake] {len(_spotter.templates)} templates, threshold {_spotter.threshold:.2f}")
+        except Exception as e:
+            print(f"[Wake] could not load {path}: {e}")
+    if _spotter is not None and len(_spotter.templates) < MIN_TEMPLATES:
+        return None
+    return _spotter
+
+
+def enroll_from_mic(takes=5, path=TEMPLATES_PATH):
+    """Record the wake word `takes` times through the bus and VAD, then save."""
+    from FUNCTION.VOICE_ACTIVITY.voice_activity import Endpointer, record
+    global _spotter
+    recordings = []
+    endpointer = Endpointer()
+    with mic_bus.MicSource("wake-enroll") as source:
+        for i in range(takes):
+            print(f"Say the wake word ({i + 1}/{takes})...")
+            audio = record(source, endpointer, phrase_time_limit=2.5)
+            recordings.append(audio.frame_data)
+    _spotter = WakeWordSpotter().enroll(recordings)
+    _spotter.save(path)
+    print(f"Saved {takes} templates to {path}, threshold {_spotter.threshold:.2f}")
+    return _spotter
+
+
+# =============================
+# Evaluation
+# =============================
+def _synthetic_word(phones, rng, f0=None, snr_db=20.0):
+    """Harmonic source shaped by per-phone formants, e.g. [(F1, F2, ms), ...]."""
+    f0 = f0 or rng.uniform(100, 220)
+    stretch = rng.uniform(0.85, 1.15)
+    parts = []
+    for f1, f2, ms in phones:
+        n = int(RATE * ms * stretch / 1000)
+        t = np.arange(n) / RATE
+        harmonics = np.arange(1, int(4000 / f0))
+        freqs = harmonics * f0
+        jitter = rng.uniform(0.95, 1.05, 2)
+        gain = (np.exp(-((freqs - f1 * jitter[0]) / 120.0) ** 2)
+                + 0.6 * np.exp(-((freqs - f2 * jitter[1]) / 180.0) ** 2) + 0.02)
+        wave_ = (gain[:, None] * np.sin(2 * np.pi * freqs[:, None] * t[None, :])).sum(axis=0)
+        parts.append(wave_ * np.hanning(n) ** 0.3)
+    x = np.concatenate(parts)
+    x = 0.3 * x / (np.abs(x).max() + 1e-9)
+    x = np.concatenate([np.zeros(RATE // 10), x, np.zeros(RATE // 10)])
+    power = np.mean(x ** 2)
+    x = x + rng.normal(0, math.sqrt(power / 10 ** (snr_db / 10)), len(x))
+    return np.clip(x * 32767, -32768, 32767).astype("<i2").tobytes()
+
+
+WAKE_PHONES = [(700, 1200, 120), (750, 1100, 160), (300, 2300, 110), (250, 2000, 130)]
+OTHER_WORDS = [
+    [(300, 2300, 110), (250, 2000, 130), (700, 1200, 120), (750, 1100, 160)],
+    [(500, 1500, 200), (400, 900, 200)],
+    [(700, 1200, 120), (400, 800, 200), (500, 1700, 150)],
+    [(350, 2700, 150), (600, 1000, 180), (300, 900, 150)],
+    [(650, 1080, 300), (280, 2250, 200), (450, 1850, 150)],
+]
+
+
+def synthetic_corpus(seed=11, enroll=5, positives=40, negatives=200):
+    rng = np.random.default_rng(seed)
+    return {
+        "enroll": [_synthetic_word(WAKE_PHONES, rng) for _ in range(enroll)],
+        "positive": [_synthetic_word(WAKE_PHONES, rng, snr_db=rng.uniform(10, 25)) for _ in range(positives)],
+        "negative": [_synthetic_word(OTHER_WORDS[i % len(OTHER_WORDS)], rng, snr_db=rng.uniform(10, 25))
+                     for i in range(negatives)],
+    }
+
+
+def load_corpus(directory):
+    """DIR/enroll/*.wav, DIR/positive/*.wav and DIR/negative/*.wav."""
+    from FUNCTION.VOICE_ACTIVITY.voice_activity import read_wav
+    corpus = {}
+    for part in ("enroll", "positive", "negative"):
+        corpus[part] = [read_wav(p) for p in sorted(glob.glob(os.path.join(directory, part, "*.wav")))]
+    return corpus
+
+
+def evaluate(corpus, spotter=None):
+    """False-accept / false-reject rates and CPU seconds per hour of audio."""
+    spotter = spotter or WakeWordSpotter().enroll(corpus["enroll"])
+    seconds = sum(len(p) for p in corpus["positive"] + corpus["negative"]) / 2.0 / RATE
+    cpu_started = time.process_time()
+    pos = [spotter.spot(p)[0] for p in corpus["positive"]]
+    neg = [spotter.spot(p)[0] for p in corpus["negative"]]
+    cpu = time.process_time() - cpu_started
+    neg_hours = sum(len(p) for p in corpus["negative"]) / 2.0 / RATE / 3600.0
+
+    def rates(threshold):
+        fr = sum(1 for s in pos if s > threshold) / max(1, len(pos))
+        fa = sum(1 for s in neg if s <= threshold)
+        return fr, fa / max(1, len(neg)), fa / neg_hours if neg_hours else 0.0
+
+    print(f"{len(corpus['enroll'])} enrollment takes, {len(pos)} positives, {len(neg)} negatives "
+          f"({seconds:.0f} s of audio)")
+    print(f"{'threshold':>10}  {'false reject':>12}  {'false accept':>12}  {'FA per hour':>11}")
+    for t in sorted({spotter.threshold * f for f in (0.8, 0.9, 1.0, 1.1, 1.2)}):
+        fr, fa, fa_hour = rates(t)
+        mark = "  <- enrolled" if t == spotter.threshold else ""
+        print(f"{t:>10.2f}  {fr:>11.1%}  {fa:>11.1%}  {fa_hour:>11.1f}{mark}")
+    cpu_per_hour = cpu / seconds * 3600.0 if seconds else 0.0
+    print(f"CPU: {cpu_per_hour:.0f} s per hour of audio ({cpu_per_hour / 36.0:.2f}% of one core)")
+    fr, fa, fa_hour = rates(spotter.threshold)
+    return {"false_reject": fr, "false_accept": fa, "false_accepts_per_hour": fa_hour,
+            "cpu_seconds_per_hour": cpu_per_hour}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["enroll"]:
+        enroll_from_mic(int(args[1]) if len(args) > 1 else 5)
+    else:
+        directory = args[1] if len(args) > 1 else None
+        evaluate(load_corpus(directory) if directory else synthetic_corpus())
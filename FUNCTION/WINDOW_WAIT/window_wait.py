@@ -0,0 +1,46 @@
+# Waiting for a window instead of sleeping.
+# Automations used to sleep a fixed 3-5 s after opening YouTube or the
+# Start menu so the window was there before they typed into it. This polls
+# the title of the foreground window and returns as soon as it matches.
+# Where pyautogui cannot read window titles (it only can on Windows) there
+# is nothing to wait on, so it returns at once.
+import time
+
+import pyautogui as ui
+
+DEBUG = False
+
+POLL_S = 0.1
+
+
+def active_window_title():
+    """Title of the foreground window, or None where it cannot be read."""
+    get_title = getattr(ui, "getActiveWindowTitle", None)
+    if get_title is None:
+        return None
+    try:
+        return get_title()
+    except Exception:
+        return None
+
+
+def wait_for_window(title, timeout=5.0, poll=POLL_S):
+    """True once the foreground window's title contains title; False after timeout.
+
+    None, straight away, where window titles cannot be read.
+    """
+    title = title.lower()
+    started = time.perf_counter()
+    current = active_window_title()
+    if current is None:
+        return None
+    while title not in current.lower():
+        if time.perf_counter() - started > timeout:
+            if DEBUG:
+                print(f"[Window] no {title!r} window after {timeout:.1f}s (foreground: {current!r})")
+            return False
+        time.sleep(poll)
+        current = active_window_title() or ""
+    if DEBUG:
+        print(f"[Window] {title!r} ready after {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
@@ -0,0 +1,48 @@
+# Entry point: python -m MAIN [--warm] [--asr NAME] [--profile-startup] [--latency-summary] [--replay FILE]
+import argparse
+import sys
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m MAIN", description="J.A.R.V.I.S voice assistant")
+    parser.add_argument("--warm", action="store_true",
+                        help="preload every skill in the background once the wake loop is listening")
+    parser.add_argument("--asr", choices=("google", "vosk", "standin", "hedged"),
+                        help="speech recognition backend (default: $JARVIS_ASR or google)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="import every module under AUTOMATION/, BRAIN/, FUNCTION/ and DATA/ and report the cost")
+    parser.add_argument("--latency-summary", nargs="?", const="", metavar="TURNS_JSONL",
+                        help="print p50/p95/p99 per stage from the per-turn latency trace")
+    parser.add_argument("--trace", default="startup_trace.json",
+                        help="Chrome trace output for --profile-startup (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=None,
+                        help="only show the N slowest imports")
+    parser.add_argument("--all-imports", action="store_true",
+                        help="include third-party modules in the table")
+    parser.add_argument("--replay", metavar="TRANSCRIPTS",
+                        help="run a transcript file through the command handlers with stub audio, TTS and browser")
+    parser.add_argument("--route-only", action="store_true",
+                        help="with --replay, only route each command without running its handler")
+    parser.add_argument("--json", metavar="OUT",
+                        help="with --replay, also write per-command results and stats as JSON")
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parse_args(argv)
+    if args.latency_summary is not None:
+        from FUNCTION.TURN_TRACE.turn_trace import print_summary
+        print_summary(args.latency_summary or None)
+        return
+    if args.replay:
+        from FUNCTION.REPLAY_HARNESS.replay_harness import run_replay
+        sys.exit(run_replay(args.replay, route_only=args.route_only, json_path=args.json))
+    if args.profile_startup:
+        from FUNCTION.STARTUP_PROFILER.startup_profiler import profile_startup
+        profile_startup(trace_path=args.trace, limit=args.top, show_all=args.all_imports)
+        return
+    from MAIN.main import jarvis
+    jarvis(warm_up=args.warm, asr=args.asr)
+
+
+run()
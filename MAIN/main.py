@@ -1,64 +1,127 @@
-import random
+import re
+import sys
 import threading
+import time
 
-from BRAIN.MAIN_BRAIN.BRAIN.brain import *
-from AUTOMATION.MAIN_INTEGRATION._integration_automation import *
-from FUNCTION.MAIN_FUNCTION_INTEGRATION.function_integration import *
-from FUNCTION.JARVIS_LISTEN.listen import *
-from DATA.JARVIS_DLG_DATASET.DLG import *
-from BRAIN.ACTIVITY.GREETINGS.WELCOME_GREETINGS.welcome_greetings import *
-from BRAIN.ACTIVITY.GREETINGS.WISH_GREETINGS.wish_greetings import *
-from BRAIN.ACTIVITY.ADVICE.advice import *
-from BRAIN.ACTIVITY.JOKE.joke import *
-from AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_PLUG_CHECK.battery_plug_check import *
-from AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_ALERT.battery_alert import *
+_started = time.perf_counter()
 
+from FUNCTION.JARVIS_LISTEN.listen import listen, hearing
+from FUNCTION.SKILL_REGISTRY.skill_registry import build_command_index, resolve, warm, prewarm
+from FUNCTION.TURN_TRACE import turn_trace
+from FUNCTION.INTENT_ROUTER.intent_router import ADDRESS, normalize
+from DATA.JARVIS_DLG_DATASET.DLG import wake_key_word
+
+# Every skill's trigger phrases compiled once at startup; the skill modules
+# themselves (Selenium, pywhatkit, pygame, sumy...) load on first use
+command_index = build_command_index()
+
+# Background loops, imported when their thread starts
+BACKGROUND_LOOPS = (
+    "AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_ALERT.battery_alert:battery_alert",
+    "AUTOMATION.JARVIS_AUTOMATION_BATTERY.BATTERY_PLUG_CHECK.battery_plug_check:check_plugin_status",
+    "BRAIN.ACTIVITY.ADVICE.advice:advice",
+    "BRAIN.ACTIVITY.JOKE.joke:jokes",
+)
+
+
+# Wake phrases a command can follow in the same breath, longest first
+WAKE_PREFIXES = sorted({normalize(p) for p in wake_key_word} | {"jarvis"},
+                       key=len, reverse=True)
+
+
+def clean_command(text):
+    # ASR often hears "jarvis" as "jar"; replacing " jar" as a substring also
+    # turned "jarvis" into "jarvisvis" and glued it to the previous word
+    return re.sub(r"\bjar\b", "jarvis", text.lower())
+
+def route_command(text, wake=""):
+    # After a wake phrase with "jarvis" in it the command is addressed to jarvis
+    if ADDRESS in wake.split():
+        return command_index.route_addressed(text)
+    return command_index.route(text)
+
+def handle_command(text, wake=""):
+    text = clean_command(text)
+    # A joke or advice still being read out gives way to the answer
+    resolve("FUNCTION.JARVIS_SPEAK.speak:interrupt")()
+    route = route_command(text, wake)
+    turn_trace.record(turn_trace.ROUTE, route.match_ms)
+    turn_trace.annotate(text=text, intent=route.intent.name if route.intent else None)
+    with turn_trace.span(turn_trace.HANDLER):
+        command_index.run(route)
+    return route
+
+def split_wake_word(text):
+    """("wake up", "play music") for "wake up play music"; ("", text) without a wake phrase."""
+    text = normalize(text)
+    if text in WAKE_PREFIXES:
+        return "", text
+    for phrase in WAKE_PREFIXES:
+        if text.startswith(phrase + " "):
+            return phrase, text[len(phrase) + 1:]
+    return "", text
+
+def prewarm_from_partial(text):
+    # "play..." starts loading the YouTube skill before the user has finished
+    prewarm(clean_command(text), command_index)
 
 def comain():
     while True:
-        text = listen().lower()
-        text = text.replace(" jar", "jarvis")
-        Automation(text)
-        Function_cmd(text)
-        Greeting(text)
-
-        if text in bye_key_word:
-            x = random.choice(res_bye)
-            speak(x)
-        elif "jarvis" in text:
-            response = brain_cmd(text)
-            speak(response)
-        else:
-            pass
+        turn_trace.begin_turn()
+        handle_command(listen())
+        turn_trace.end_turn()
 
 def main():
+    print(f"[Startup] listening for wake word after {time.perf_counter() - _started:.2f}s")
     while True:
-        wake_cmd = hearing().lower()
-        if wake_cmd in wake_key_word:
+        wake_cmd = clean_command(hearing())
+        wake, command = split_wake_word(wake_cmd)
+        if wake:
+            # Wake word and command in one utterance: run it now, skip the greeting
+            turn_trace.begin_turn()
+            handle_command(command, wake)
+            turn_trace.end_turn()
+            comain()
+            continue
+        route = command_index.route(wake_cmd)
+        if route.intent is not None and route.intent.name == "wake":
             # welcome_dlg1 = random.choice(welcome_dlg)
             # speak(welcome_dlg1)
-            welcome()
+            route.intent.action()
             comain()
         else:
             pass
 
-def jarvis():
-    t1 = threading.Thread(target=main)
-    t2 = threading.Thread(target=battery_alert)
-    t3 = threading.Thread(target=check_plugin_status)
-    t4 = threading.Thread(target=advice)
-    t5 = threading.Thread(target=jokes)
+def run_background(target):
+    resolve(target)()
+
+def preload():
+    # Import every skill, then start the TTS engine so the first reply is instant,
+    # and a headless Chrome for the first web-backed brain question
+    warm(background=False)
+    resolve("FUNCTION.JARVIS_SPEAK.speak:warm_up")()
+    resolve("FUNCTION.BROWSER_POOL.browser_pool:warm_up")()
+
+def jarvis(warm_up=False, asr=None):
+    from FUNCTION.ASR_BACKEND import asr_backend
+    if asr:
+        asr_backend.select(asr)
+    asr_backend.on_partial(prewarm_from_partial)
 
+    t1 = threading.Thread(target=main)
     t1.start()
-    t2.start()
-    t3.start()
-    t4.start()
-    t5.start()
-
-    t1.join()
-    t2.join()
-    t3.join()
-    t4.join()
-    t5.join()
-
-jarvis()
\ No newline at end of file
+
+    threads = [t1]
+    for target in BACKGROUND_LOOPS:
+        t = threading.Thread(target=run_background, args=(target,))
+        t.start()
+        threads.append(t)
+
+    if warm_up:
+        threading.Thread(target=preload, name="skill-warmup", daemon=True).start()
+
+    for t in threads:
+        t.join()
+
+if __name__ == "__main__":
+    jarvis(warm_up="--warm" in sys.argv[1:])